@@ -11,6 +11,8 @@ from .images import router as images_router
 from .collections import router as collections_router
 from .pantry import router as pantry_router
 from .suggestions import router as suggestions_router
+from .admin import router as admin_router
+from .jobs import router as jobs_router
 
 api_router = APIRouter()
 api_router.include_router(ingredients_router, prefix="/ingredients", tags=["ingredients"])
@@ -24,3 +26,5 @@ api_router.include_router(images_router, prefix="/images", tags=["images"])
 api_router.include_router(collections_router, prefix="/collections", tags=["collections"])
 api_router.include_router(pantry_router, prefix="/pantry", tags=["pantry"])
 api_router.include_router(suggestions_router, prefix="/suggestions", tags=["suggestions"])
+api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
+api_router.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
@@ -0,0 +1,134 @@
+import secrets
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, Response
+
+from app.core import memory, settings
+from app.core.database import engine_pools
+from app.core.pool import pool_status
+from app.core.profiling import list_profiles, profile_path
+from app.core.slow_queries import slow_query_log
+from app.core.timing import TimedRoute
+from app.models import RecipeImage
+from app.schemas import (
+    AllocationStat,
+    LiveBuffersResponse,
+    PoolStatsResponse,
+    ProfileResponse,
+    SessionIdentityMap,
+    SlowQueryResponse,
+    TracemallocStatusResponse,
+)
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_admin)])
+
+
+@router.get("/pool", response_model=list[PoolStatsResponse])
+def get_pool_stats():
+    return [pool_status(name, pool) for name, pool in engine_pools().items()]
+
+
+@router.get("/slow-queries", response_model=list[SlowQueryResponse])
+def list_slow_queries(limit: int = 50):
+    return slow_query_log.records()[:limit]
+
+
+@router.delete("/slow-queries", status_code=204)
+def clear_slow_queries():
+    slow_query_log.clear()
+
+
+@router.get("/profiles", response_model=list[ProfileResponse])
+def get_profiles():
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str, format: Literal["speedscope", "collapsed"] = "speedscope"
+):
+    path = profile_path(profile_id, format)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if format == "speedscope" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
+
+@router.get("/memory/tracemalloc", response_model=TracemallocStatusResponse)
+def get_tracemalloc_status():
+    return memory.tracemalloc_status()
+
+
+@router.post("/memory/tracemalloc/start", response_model=TracemallocStatusResponse)
+def start_tracemalloc(frames: int = Query(default=1, ge=1, le=100)):
+    memory.start_tracing(frames)
+    return memory.tracemalloc_status()
+
+
+@router.post("/memory/tracemalloc/stop", response_model=TracemallocStatusResponse)
+def stop_tracemalloc():
+    memory.stop_tracing()
+    return memory.tracemalloc_status()
+
+
+@router.post("/memory/snapshots", response_model=list[AllocationStat], status_code=201)
+def take_memory_snapshot(
+    response: Response,
+    group_by: Literal["module", "line"] = "line",
+    limit: int = Query(default=20, ge=1, le=500),
+):
+    try:
+        snapshot_id = memory.take_snapshot()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Snapshot-Id"] = snapshot_id
+    return memory.top_allocations(snapshot_id, group_by, limit)
+
+
+@router.get("/memory/snapshots/{snapshot_id}", response_model=list[AllocationStat])
+def get_memory_snapshot(
+    snapshot_id: str,
+    group_by: Literal["module", "line"] = "line",
+    limit: int = Query(default=20, ge=1, le=500),
+):
+    try:
+        return memory.top_allocations(snapshot_id, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+
+@router.get("/memory/diff", response_model=list[AllocationStat])
+def diff_memory_snapshots(
+    base: str,
+    target: str,
+    group_by: Literal["module", "line"] = "line",
+    limit: int = Query(default=20, ge=1, le=500),
+):
+    try:
+        return memory.diff_snapshots(base, target, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+
+@router.get("/memory/sessions", response_model=list[SessionIdentityMap])
+def get_session_identity_maps():
+    return memory.session_identity_maps()
+
+
+@router.get("/memory/buffers", response_model=LiveBuffersResponse)
+def get_live_buffers(
+    limit: int = Query(default=20, ge=1, le=500), min_size: int = Query(default=1024, ge=0)
+):
+    return LiveBuffersResponse(
+        buffers=memory.largest_buffers(limit, min_size),
+        recipe_images=memory.loaded_attribute_bytes(RecipeImage, "data"),
+    )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 
 from app.core import get_db
+from app.core.timing import TimedRoute
 from app.models import Collection, Recipe, RecipeCollection
 from app.schemas import (
     CollectionCreate,
@@ -11,7 +12,7 @@ from app.schemas import (
     CollectionRecipeSummary,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_primary_image_id(recipe: Recipe) -> int | None:
@@ -1,29 +1,36 @@
 from datetime import date
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.core import get_db
+from app.core import get_read_db
+from app.core.timing import TimedRoute
 from app.models import Favorite, Ingredient, MealPlan, Recipe
 from app.schemas import DashboardResponse, MealPlanResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=DashboardResponse)
-def get_dashboard(db: Session = Depends(get_db)):
-    total_recipes = db.query(Recipe).filter(Recipe.is_active.is_(True)).count()
-    total_ingredients = db.query(Ingredient).filter(Ingredient.is_active.is_(True)).count()
-    total_favorites = db.query(Favorite).count()
+async def get_dashboard(db: AsyncSession = Depends(get_read_db)):
+    total_recipes = await db.scalar(
+        select(func.count()).select_from(Recipe).where(Recipe.is_active.is_(True))
+    )
+    total_ingredients = await db.scalar(
+        select(func.count()).select_from(Ingredient).where(Ingredient.is_active.is_(True))
+    )
+    total_favorites = await db.scalar(select(func.count()).select_from(Favorite))
 
     today = date.today()
-    todays_meals = (
-        db.query(MealPlan)
+    result = await db.execute(
+        select(MealPlan)
         .options(joinedload(MealPlan.recipe).joinedload(Recipe.images))
-        .filter(MealPlan.date == today)
+        .where(MealPlan.date == today)
         .order_by(MealPlan.meal_type)
-        .all()
     )
+    todays_meals = result.unique().scalars().all()
 
     meals_response = []
     for meal in todays_meals:
@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.core import get_db
+from app.core import get_async_db, get_db
+from app.core.timing import TimedRoute
 from app.models import Favorite, Recipe
 from app.schemas import FavoriteResponse, RecipeListResponse
 
-router = APIRouter()
+from .recipes import recipe_list_item
+
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=list[RecipeListResponse])
-def list_favorites(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    favorites = (
-        db.query(Favorite)
+async def list_favorites(
+    skip: int = 0, limit: int = 50, db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(
+        select(Favorite)
         .options(
             joinedload(Favorite.recipe).joinedload(Recipe.tags),
             joinedload(Favorite.recipe).joinedload(Recipe.images),
@@ -19,30 +27,10 @@ def list_favorites(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)
         .order_by(Favorite.created_at.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    favorites = result.unique().scalars().all()
 
-    return [
-        RecipeListResponse(
-            id=f.recipe.id,
-            title=f.recipe.title,
-            description=f.recipe.description,
-            prep_time_minutes=f.recipe.prep_time_minutes,
-            cook_time_minutes=f.recipe.cook_time_minutes,
-            servings=f.recipe.servings,
-            difficulty=f.recipe.difficulty,
-            dietary_tags=f.recipe.dietary_tags or [],
-            is_favorite=True,
-            primary_image_id=next(
-                (img.id for img in f.recipe.images if img.is_primary),
-                f.recipe.images[0].id if f.recipe.images else None,
-            ),
-            tags=f.recipe.tags,
-            created_at=f.recipe.created_at,
-        )
-        for f in favorites
-        if f.recipe.is_active
-    ]
+    return ORJSONResponse([recipe_list_item(f.recipe, is_favorite=True) for f in favorites if f.recipe.is_active])
 
 
 @router.post("/{recipe_id}", response_model=FavoriteResponse, status_code=201)
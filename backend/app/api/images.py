@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core import get_db
+from app.core import get_async_db, get_db
+from app.core.timing import TimedRoute
 from app.models import RecipeImage
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/{image_id}")
-def get_image(image_id: int, db: Session = Depends(get_db)):
-    image = db.query(RecipeImage).filter(RecipeImage.id == image_id).first()
+async def get_image(image_id: int, db: AsyncSession = Depends(get_async_db)):
+    image = await db.get(RecipeImage, image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
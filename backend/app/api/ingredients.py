@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core import get_db
+from app.core.timing import TimedRoute
 from app.models import Ingredient
 from app.schemas import IngredientCreate, IngredientUpdate, IngredientResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=list[IngredientResponse])
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import JobState, get_async_db, get_read_db
+from app.core.timing import TimedRoute
+from app.models import Job
+from app.schemas import JobResponse
+
+router = APIRouter(route_class=TimedRoute)
+
+
+async def job_accepted(db: AsyncSession, job: Job) -> ORJSONResponse:
+    """202 for an enqueued (and committed) job, pointing at its status."""
+    await db.refresh(job)
+    return ORJSONResponse(
+        JobResponse.model_validate(job).model_dump(mode="json"),
+        status_code=202,
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+@router.get("", response_model=list[JobResponse])
+async def list_jobs(
+    state: JobState | None = None,
+    kind: str | None = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = select(Job)
+    if state:
+        query = query.where(Job.state == state)
+    if kind:
+        query = query.where(Job.kind == kind)
+    return (await db.scalars(query.order_by(Job.id.desc()).limit(limit))).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    # The primary: progress is polled, and a replica would lag behind the workers.
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
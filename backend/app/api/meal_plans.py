@@ -1,9 +1,12 @@
 from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.core import get_db
+from app.core import get_db, get_read_db
+from app.core.timing import TimedRoute
 from app.models import MealPlan, Recipe
 from app.schemas import (
     MealPlanCreate,
@@ -12,7 +15,7 @@ from app.schemas import (
     WeekMealPlanResponse,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_meal_plan_response(meal: MealPlan) -> dict:
@@ -39,17 +42,17 @@ def get_meal_plan_response(meal: MealPlan) -> dict:
 
 
 @router.get("/week/{week_date}", response_model=WeekMealPlanResponse)
-def get_week_meal_plans(week_date: date, db: Session = Depends(get_db)):
+async def get_week_meal_plans(week_date: date, db: AsyncSession = Depends(get_read_db)):
     start = week_date - timedelta(days=week_date.weekday())
     end = start + timedelta(days=6)
 
-    meals = (
-        db.query(MealPlan)
+    result = await db.execute(
+        select(MealPlan)
         .options(joinedload(MealPlan.recipe).joinedload(Recipe.images))
-        .filter(MealPlan.date >= start, MealPlan.date <= end)
+        .where(MealPlan.date >= start, MealPlan.date <= end)
         .order_by(MealPlan.date, MealPlan.meal_type)
-        .all()
     )
+    meals = result.unique().scalars().all()
 
     return WeekMealPlanResponse(
         start_date=start,
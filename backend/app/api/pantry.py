@@ -4,10 +4,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core import get_db
+from app.core.timing import TimedRoute
 from app.models import Ingredient, PantryItem
 from app.schemas import PantryItemCreate, PantryItemUpdate, PantryItemResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_pantry_item_response(item: PantryItem) -> dict:
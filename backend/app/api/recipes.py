@@ -1,31 +1,65 @@
 import logging
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.core import DietaryTag, DifficultyLevel, get_db
-from app.models import Ingredient, Recipe, RecipeImage, RecipeIngredient, RecipeNote, Tag
+from app.api.jobs import job_accepted
+from app.core import DietaryTag, DifficultyLevel, get_async_db, get_db, get_read_db, settings
+from app.core.timing import TimedRoute
+from app.models import Ingredient, Recipe, RecipeIngredient, RecipeNote, Tag
 from app.schemas import (
     RecipeCreate,
     RecipeListResponse,
     RecipeResponse,
     RecipeUpdate,
     RecipeImageResponse,
-    RecipeIngredientResponse,
-    RecipeNoteResponse,
     ScaledIngredientResponse,
     RecipeImportRequest,
+    RecipeBulkImportRequest,
     RecipeImportResponse,
     RecipeNoteCreate,
     RecipeNoteSchemaResponse,
     RecipeNutritionResponse,
     RecipeCostResponse,
 )
+from app.services.bulk_import import bulk_import
+from app.services.ingredient_matching import load_matcher, resolve_ingredients
+from app.services.jobs import enqueue
+from app.services.recipe_images import IMAGE_TYPES, MAX_IMAGE_BYTES, add_recipe_image, enqueue_image_fetch
 from app.utils import scale_quantity, import_recipe_from_url
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+
+def _tags(recipe: Recipe) -> list[dict]:
+    return [{"id": t.id, "name": t.name, "created_at": t.created_at} for t in recipe.tags]
+
+
+def recipe_list_item(recipe: Recipe, is_favorite: bool) -> dict:
+    return {
+        "id": recipe.id,
+        "title": recipe.title,
+        "description": recipe.description,
+        "prep_time_minutes": recipe.prep_time_minutes,
+        "cook_time_minutes": recipe.cook_time_minutes,
+        "servings": recipe.servings,
+        "difficulty": recipe.difficulty,
+        "dietary_tags": recipe.dietary_tags or [],
+        "is_favorite": is_favorite,
+        "primary_image_id": next(
+            (img.id for img in recipe.images if img.is_primary),
+            recipe.images[0].id if recipe.images else None,
+        ),
+        "tags": _tags(recipe),
+        "created_at": recipe.created_at,
+    }
 
 
 def get_recipe_response(recipe: Recipe) -> dict:
@@ -43,26 +77,32 @@ def get_recipe_response(recipe: Recipe) -> dict:
         "is_active": recipe.is_active,
         "is_favorite": recipe.favorite is not None,
         "ingredients": [
-            RecipeIngredientResponse(
-                id=ri.id,
-                ingredient_id=ri.ingredient_id,
-                ingredient_name=ri.ingredient.name,
-                quantity=ri.quantity,
-                unit=ri.unit,
-                notes=ri.notes,
-            )
+            {
+                "id": ri.id,
+                "ingredient_id": ri.ingredient_id,
+                "ingredient_name": ri.ingredient.name,
+                "quantity": ri.quantity,
+                "unit": ri.unit,
+                "notes": ri.notes,
+            }
             for ri in recipe.ingredients
         ],
-        "images": [RecipeImageResponse.model_validate(img) for img in recipe.images],
-        "tags": recipe.tags,
-        "notes": [RecipeNoteResponse.model_validate(n) for n in recipe.notes],
+        "images": [
+            {"id": img.id, "is_primary": img.is_primary, "sort_order": img.sort_order, "created_at": img.created_at}
+            for img in recipe.images
+        ],
+        "tags": _tags(recipe),
+        "notes": [
+            {"id": n.id, "content": n.content, "created_at": n.created_at, "updated_at": n.updated_at}
+            for n in recipe.notes
+        ],
         "created_at": recipe.created_at,
         "updated_at": recipe.updated_at,
     }
 
 
 @router.get("", response_model=list[RecipeListResponse])
-def list_recipes(
+async def list_recipes(
     skip: int = 0,
     limit: int = 50,
     search: str | None = None,
@@ -70,24 +110,27 @@ def list_recipes(
     tag_ids: list[int] = Query(default=[]),
     dietary_tags: list[DietaryTag] = Query(default=[]),
     favorites_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     query = (
-        db.query(Recipe)
+        select(Recipe)
         .options(joinedload(Recipe.tags), joinedload(Recipe.images), joinedload(Recipe.favorite))
-        .filter(Recipe.is_active.is_(True))
+        .where(Recipe.is_active.is_(True))
     )
 
     if search:
-        query = query.filter(Recipe.title.ilike(f"%{search}%"))
+        query = query.where(Recipe.title.ilike(f"%{search}%"))
     if difficulty:
-        query = query.filter(Recipe.difficulty == difficulty)
+        query = query.where(Recipe.difficulty == difficulty)
     if tag_ids:
-        query = query.filter(Recipe.tags.any(Tag.id.in_(tag_ids)))
+        query = query.where(Recipe.tags.any(Tag.id.in_(tag_ids)))
     if favorites_only:
-        query = query.filter(Recipe.favorite.has())
+        query = query.where(Recipe.favorite.has())
 
-    recipes = query.order_by(Recipe.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(
+        query.order_by(Recipe.created_at.desc()).offset(skip).limit(limit)
+    )
+    recipes = result.unique().scalars().all()
 
     if dietary_tags:
         requested_tags = {tag.value for tag in dietary_tags}
@@ -96,23 +139,9 @@ def list_recipes(
             if r.dietary_tags and requested_tags.issubset(set(r.dietary_tags))
         ]
 
-    return [
-        RecipeListResponse(
-            id=r.id,
-            title=r.title,
-            description=r.description,
-            prep_time_minutes=r.prep_time_minutes,
-            cook_time_minutes=r.cook_time_minutes,
-            servings=r.servings,
-            difficulty=r.difficulty,
-            dietary_tags=r.dietary_tags or [],
-            is_favorite=r.favorite is not None,
-            primary_image_id=next((img.id for img in r.images if img.is_primary), r.images[0].id if r.images else None),
-            tags=r.tags,
-            created_at=r.created_at,
-        )
-        for r in recipes
-    ]
+    # Rows come straight from the database, so skip response_model validation
+    # (it stays on the route for OpenAPI) and let orjson encode the dicts.
+    return ORJSONResponse([recipe_list_item(r, is_favorite=r.favorite is not None) for r in recipes])
 
 
 @router.post("", response_model=RecipeResponse, status_code=201)
@@ -147,6 +176,10 @@ def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db)):
         db_recipe.tags = tags
 
     db.add(db_recipe)
+    if recipe.image_url:
+        # Downloaded by a job worker; the image shows up on the recipe once stored.
+        db.flush()
+        enqueue_image_fetch(db, db_recipe.id, recipe.image_url)
     db.commit()
     db.refresh(db_recipe)
 
@@ -154,9 +187,9 @@ def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    recipe = (
-        db.query(Recipe)
+async def get_recipe(recipe_id: int, db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(
+        select(Recipe)
         .options(
             joinedload(Recipe.ingredients).joinedload(RecipeIngredient.ingredient),
             joinedload(Recipe.images),
@@ -164,13 +197,13 @@ def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
             joinedload(Recipe.favorite),
             joinedload(Recipe.notes),
         )
-        .filter(Recipe.id == recipe_id)
-        .first()
+        .where(Recipe.id == recipe_id)
     )
+    recipe = result.unique().scalars().first()
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    return get_recipe_response(recipe)
+    return ORJSONResponse(get_recipe_response(recipe))
 
 
 @router.put("/{recipe_id}", response_model=RecipeResponse)
@@ -233,42 +266,20 @@ async def upload_recipe_image(
     recipe_id: int,
     file: UploadFile = File(...),
     is_primary: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    if file.content_type not in ["image/jpeg", "image/png", "image/webp"]:
+    if file.content_type not in IMAGE_TYPES:
         raise HTTPException(status_code=400, detail="Invalid image type")
 
     content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
+    if len(content) > MAX_IMAGE_BYTES:
         raise HTTPException(status_code=400, detail="Image too large (max 5MB)")
 
-    if is_primary:
-        db.query(RecipeImage).filter(
-            RecipeImage.recipe_id == recipe_id, RecipeImage.is_primary.is_(True)
-        ).update({"is_primary": False})
-
-    max_order = (
-        db.query(RecipeImage)
-        .filter(RecipeImage.recipe_id == recipe_id)
-        .count()
-    )
-
-    db_image = RecipeImage(
-        recipe_id=recipe_id,
-        data=content,
-        mime_type=file.content_type,
-        is_primary=is_primary,
-        sort_order=max_order,
-    )
-    db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
-
-    return db_image
+    return await add_recipe_image(db, recipe_id, content, file.content_type, is_primary)
 
 
 @router.get("/{recipe_id}/scale/{servings}", response_model=list[ScaledIngredientResponse])
@@ -296,15 +307,60 @@ def scale_recipe(recipe_id: int, servings: int, db: Session = Depends(get_db)):
 
 
 @router.post("/import", response_model=RecipeImportResponse)
-async def import_recipe(request: RecipeImportRequest):
+async def import_recipe(request: RecipeImportRequest, db: AsyncSession = Depends(get_read_db)):
     try:
         data = await import_recipe_from_url(request.url)
-        return RecipeImportResponse(**data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         logger.exception("Failed to import recipe from %s", request.url)
         raise HTTPException(status_code=400, detail="Failed to import recipe from URL")
+    matcher = await load_matcher(db)
+    await db.commit()
+    data["parsed_ingredients"] = resolve_ingredients(data["ingredients"], matcher)
+    return RecipeImportResponse(**data)
+
+
+async def _ndjson(events: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for event in events:
+        yield orjson.dumps(event) + b"\n"
+
+
+async def _server_sent_events(events: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for event in events:
+        yield b"event: " + event["event"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+@router.post("/import/bulk")
+async def bulk_import_recipes(
+    request: RecipeBulkImportRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Import many URLs, streaming one event per URL as NDJSON, or SSE when asked for.
+
+    With ``background``, the import runs as a job instead: the response is a
+    202 pointing at the job, whose progress and result ``/api/jobs`` reports.
+    """
+    if len(request.urls) > settings.bulk_import_max_urls:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_import_max_urls} URLs per request")
+
+    if request.background:
+        # Not retried: a second attempt would save the recipes of the first again.
+        job = enqueue(db, "bulk_import", {"urls": request.urls, "save": request.save}, max_attempts=1)
+        await db.commit()
+        return await job_accepted(db, job)
+
+    matcher = await load_matcher(db)
+    # End the read transaction: the stream runs for minutes, and saving
+    # batches opens short transactions of its own.
+    await db.commit()
+    events = bulk_import(request.urls, matcher=matcher, session=db if request.save else None)
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        return StreamingResponse(
+            _server_sent_events(events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
 
 
 @router.post("/{recipe_id}/notes", response_model=RecipeNoteSchemaResponse, status_code=201)
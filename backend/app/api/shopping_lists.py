@@ -4,7 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 
 from app.core import get_db
-from app.models import Ingredient, MealPlan, RecipeIngredient, ShoppingList, ShoppingListItem
+from app.core.timing import TimedRoute
+from app.models import Ingredient, MealPlan, Recipe, RecipeIngredient, ShoppingList, ShoppingListItem
 from app.schemas import (
     GenerateShoppingListRequest,
     ShoppingListCreate,
@@ -13,7 +14,7 @@ from app.schemas import (
     ShoppingListResponse,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_shopping_list_response(shopping_list: ShoppingList) -> dict:
@@ -91,7 +92,11 @@ def delete_shopping_list(list_id: int, db: Session = Depends(get_db)):
 def generate_shopping_list(request: GenerateShoppingListRequest, db: Session = Depends(get_db)):
     meals = (
         db.query(MealPlan)
-        .options(joinedload(MealPlan.recipe).joinedload(RecipeIngredient.ingredient))
+        .options(
+            joinedload(MealPlan.recipe)
+            .joinedload(Recipe.ingredients)
+            .joinedload(RecipeIngredient.ingredient)
+        )
         .filter(MealPlan.date >= request.start_date, MealPlan.date <= request.end_date)
         .all()
     )
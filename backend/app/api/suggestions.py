@@ -1,29 +1,41 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.core import get_db
-from app.models import PantryItem, Recipe
+from app.core import get_read_db
+from app.core.timing import TimedRoute
+from app.models import PantryItem, Recipe, RecipeIngredient
 from app.schemas import RecipeSuggestion, SuggestionsResponse, MissingIngredient
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+
+def _numeric_quantity(quantity: str | None) -> float | None:
+    try:
+        return float(quantity) if quantity else None
+    except ValueError:
+        return None  # non-numeric quantities (e.g., "1/2", "to taste")
 
 
 @router.get("", response_model=SuggestionsResponse)
-def get_recipe_suggestions(
+async def get_recipe_suggestions(
     min_match_percentage: float = Query(default=0.5, ge=0, le=1),
     limit: int = Query(default=10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    pantry_items = db.query(PantryItem).all()
-    pantry_ingredient_ids = {item.ingredient_id for item in pantry_items}
+    pantry_ingredient_ids = set(await db.scalars(select(PantryItem.ingredient_id)))
 
-    recipes = (
-        db.query(Recipe)
-        .filter(Recipe.is_active.is_(True))
-        .options(joinedload(Recipe.ingredients), joinedload(Recipe.images))
+    result = await db.execute(
+        select(Recipe)
+        .where(Recipe.is_active.is_(True))
+        .options(
+            joinedload(Recipe.ingredients).joinedload(RecipeIngredient.ingredient),
+            joinedload(Recipe.images),
+        )
         .limit(500)
-        .all()
     )
+    recipes = result.unique().scalars().all()
 
     suggestions = []
     for recipe in recipes:
@@ -45,7 +57,7 @@ def get_recipe_suggestions(
             MissingIngredient(
                 ingredient_id=ri.ingredient_id,
                 ingredient_name=ri.ingredient.name,
-                required_quantity=float(ri.quantity) if ri.quantity else None,
+                required_quantity=_numeric_quantity(ri.quantity),
                 unit=ri.unit,
             )
             for ri in recipe.ingredients
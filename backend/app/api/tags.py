@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core import get_db
+from app.core.timing import TimedRoute
 from app.models import Tag
 from app.schemas import TagCreate, TagResponse
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=list[TagResponse])
@@ -1,14 +1,18 @@
 from .config import settings
-from .database import Base, get_db, engine
-from .enums import MealType, DifficultyLevel, IngredientCategory, DietaryTag
+from .database import Base, get_db, get_async_db, get_read_db, engine, async_engine
+from .enums import MealType, DifficultyLevel, IngredientCategory, DietaryTag, JobState
 
 __all__ = [
     "settings",
     "Base",
     "get_db",
+    "get_async_db",
+    "get_read_db",
     "engine",
+    "async_engine",
     "MealType",
     "DifficultyLevel",
     "IngredientCategory",
     "DietaryTag",
+    "JobState",
 ]
@@ -0,0 +1,279 @@
+"""Negotiated response compression and build-time precompression of static assets.
+
+Dynamic responses are compressed on the fly with zstd, brotli or gzip,
+whichever the client accepts first in that order. Static assets are
+compressed once at image build time:
+
+    python -m app.core.compression /app/static
+
+This writes ``.br`` and ``.gz`` siblings that ``SpaStaticFiles`` serves as
+they are.
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Server preference; the client's q-values only decide what is acceptable.
+ENCODINGS = ("zstd", "br", "gzip")
+# Cheap levels for per-request work. Static assets get the maximum instead.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "application/wasm",
+    "application/manifest+json",
+    "image/svg+xml",
+}
+# Event streams are flushed message by message and must not be buffered by a proxy.
+NEVER_COMPRESS_TYPES = {"text/event-stream"}
+# Extensions worth precompressing. Images, fonts and archives are compressed already.
+PRECOMPRESS_EXTENSIONS = {
+    ".html", ".js", ".mjs", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".wasm", ".webmanifest",
+}
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def parse_accept_encoding(header: str | None) -> dict[str, float]:
+    """Codings from an ``Accept-Encoding`` header mapped to their q-values."""
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(header: str | None, available: tuple[str, ...] = ENCODINGS) -> str | None:
+    """The first of ``available`` the client accepts, or ``None`` for identity."""
+    accepted = parse_accept_encoding(header)
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str | None) -> bool:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if not media_type or media_type in NEVER_COMPRESS_TYPES:
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """One-shot compression of a complete body at the per-request levels."""
+    if encoding == "zstd":
+        # Unlike the streaming API, this records the content size in the frame.
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+class _Compressor:
+    """Incremental compressor with a common interface over the three codecs."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compress ``data``; ``flush`` makes everything so far decodable."""
+        if self.encoding == "zstd":
+            out = self._zstd.compress(data)
+            return out + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._gzip.compress(data)
+        return out + self._gzip.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "zstd":
+            return self._zstd.compress(data) + self._zstd.flush()
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """Compresses compressible responses of at least ``minimum_size`` bytes.
+
+    Single-message responses are compressed in one go and keep an exact
+    ``Content-Length``. Streamed responses are compressed chunk by chunk and
+    flushed after every chunk, so progress streams stay live. Responses that
+    are already encoded, or carry a byte range, pass through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    "content-encoding" in headers
+                    # A range of the identity bytes; its Content-Range would not fit the encoded body.
+                    or "content-range" in headers
+                    or message["status"] in (204, 206, 304)
+                    or not is_compressible(headers.get("content-type"))
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                _add_vary(MutableHeaders(scope=message))
+                length = headers.get("content-length")
+                if length is not None and length.isdigit() and int(length) < self.minimum_size:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the start message until the first body chunk shows whether
+                # the response is small, complete or streamed.
+                start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                # e.g. http.response.pathsend, whose body the server sends directly.
+                if start is not None:
+                    response_start, start = start, None
+                    await send(response_start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(response_start)
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=response_start)
+                headers["content-encoding"] = encoding
+                _weaken_etag(headers)
+                # Ranges would index the encoded bytes, which differ on every request.
+                del headers["accept-ranges"]
+                if not more_body:
+                    compressed = compress(body, encoding)
+                    headers["content-length"] = str(len(compressed))
+                    await send(response_start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                del headers["content-length"]
+                compressor = _Compressor(encoding)
+                await send(response_start)
+
+            assert compressor is not None
+            chunk = compressor.compress(body, flush=True) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    # SpaStaticFiles sets Vary itself; list Accept-Encoding only once.
+    vary = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+    if not vary & {"accept-encoding", "*"}:
+        headers.add_vary_header("Accept-Encoding")
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    # The encoded bytes differ from the representation the strong tag names.
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+
+
+def precompress_file(path: Path, min_size: int) -> list[Path]:
+    """Write ``.br`` and ``.gz`` siblings of ``path`` when they save space."""
+    data = path.read_bytes()
+    if len(data) < min_size:
+        return []
+    written = []
+    encoded = {
+        "br": brotli.compress(data, quality=11),
+        "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    for encoding, payload in encoded.items():
+        target = path.with_name(path.name + PRECOMPRESSED_SUFFIXES[encoding])
+        # Not worth a second file (and a Vary split in caches) for a few percent.
+        if len(payload) < len(data) * 0.9:
+            target.write_bytes(payload)
+            # Same mtime as the original, so Last-Modified agrees across encodings.
+            source = path.stat()
+            os.utime(target, ns=(source.st_atime_ns, source.st_mtime_ns))
+            written.append(target)
+        elif target.exists():
+            target.unlink()
+    return written
+
+
+def precompress_directory(directory: Path, min_size: int) -> list[Path]:
+    written = []
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix.lower() in PRECOMPRESS_EXTENSIONS:
+            written.extend(precompress_file(path, min_size))
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write .br/.gz siblings for static assets.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--min-size", type=int, default=settings.compression_minimum_size)
+    args = parser.parse_args(argv)
+    written = precompress_directory(args.directory, args.min_size)
+    print(f"precompressed {len(written)} files in {args.directory}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
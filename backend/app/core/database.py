@@ -1,14 +1,54 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import Pool
 
 from .config import settings
+from .metrics import instrument_pool
+from .pool import pool_options
+from .replica import wrote_recently
 
-engine = create_engine(settings.database_url)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in ``url`` for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+engine = create_engine(settings.database_url, **pool_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+async_engine = create_async_engine(
+    async_database_url, **pool_options(async_database_url, use_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+if settings.database_read_url:
+    async_read_database_url = to_async_url(settings.database_read_url)
+    async_read_engine = create_async_engine(
+        async_read_database_url, **pool_options(async_read_database_url, use_async=True)
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_read_engine = None
+    AsyncReadSessionLocal = AsyncSessionLocal
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -16,3 +56,26 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the read replica, or the primary right after the client wrote."""
+    session_factory = AsyncSessionLocal if wrote_recently(request) else AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+def engine_pools() -> dict[str, Pool]:
+    pools = {"primary": engine.pool, "primary_async": async_engine.sync_engine.pool}
+    if async_read_engine is not None:
+        pools["replica_async"] = async_read_engine.sync_engine.pool
+    return pools
+
+
+for _name, _pool in engine_pools().items():
+    instrument_pool(_name, _pool)
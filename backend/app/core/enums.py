@@ -37,3 +37,10 @@ class DietaryTag(str, Enum):
     LOW_CARB = "low_carb"
     KETO = "keto"
     PALEO = "paleo"
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
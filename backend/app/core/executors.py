@@ -0,0 +1,74 @@
+"""Bounded worker pool for CPU-bound work called from async code.
+
+Parsing a large HTML page takes long enough to stall every request on the
+event loop. ``run_cpu_bound`` hands the call to a small pool instead:
+
+- ``thread`` (default): cheap to submit. lxml releases the GIL while
+  parsing, and the caller's context (trace spans, active profile) is
+  carried into the worker.
+- ``process``: full isolation from the event loop's GIL, at the cost of
+  pickling arguments and results. Spans opened inside the worker are not
+  recorded; wrap the call in a span on the calling side instead.
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from .config import settings
+from .profiling import register_current_thread
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+_lock = threading.Lock()
+
+
+def create_executor() -> Executor:
+    if settings.parse_executor == "process":
+        # Not fork: the parent has running threads (pool, exporter) that a fork would copy mid-state.
+        return ProcessPoolExecutor(
+            max_workers=settings.parse_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return ThreadPoolExecutor(max_workers=settings.parse_workers, thread_name_prefix="parse")
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = create_executor()
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _in_context(context: contextvars.Context, func: Callable[..., T], *args: Any) -> T:
+    def call() -> T:
+        register_current_thread()
+        return func(*args)
+
+    return context.run(call)
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    """Run ``func(*args)`` in the pool and await its result."""
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ThreadPoolExecutor):
+        call = functools.partial(_in_context, contextvars.copy_context(), func, *args)
+    else:
+        call = functools.partial(func, *args)
+    return await loop.run_in_executor(executor, call)
@@ -0,0 +1,212 @@
+"""On-disk cache of fetched recipe pages and their parsed results.
+
+Entries are keyed by normalized URL and stored one JSON file each, so
+every worker process shares the cache. A fresh entry is served without
+touching the network. A stale one is revalidated with ``If-None-Match`` /
+``If-Modified-Since``, and a ``304`` keeps the stored page and result.
+Freshness comes from the origin's ``Cache-Control: max-age``, or
+``fetch_cache_ttl_seconds`` when there is none.
+
+The directory is capped at ``fetch_cache_max_bytes``; the least recently
+used entries are evicted first. Each worker tracks its own view of the
+directory, so the cap is approximate when several workers write at once.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import orjson
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored result shape or the extractor changes; older entries
+# are re-parsed from their stored page.
+RESULT_VERSION = 1
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref"}
+
+
+def normalize_url(url: str) -> str:
+    """Cache key for ``url``: case, default port, fragment and tracking
+    parameters do not change which page is fetched."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.startswith("utm_") and name not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def freshness_lifetime(headers) -> float | None:
+    """Seconds a response may be served without revalidation, or None if it must not be stored."""
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    max_age = directives.get("max-age", "")
+    if max_age.isdigit():
+        return min(float(max_age), settings.fetch_cache_max_ttl_seconds)
+    return settings.fetch_cache_ttl_seconds
+
+
+@dataclass
+class CachedPage:
+    url: str
+    html: str
+    fresh_until: float
+    etag: str | None = None
+    last_modified: str | None = None
+    result: dict | None = None
+    version: int = RESULT_VERSION
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    @property
+    def has_current_result(self) -> bool:
+        return self.result is not None and self.version == RESULT_VERSION
+
+    def store_result(self, result: dict) -> None:
+        self.result = result
+        self.version = RESULT_VERSION
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, headers, lifetime: float) -> None:
+        self.fresh_until = time.time() + lifetime
+        self.etag = headers.get("etag", self.etag)
+        self.last_modified = headers.get("last-modified", self.last_modified)
+
+
+class FetchCache:
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> file size, least recently used first. Built on first use.
+        self._index: OrderedDict[str, int] | None = None
+        self._size = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def _ensure_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+            self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._size = sum(self._index.values())
+        return self._index
+
+    def _forget(self, key: str) -> None:
+        self._size -= self._index.pop(key, 0)
+
+    def get(self, url: str) -> CachedPage | None:
+        key = self.key(url)
+        path = self._path(key)
+        with self._lock:
+            index = self._ensure_index()
+            try:
+                data = path.read_bytes()
+                # The file's mtime is its last use, so the order survives restarts.
+                os.utime(path)
+            except FileNotFoundError:
+                self._forget(key)
+                return None
+            if key not in index:
+                # Written by another worker.
+                index[key] = len(data)
+                self._size += len(data)
+            index.move_to_end(key)
+        try:
+            return CachedPage(**orjson.loads(data))
+        except (orjson.JSONDecodeError, TypeError):
+            logger.warning("Dropping unreadable fetch cache entry %s", path)
+            self.delete(url)
+            return None
+
+    def put(self, page: CachedPage) -> None:
+        key = self.key(page.url)
+        path = self._path(key)
+        data = orjson.dumps(asdict(page))
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            index = self._ensure_index()
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._forget(key)
+            index[key] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def delete(self, url: str) -> None:
+        key = self.key(url)
+        with self._lock:
+            self._ensure_index()
+            self._path(key).unlink(missing_ok=True)
+            self._forget(key)
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._size -= size
+            self._path(key).unlink(missing_ok=True)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            self._ensure_index()
+            return self._size
+
+
+_cache: FetchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_fetch_cache() -> FetchCache | None:
+    """The process-wide cache, or None when ``fetch_cache_enabled`` is off."""
+    global _cache
+    if not settings.fetch_cache_enabled:
+        return None
+    directory = Path(settings.fetch_cache_dir)
+    with _cache_lock:
+        if _cache is None or _cache.directory != directory or _cache.max_bytes != settings.fetch_cache_max_bytes:
+            _cache = FetchCache(directory, settings.fetch_cache_max_bytes)
+        return _cache
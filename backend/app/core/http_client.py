@@ -0,0 +1,207 @@
+"""Application-wide outbound HTTP client.
+
+One ``httpx.AsyncClient`` per worker is opened in the app lifespan and shared
+by every import path, so repeated fetches from the same site reuse pooled
+keep-alive connections instead of paying DNS, TCP and TLS setup each time.
+Code running outside the app (scripts, tests without the lifespan) gets a
+short-lived client with the same settings from ``http_client()``.
+"""
+
+import asyncio
+import importlib.util
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; KitchenBuddy/1.0)"
+
+# Worth retrying: the server may well answer the same request later.
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+_client: httpx.AsyncClient | None = None
+
+
+class ResponseTooLarge(ValueError):
+    pass
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its per-host slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release, release = None, self._release
+                release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps concurrent requests per origin on top of the pool's global limit.
+
+    httpx only limits connections pool-wide, so a bulk import from one site
+    could otherwise take every connection and hammer that site.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int, pool_timeout: float | None) -> None:
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._pool_timeout = pool_timeout
+        self._slots: dict[tuple[bytes, bytes, int | None], asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        origin = (request.url.raw_scheme, request.url.raw_host, request.url.port)
+        slots = self._slots.get(origin)
+        if slots is None:
+            slots = self._slots[origin] = asyncio.Semaphore(self._max_per_host)
+        try:
+            async with asyncio.timeout(self._pool_timeout):
+                await slots.acquire()
+        except TimeoutError as exc:
+            raise httpx.PoolTimeout(f"No free connection slot for {request.url.host}", request=request) from exc
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slots.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slots.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("http_client_http2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    timeout = httpx.Timeout(
+        connect=settings.http_client_connect_timeout,
+        read=settings.http_client_read_timeout,
+        write=settings.http_client_write_timeout,
+        pool=settings.http_client_pool_timeout,
+    )
+    http2 = settings.http_client_http2 and _http2_available()
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_client_max_connections,
+            max_keepalive_connections=settings.http_client_max_keepalive_connections,
+            keepalive_expiry=settings.http_client_keepalive_expiry,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=HostLimitedTransport(
+            transport, settings.http_client_max_connections_per_host, settings.http_client_pool_timeout
+        ),
+        timeout=timeout,
+        follow_redirects=True,
+        max_redirects=5,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """The shared client, or a short-lived one when the lifespan has not run."""
+    if _client is not None:
+        yield _client
+        return
+    async with create_http_client() as client:
+        yield client
+
+
+async def _read_capped(response: httpx.Response, max_bytes: int) -> bytes:
+    declared = response.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseTooLarge(f"Response is larger than {max_bytes} bytes")
+    chunks, received = [], 0
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseTooLarge(f"Response is larger than {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def fetch(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str] | None = None,
+    max_bytes: int | None = None,
+    check_redirect: Callable[[str], None] | None = None,
+) -> httpx.Response:
+    """GET ``url`` and read at most ``max_bytes`` of (decoded) body.
+
+    Raises ``ResponseTooLarge`` as soon as the declared or received size
+    passes the cap, without buffering the rest. The cap applies after
+    decompression, so a small gzip bomb cannot get around it.
+
+    With ``check_redirect``, redirects are followed one hop at a time and
+    each target URL is passed to it before it is requested; it raises to
+    refuse the hop (a redirect to a private address, say).
+    """
+    if max_bytes is None:
+        max_bytes = settings.http_client_max_response_bytes
+    request = client.build_request("GET", url, headers=headers)
+    for _ in range(client.max_redirects + 1):
+        response = await client.send(request, stream=True, follow_redirects=check_redirect is None)
+        try:
+            if response.next_request is None:
+                content = await _read_capped(response, max_bytes)
+                break
+        finally:
+            await response.aclose()
+        request = response.next_request
+        check_redirect(str(request.url))
+    else:
+        raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+    # A plain, already decoded response, so .text and raise_for_status work as usual.
+    response_headers = httpx.Headers(response.headers)
+    for name in ("content-encoding", "content-length", "transfer-encoding"):
+        response_headers.pop(name, None)
+    return httpx.Response(
+        status_code=response.status_code,
+        headers=response_headers,
+        content=content,
+        request=response.request,
+    )
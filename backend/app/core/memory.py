@@ -0,0 +1,157 @@
+"""Heap diagnostics: tracemalloc snapshots, ORM identity maps and large buffers.
+
+Everything here is per worker process and walks the whole heap, so it is
+meant for occasional admin use, not for polling.
+"""
+
+import gc
+import secrets
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from .database import Base
+
+MAX_SNAPSHOTS = 10
+GROUP_BY = {"module": "filename", "line": "lineno"}
+
+_snapshots: OrderedDict[str, tuple[datetime, tracemalloc.Snapshot]] = OrderedDict()
+
+
+def tracemalloc_status() -> dict:
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": tracemalloc.is_tracing(),
+        "traced_current_kb": round(current / 1024, 1),
+        "traced_peak_kb": round(peak / 1024, 1),
+        "snapshots": [
+            {"id": snapshot_id, "taken_at": taken_at}
+            for snapshot_id, (taken_at, _) in _snapshots.items()
+        ],
+    }
+
+
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+
+
+def take_snapshot() -> str:
+    if not tracemalloc.is_tracing():
+        raise ValueError("tracemalloc is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+    )
+    snapshot_id = secrets.token_hex(4)
+    _snapshots[snapshot_id] = (datetime.now(timezone.utc), snapshot)
+    while len(_snapshots) > MAX_SNAPSHOTS:
+        _snapshots.popitem(last=False)
+    return snapshot_id
+
+
+def _snapshot(snapshot_id: str) -> tracemalloc.Snapshot:
+    if snapshot_id not in _snapshots:
+        raise KeyError(snapshot_id)
+    return _snapshots[snapshot_id][1]
+
+
+def _location(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff, group_by: str) -> str:
+    frame = stat.traceback[0]
+    return frame.filename if group_by == "module" else f"{frame.filename}:{frame.lineno}"
+
+
+def top_allocations(snapshot_id: str, group_by: str = "line", limit: int = 20) -> list[dict]:
+    stats = _snapshot(snapshot_id).statistics(GROUP_BY[group_by])
+    return [
+        {
+            "location": _location(stat, group_by),
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def diff_snapshots(
+    base_id: str, target_id: str, group_by: str = "line", limit: int = 20
+) -> list[dict]:
+    stats = _snapshot(target_id).compare_to(_snapshot(base_id), GROUP_BY[group_by])
+    return [
+        {
+            "location": _location(stat, group_by),
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def session_identity_maps() -> list[dict]:
+    """Live ORM sessions and what their identity maps hold.
+
+    AsyncSession wraps a regular Session, so async sessions show up here too.
+    """
+    sessions = [obj for obj in gc.get_objects() if isinstance(obj, Session)]
+    result = []
+    for session in sessions:
+        objects = list(session.identity_map.values())
+        result.append(
+            {
+                "session_id": hex(id(session)),
+                "size": len(objects),
+                "by_class": dict(Counter(type(obj).__name__ for obj in objects)),
+            }
+        )
+    return sorted(result, key=lambda s: s["size"], reverse=True)
+
+
+def largest_buffers(limit: int = 20, min_size: int = 1024) -> list[dict]:
+    """Largest live bytes/bytearray objects with a summary of what references them.
+
+    Buffers are not tracked by the garbage collector, so they are found
+    through the referents of tracked containers. A dict that is the
+    ``__dict__`` of a mapped instance is reported as that model's name.
+    """
+    objects = gc.get_objects()
+    instance_dicts = {
+        id(obj.__dict__): type(obj).__name__ for obj in objects if isinstance(obj, Base)
+    }
+    buffers: dict[int, dict] = {}
+    for obj in objects:
+        for ref in gc.get_referents(obj):
+            if type(ref) in (bytes, bytearray) and len(ref) >= min_size:
+                entry = buffers.setdefault(
+                    id(ref), {"type": type(ref).__name__, "size": len(ref), "referrers": Counter()}
+                )
+                entry["referrers"][instance_dicts.get(id(obj), type(obj).__name__)] += 1
+    del objects
+
+    largest = sorted(buffers.values(), key=lambda b: b["size"], reverse=True)[:limit]
+    return [
+        {"type": b["type"], "size": b["size"], "referrers": dict(b["referrers"])}
+        for b in largest
+    ]
+
+
+def loaded_attribute_bytes(model: type, attribute: str) -> dict:
+    """How many ``model`` instances are alive and how many have ``attribute`` loaded."""
+    instances = [obj for obj in gc.get_objects() if isinstance(obj, model)]
+    loaded = [obj.__dict__[attribute] for obj in instances if attribute in obj.__dict__]
+    return {
+        "model": model.__name__,
+        "attribute": attribute,
+        "instances": len(instances),
+        "loaded": len(loaded),
+        "loaded_bytes": sum(len(value) for value in loaded if value is not None),
+    }
@@ -0,0 +1,183 @@
+"""Prometheus metrics.
+
+Set ``PROMETHEUS_MULTIPROC_DIR`` to a writable, empty directory before the
+workers start to aggregate metrics across uvicorn workers.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .pool import InstrumentedPoolMixin
+from .sql_events import on_statement, statement_operation
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed", ["operation"])
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a free connection in the pool",
+    ["pool"],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_CONNECT = Histogram(
+    "db_pool_connect_seconds",
+    "Time spent opening a new connection when the pool grows",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Pool checkout timeouts", ["pool"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by outcome", ["cache", "result"])
+RECIPE_EXTRACTIONS = Counter(
+    "recipe_import_extractions_total", "Imported pages by extraction path", ["path"]
+)
+
+BULK_IMPORT_URLS = Counter(
+    "recipe_bulk_import_urls_total", "Bulk import URLs by outcome", ["status"]
+)
+RECIPE_IMAGE_FETCHES = Counter(
+    "recipe_image_fetches_total", "Imported recipe image downloads by outcome", ["status"]
+)
+JOB_RUNS = Counter("job_runs_total", "Background job attempts by kind and outcome", ["kind", "outcome"])
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Background job attempt duration",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_recipe_extraction(path: str) -> None:
+    RECIPE_EXTRACTIONS.labels(path).inc()
+
+
+def record_bulk_import(status: str) -> None:
+    BULK_IMPORT_URLS.labels(status).inc()
+
+
+def record_image_fetch(status: str) -> None:
+    RECIPE_IMAGE_FETCHES.labels(status).inc()
+
+
+def record_job(kind: str, outcome: str, seconds: float) -> None:
+    JOB_RUNS.labels(kind, outcome).inc()
+    JOB_DURATION.labels(kind).observe(seconds)
+
+
+@on_statement
+def _record_statement(conn, statement, parameters, elapsed):
+    operation = statement_operation(statement)
+    DB_STATEMENTS.labels(operation).inc()
+    DB_STATEMENT_DURATION.labels(operation).observe(elapsed)
+
+
+def instrument_pool(name: str, pool: Pool) -> None:
+    checked_out = POOL_CHECKED_OUT.labels(name)
+    event.listen(pool, "checkout", lambda *args: checked_out.inc())
+    event.listen(pool, "checkin", lambda *args: checked_out.dec())
+
+    if isinstance(pool, InstrumentedPoolMixin):
+        wait = POOL_WAIT.labels(name)
+        connects = POOL_CONNECT.labels(name)
+        timeouts = POOL_TIMEOUTS.labels(name)
+
+        def observe(elapsed: float, timed_out: bool, connect: float | None) -> None:
+            wait.observe(elapsed)
+            if connect is not None:
+                connects.observe(connect)
+            if timed_out:
+                timeouts.inc()
+
+        pool.wait_stats.observers.append(observe)
+
+
+def render_metrics() -> bytes:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def mark_worker_dead() -> None:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """Counts requests and records latency per route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # The router stores the matched route in the shared scope.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_DURATION.labels(method, route).observe(elapsed)
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from uuid import uuid4
+
+from sqlalchemy import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from .config import settings
+
+# Seconds spent opening new connections during the current checkout. Each
+# thread, and each asyncio task, checks out in its own context.
+_connect_time: ContextVar[float | None] = ContextVar("pool_connect_time", default=None)
+
+
+class PoolWaitStats:
+    """Checkout counters, time spent waiting for a free connection, and time spent opening new ones."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+        # Called with the wait, whether it timed out, and the connect time (None if none was opened).
+        self.observers: list[Callable[[float, bool, float | None], None]] = []
+
+    def record(self, elapsed: float, timed_out: bool = False, connect: float | None = None) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+            if connect is not None:
+                self.connects += 1
+                self.connect_total += connect
+                self.connect_max = max(self.connect_max, connect)
+        for observer in self.observers:
+            observer(elapsed, timed_out, connect)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_time_total_ms": round(self.wait_total * 1000, 3),
+                "wait_time_max_ms": round(self.wait_max * 1000, 3),
+                "connects": self.connects,
+                "connect_time_total_ms": round(self.connect_total * 1000, 3),
+                "connect_time_max_ms": round(self.connect_max * 1000, 3),
+            }
+
+
+class InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs) -> None:
+        self.wait_stats = PoolWaitStats()
+        super().__init__(*args, **kwargs)
+
+    def _do_get(self):
+        token = _connect_time.set(None)
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            connect = _connect_time.get()
+            _connect_time.reset(token)
+            # Growing the pool opens a connection inside _do_get; that is not queueing.
+            self.wait_stats.record(elapsed - (connect or 0.0), timed_out, connect)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            _connect_time.set((_connect_time.get() or 0.0) + time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, use_async: bool = False) -> dict:
+    """Engine keyword arguments for the pool configured in ``settings``."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single-connection default pool.
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_pgbouncer and use_async and parsed.get_backend_name() == "postgresql":
+        # PgBouncer in transaction mode hands each transaction to an arbitrary
+        # server connection, so asyncpg must not rely on named prepared statements.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
+def pool_status(name: str, pool: Pool) -> dict:
+    status = {
+        "name": name,
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+        "checkouts": None,
+        "timeouts": None,
+        "wait_time_total_ms": None,
+        "wait_time_max_ms": None,
+        "connects": None,
+        "connect_time_total_ms": None,
+        "connect_time_max_ms": None,
+    }
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, InstrumentedPoolMixin):
+        status.update(pool.wait_stats.snapshot())
+    return status
@@ -0,0 +1,231 @@
+"""On-demand sampling profiler for single requests.
+
+With ``profiling_enabled`` set, a request carrying ``?__profile=1`` or an
+``X-Profile: 1`` header plus a valid admin token is sampled while it runs.
+The profile is stored as speedscope JSON and collapsed stacks, and its id is
+returned in the ``X-Profile-Id`` response header.
+
+On the event loop thread only samples taken while the profiled request's
+task (or a task it started) runs are kept, so concurrent requests do not
+leak into the profile; before Python 3.12 only the request's own task is
+recognised. Threadpool threads are sampled from the moment the request
+first uses them until it ends, even if they serve another request
+meanwhile.
+"""
+
+import asyncio
+import json
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+PROFILE_QUERY_PARAM = "__profile"
+PROFILE_HEADER = "x-profile"
+FORMATS = {"speedscope": ".speedscope.json", "collapsed": ".collapsed.txt"}
+
+
+class ProfileSession:
+    """Samples the stacks of the threads serving one request."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.thread_ids = {threading.get_ident()}
+        # Set when created inside a task: the loop thread is then only
+        # sampled while that task, or one started from it, is running.
+        try:
+            self.loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+        self.task = asyncio.current_task() if self.loop is not None else None
+        self.loop_thread = threading.get_ident()
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._sampler.join()
+            self.duration = time.perf_counter() - self._start
+
+    def _owns(self, task: asyncio.Task | None) -> bool:
+        if task is None:
+            return False
+        get_context = getattr(task, "get_context", None)  # Python 3.12+
+        if get_context is None:
+            return task is self.task
+        return get_context().get(active_profile) is self
+
+    def _run(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == sampler_id:
+                    continue
+                if self.loop is not None and thread_id == self.loop_thread:
+                    if not self._owns(asyncio.current_task(self.loop)):
+                        continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.items())
+
+    def speedscope(self, name: str) -> dict:
+        frame_index: dict[str, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        interval_ms = self.interval * 1000
+        for stack, count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    func, _, location = frame.partition(" (")
+                    file, _, line = location.rstrip(")").rpartition(":")
+                    frames.append({"name": func, "file": file, "line": int(line)})
+                indexes.append(frame_index[frame])
+            samples.append(indexes)
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "kitchen-buddy",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+active_profile: ContextVar[ProfileSession | None] = ContextVar("active_profile", default=None)
+
+
+def register_current_thread() -> None:
+    """Include the calling thread (e.g. a threadpool worker) in the active profile."""
+    session = active_profile.get()
+    if session is not None:
+        session.thread_ids.add(threading.get_ident())
+
+
+def profile_dir() -> Path:
+    return Path(settings.profiling_output_dir)
+
+
+def save_profile(session: ProfileSession, method: str, route: str, path: str) -> str:
+    profile_id = f"{session.started_at:%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+    name = f"{method} {route} @ {session.started_at.isoformat()}"
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile_id}{FORMATS['speedscope']}").write_text(
+        json.dumps(session.speedscope(name)), encoding="utf-8"
+    )
+    (directory / f"{profile_id}{FORMATS['collapsed']}").write_text(
+        session.collapsed(), encoding="utf-8"
+    )
+    meta = {
+        "id": profile_id,
+        "method": method,
+        "route": route,
+        "path": path,
+        "started_at": session.started_at.isoformat(),
+        "duration_ms": round(session.duration * 1000, 3),
+        "samples": sum(session.samples.values()),
+    }
+    (directory / f"{profile_id}.meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return profile_id
+
+
+def list_profiles() -> list[dict]:
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    metas = [json.loads(p.read_text(encoding="utf-8")) for p in directory.glob("*.meta.json")]
+    return sorted(metas, key=lambda m: m["started_at"], reverse=True)
+
+
+def profile_path(profile_id: str, fmt: str) -> Path | None:
+    if fmt not in FORMATS or not profile_id.replace("-", "").isalnum():
+        return None
+    path = profile_dir() / f"{profile_id}{FORMATS[fmt]}"
+    return path if path.is_file() else None
+
+
+def wants_profile(scope: Scope) -> bool:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    headers = Headers(scope=scope)
+    if query.get(PROFILE_QUERY_PARAM, ["0"])[-1] != "1" and headers.get(PROFILE_HEADER) != "1":
+        return False
+    token = headers.get("x-admin-token")
+    return bool(
+        settings.admin_token and token and secrets.compare_digest(token, settings.admin_token)
+    )
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.profiling_enabled or not wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(settings.profiling_interval_ms / 1000)
+        token = active_profile.set(session)
+
+        finished = False
+
+        async def finish() -> str:
+            nonlocal finished
+            # Set before saving: if saving fails, the handler below must not try again.
+            finished = True
+            session.stop()
+            route = getattr(scope.get("route"), "path", scope["path"])
+            return await asyncio.to_thread(save_profile, session, scope["method"], route, scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile_id = await finish()
+                MutableHeaders(scope=message).append("x-profile-id", profile_id)
+            await send(message)
+
+        session.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            active_profile.reset(token)
+            if not finished:
+                await finish()
@@ -0,0 +1,53 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+STICKY_COOKIE = "kb_primary_until"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client wrote within the read-your-writes window."""
+    try:
+        until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so their reads stay on the primary.
+
+    Replicas lag the primary slightly; a successful write sets a short-lived
+    cookie that ``get_read_db`` checks before routing to the replica.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in READ_METHODS
+            or not settings.database_read_url
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.db_read_your_writes_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from .config import settings
+from .sql_events import on_statement, statement_operation
+from .timing import current_route
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    duration_ms: float
+    parameters: Any
+    route: str | None
+    plan: list[str] | None = None
+    recorded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Describe bound parameters by type only, so values never reach the log."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"executemany": len(parameters), "row": parameters_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def explain(conn, statement: str, parameters: Any) -> list[str] | None:
+    """Fetch the plan for ``statement`` on the connection that just ran it.
+
+    Only SELECTs are run with ANALYZE, which executes the statement again.
+    Postgres runs the EXPLAIN inside a savepoint so a failure cannot abort
+    the caller's transaction.
+    """
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        analyze = statement_operation(statement) == "SELECT"
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+
+    use_savepoint = dialect == "postgresql"
+    # The raw DBAPI cursor bypasses engine events, so this EXPLAIN is not itself logged.
+    cursor = conn.connection.cursor()
+    try:
+        if use_savepoint:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if use_savepoint:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            logger.debug("EXPLAIN failed for slow query", exc_info=True)
+            return None
+        if use_savepoint:
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+    finally:
+        cursor.close()
+
+    # SQLite returns (id, parent, notused, detail); Postgres one text column per line.
+    return [str(row[-1]) for row in rows]
+
+
+class SlowQueryLog:
+    def __init__(self, maxlen: int) -> None:
+        self._lock = threading.Lock()
+        self._records: deque[SlowQuery] = deque(maxlen=maxlen)
+        self._last_explained: dict[str, float] = {}
+
+    def should_explain(self, statement: str) -> bool:
+        """Rate-limit EXPLAIN to once per statement per interval."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explained.get(statement)
+            if last is not None and now - last < settings.slow_query_explain_interval_seconds:
+                return False
+            if len(self._last_explained) >= 1000:
+                self._last_explained.clear()
+            self._last_explained[statement] = now
+            return True
+
+    def add(self, record: SlowQuery) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(reversed(self._records))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._last_explained.clear()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_buffer_size)
+
+
+@on_statement
+def _record_slow_statement(conn, statement, parameters, elapsed):
+    if not settings.slow_query_log_enabled:
+        return
+    duration_ms = elapsed * 1000
+    if duration_ms < settings.slow_query_threshold_ms:
+        return
+
+    shape = parameters_shape(parameters)
+    plan = None
+    if (
+        settings.slow_query_explain
+        and not (isinstance(shape, dict) and "executemany" in shape)
+        and slow_query_log.should_explain(statement)
+    ):
+        plan = explain(conn, statement, parameters)
+
+    record = SlowQuery(
+        statement=statement,
+        duration_ms=round(duration_ms, 3),
+        parameters=shape,
+        route=current_route.get(),
+        plan=plan,
+    )
+    slow_query_log.add(record)
+    logger.warning(
+        "Slow query (%.1f ms) on %s: %s",
+        duration_ms,
+        record.route or "<no route>",
+        " ".join(statement.split())[:200],
+        extra={"slow_query": asdict(record)},
+    )
@@ -0,0 +1,41 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# Called with (connection, statement, parameters, elapsed seconds) after every
+# statement on any engine, including the sync engines behind AsyncEngine.
+StatementListener = Callable[[Connection, str, Any, float], None]
+
+_listeners: list[StatementListener] = []
+
+
+def on_statement(listener: StatementListener) -> StatementListener:
+    _listeners.append(listener)
+    return listener
+
+
+def statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in {"SELECT", "INSERT", "UPDATE", "DELETE"} else "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    for listener in _listeners:
+        listener(conn, statement, parameters, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    starts = context.connection.info.get("statement_start") if context.connection else None
+    if starts:
+        starts.pop()
@@ -0,0 +1,176 @@
+"""Serving the SPA bundle from a manifest built once at startup.
+
+Every file under the static directory, with its ``.br``/``.gz`` siblings,
+is indexed up front: size, mtime, a content-hash ETag, media type and cache
+policy. Requests are a dict lookup with no ``stat`` and no thread hop.
+Small files are kept in memory. Larger ones go out as ``FileResponse``, which
+uses the ASGI ``pathsend`` extension (``sendfile`` in servers that offer it)
+and otherwise streams in chunks.
+
+Paths that match no file and do not look like a file (no extension in the
+last segment) get ``index.html``, so client-side routes survive a reload.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .compression import PRECOMPRESS_EXTENSIONS, PRECOMPRESSED_SUFFIXES, negotiate
+from .config import settings
+
+# Vite emits content-hashed names (``index-BQx3kz1a.js``); SvelteKit puts them
+# under ``_app/immutable``. Either way the name changes when the content does.
+HASHED_NAME = re.compile(r"[.-](?=[A-Za-z0-9_-]*\d)[A-Za-z0-9_-]{8,}\.\w+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+INDEX = "index.html"
+# Unknown paths under these prefixes are real 404s, never the SPA shell.
+NO_FALLBACK_PREFIXES = ("api/", "_app/")
+
+
+def is_hashed_asset(path: str) -> bool:
+    return "/_app/immutable/" in "/" + path.replace(os.sep, "/") or bool(HASHED_NAME.search(os.path.basename(path)))
+
+
+@dataclass
+class Variant:
+    """One stored representation of an asset: the file itself or a precompressed sibling."""
+
+    path: str
+    stat: os.stat_result
+    etag: str
+    data: bytes | None = None
+
+
+@dataclass
+class StaticAsset:
+    media_type: str
+    last_modified: str
+    cache_control: str
+    # Keyed by content coding; ``None`` is the uncompressed file.
+    variants: dict[str | None, Variant] = field(default_factory=dict)
+
+    @property
+    def vary(self) -> bool:
+        return len(self.variants) > 1 or os.path.splitext(self.variants[None].path)[1].lower() in PRECOMPRESS_EXTENSIONS
+
+
+def _variant(path: Path, etag: str, inline_max_size: int) -> Variant:
+    stat = path.stat()
+    data = path.read_bytes() if stat.st_size <= inline_max_size else None
+    return Variant(path=str(path), stat=stat, etag=etag, data=data)
+
+
+def build_manifest(directory: str | os.PathLike, inline_max_size: int | None = None) -> dict[str, StaticAsset]:
+    """Index ``directory`` by the normalised relative paths ``StaticFiles.get_path`` produces.
+
+    ``about.html`` and ``about/index.html`` are also reachable as ``about``,
+    the way SvelteKit's static adapter writes prerendered pages.
+    """
+    if inline_max_size is None:
+        inline_max_size = settings.static_inline_max_size
+    root = Path(directory)
+    suffixes = set(PRECOMPRESSED_SUFFIXES.values())
+    manifest: dict[str, StaticAsset] = {}
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        # Siblings are attached to the file they encode, unless that file is gone.
+        if path.suffix in suffixes and path.with_suffix("").is_file():
+            continue
+        relative = os.path.normpath(path.relative_to(root))
+        digest = hashlib.blake2b(path.read_bytes(), digest_size=12).hexdigest()
+        asset = StaticAsset(
+            media_type=guess_type(path.name)[0] or "application/octet-stream",
+            last_modified=formatdate(path.stat().st_mtime, usegmt=True),
+            cache_control=IMMUTABLE_CACHE if is_hashed_asset(relative) else REVALIDATE_CACHE,
+        )
+        asset.variants[None] = _variant(path, f'"{digest}"', inline_max_size)
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                asset.variants[encoding] = _variant(sibling, f'"{digest}-{suffix[1:]}"', inline_max_size)
+
+        manifest[relative] = asset
+        if path.name == INDEX:
+            manifest.setdefault(os.path.dirname(relative) or ".", asset)
+        elif path.suffix == ".html":
+            manifest.setdefault(relative.removesuffix(".html"), asset)
+    return manifest
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: the compression middleware may have weakened the tag.
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class SpaStaticFiles(StaticFiles):
+    """``StaticFiles`` answering from a startup manifest, with an SPA fallback.
+
+    Hashed assets are cached for a year; ``index.html`` and other unhashed
+    files are revalidated against their ETag on every use.
+    """
+
+    def __init__(self, directory: str | os.PathLike, fallback: str = INDEX, **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.fallback_path = fallback
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the manifest after the directory changed."""
+        self.manifest = build_manifest(self.directory)
+        self.fallback = self.manifest.get(self.fallback_path)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        asset = self.manifest.get(path)
+        if asset is None:
+            route = path.replace(os.sep, "/")
+            if self.fallback is None or "." in route.rsplit("/", 1)[-1] or route.startswith(NO_FALLBACK_PREFIXES):
+                raise HTTPException(status_code=404)
+            asset = self.fallback
+        return self.asset_response(asset, Headers(scope=scope))
+
+    def asset_response(self, asset: StaticAsset, request_headers: Headers) -> Response:
+        encoding = negotiate(request_headers.get("accept-encoding"), tuple(e for e in asset.variants if e))
+        variant = asset.variants[encoding]
+        headers = {
+            "etag": variant.etag,
+            "last-modified": asset.last_modified,
+            "cache-control": asset.cache_control,
+        }
+        if asset.vary:
+            headers["vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+
+        if self._not_modified(asset, variant, request_headers):
+            return NotModifiedResponse(headers)
+        if variant.data is not None:
+            return Response(variant.data, headers=headers, media_type=asset.media_type)
+        return FileResponse(variant.path, headers=headers, media_type=asset.media_type, stat_result=variant.stat)
+
+    @staticmethod
+    def _not_modified(asset: StaticAsset, variant: Variant, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, variant.etag)
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            return parsedate_to_datetime(asset.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
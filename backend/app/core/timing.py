@@ -0,0 +1,137 @@
+import functools
+import inspect
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .profiling import register_current_thread
+from .sql_events import on_statement
+
+
+@dataclass
+class RequestTimings:
+    start: float
+    route_start: float | None = None
+    handler_start: float | None = None
+    handler_end: float | None = None
+    route_end: float | None = None
+    db: float = 0.0
+    db_count: int = 0
+
+    def server_timing(self, end: float) -> str:
+        metrics = []
+        if self.handler_start is not None and self.route_start is not None:
+            metrics.append(("deps", self.handler_start - self.route_start, None))
+        if self.handler_end is not None and self.handler_start is not None:
+            metrics.append(("handler", self.handler_end - self.handler_start, None))
+        metrics.append(("db", self.db, f"queries={self.db_count}"))
+        if self.route_end is not None and self.handler_end is not None:
+            metrics.append(("serialize", self.route_end - self.handler_end, None))
+        metrics.append(("total", end - self.start, None))
+        return ", ".join(
+            f'{name};dur={seconds * 1000:.2f}' + (f';desc="{desc}"' if desc else "")
+            for name, seconds, desc in metrics
+        )
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+# "METHOD /route/{template}" of the request being handled, for attributing SQL.
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+
+
+@on_statement
+def _record_statement(conn, statement, parameters, elapsed):
+    timings = request_timings.get()
+    if timings is not None:
+        timings.db += elapsed
+        timings.db_count += 1
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def timed(**kwargs):
+            timings = request_timings.get()
+            if timings is None:
+                return await call(**kwargs)
+            timings.handler_start = time.perf_counter()
+            try:
+                return await call(**kwargs)
+            finally:
+                timings.handler_end = time.perf_counter()
+
+        return timed
+
+    @functools.wraps(call)
+    def timed_sync(**kwargs):
+        register_current_thread()
+        timings = request_timings.get()
+        if timings is None:
+            return call(**kwargs)
+        timings.handler_start = time.perf_counter()
+        try:
+            return call(**kwargs)
+        finally:
+            timings.handler_end = time.perf_counter()
+
+    return timed_sync
+
+
+class TimedRoute(APIRoute):
+    """Route that records the matched route and marks where dependency solving,
+    the handler and serialization begin and end.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        route_label = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def timed_handler(request: Request) -> Response:
+            current_route.set(route_label)
+            timings = request_timings.get()
+            if timings is None:
+                return await handler(request)
+            timings.route_start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timings.route_end = time.perf_counter()
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """Adds a ``Server-Timing`` header with per-phase durations."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(start=time.perf_counter())
+        token = request_timings.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("server-timing", timings.server_timing(time.perf_counter()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
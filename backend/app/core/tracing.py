@@ -0,0 +1,281 @@
+"""Minimal in-process tracing.
+
+Each sampled request becomes a trace; SQL statements, outbound HTTP calls and
+anything wrapped in :func:`span` become child spans. Finished traces are
+written by a background thread to a JSONL file or POSTed as OTLP/HTTP JSON to
+a collector.
+"""
+
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .sql_events import on_statement, statement_operation
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "kitchen-buddy"
+OTLP_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass
+class Trace:
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    name: str
+    trace: Trace
+    parent_id: str | None = None
+    kind: str = "internal"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    error: str | None = None
+
+    def end(self, end_ns: int | None = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span | None]:
+    """Child span of the active span; a no-op outside a sampled trace."""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, parent.trace, parent.span_id, kind, attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = repr(exc)
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def record_span(name: str, duration: float, kind: str = "internal", **attributes: Any) -> None:
+    """Add an already finished span of ``duration`` seconds ending now."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    end_ns = time.time_ns()
+    child = Span(
+        name, parent.trace, parent.span_id, kind, attributes, start_ns=end_ns - int(duration * 1e9)
+    )
+    child.end(end_ns)
+
+
+@on_statement
+def _record_statement(conn, statement, parameters, elapsed):
+    record_span(
+        statement_operation(statement),
+        elapsed,
+        kind="client",
+        **{"db.system": conn.dialect.name, "db.statement": statement[:2000]},
+    )
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class JsonlExporter:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def export(self, spans: list[Span]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list[Span]) -> dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": _otlp_value(SERVICE_NAME)}]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SERVICE_NAME},
+                        "spans": [
+                            {
+                                "traceId": s.trace.trace_id,
+                                "spanId": s.span_id,
+                                "parentSpanId": s.parent_id or "",
+                                "name": s.name,
+                                "kind": OTLP_SPAN_KINDS[s.kind],
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": [
+                                    {"key": k, "value": _otlp_value(v)}
+                                    for k, v in s.attributes.items()
+                                ],
+                                "status": {"code": 2, "message": s.error} if s.error else {},
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class OtlpHttpExporter:
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.client = httpx.Client(timeout=5.0)
+
+    def export(self, spans: list[Span]) -> None:
+        self.client.post(self.endpoint, json=otlp_payload(spans)).raise_for_status()
+
+
+class BackgroundExporter:
+    """Hands finished traces to ``exporter`` on a daemon thread, dropping when backed up."""
+
+    def __init__(self, exporter: SpanExporter, max_queue: int = 1000) -> None:
+        self.exporter = exporter
+        self._queue: queue.Queue[list[Span]] = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: list[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("Trace export queue full, dropping trace")
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+            except Exception:
+                logger.exception("Failed to export trace")
+            finally:
+                self._queue.task_done()
+
+
+_exporter: BackgroundExporter | None = None
+
+
+def get_exporter() -> BackgroundExporter:
+    global _exporter
+    if _exporter is None:
+        if settings.tracing_exporter == "otlp":
+            exporter: SpanExporter = OtlpHttpExporter(settings.tracing_otlp_endpoint)
+        else:
+            exporter = JsonlExporter(settings.tracing_jsonl_path)
+        _exporter = BackgroundExporter(exporter)
+    return _exporter
+
+
+def set_exporter(exporter: SpanExporter) -> BackgroundExporter:
+    global _exporter
+    _exporter = BackgroundExporter(exporter)
+    return _exporter
+
+
+@contextmanager
+def start_trace(name: str, kind: str = "server", **attributes: Any) -> Iterator[Span | None]:
+    """Root span of a new trace, exported when it ends. Respects the sample rate."""
+    if random.random() >= settings.tracing_sample_rate:
+        yield None
+        return
+
+    root = Span(name, Trace(), kind=kind, attributes=attributes)
+    token = current_span.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.error = repr(exc)
+        raise
+    finally:
+        current_span.reset(token)
+        root.end()
+        get_exporter().export(root.trace.spans)
+
+
+class TracingMiddleware:
+    """Wraps each HTTP request in a root span named after its route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        with start_trace(f"{method} {scope['path']}", **{"http.method": method}) as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    root.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"{method} {route}"
+                    root.attributes["http.route"] = route
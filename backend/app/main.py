@@ -1,11 +1,49 @@
-from fastapi import FastAPI
+import secrets
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 
 from app.api import api_router
 from app.core import settings
+from app.core.compression import CompressionMiddleware
+from app.core.executors import shutdown_executor
+from app.core.http_client import close_http_client, start_http_client
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, mark_worker_dead, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.replica import ReadYourWritesMiddleware
+from app.core.static import SpaStaticFiles
+from app.core.timing import ServerTimingMiddleware
+from app.core.tracing import TracingMiddleware
+from app.services.jobs import start_job_workers, stop_job_workers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await start_job_workers()
+    try:
+        yield
+    finally:
+        await stop_job_workers()
+        await close_http_client()
+        shutdown_executor()
+        mark_worker_dead()
 
-app = FastAPI(title="Kitchen Buddy API", version="0.1.0")
 
+app = FastAPI(
+    title="Kitchen Buddy API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Innermost, so timing, tracing and metrics include the cost of compressing.
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -14,9 +52,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix="/api")
 
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: str | None = Header(default=None)):
+    # Route, pool and job internals: scraped with a token, like the admin API.
+    if not settings.metrics_enabled or not settings.metrics_token:
+        return Response(status_code=404)
+    if not authorization or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {settings.metrics_token}".encode()
+    ):
+        return Response(status_code=403)
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Mounted last: routes registered above take precedence over files, and any
+# other path without a file extension gets the SPA's index.html.
+if Path(settings.static_dir).is_dir():
+    app.mount("/", SpaStaticFiles(directory=settings.static_dir), name="static")
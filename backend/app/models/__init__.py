@@ -6,6 +6,8 @@ from .favorite import Favorite
 from .collection import Collection, RecipeCollection
 from .recipe_note import RecipeNote
 from .pantry import PantryItem
+from .job import Job
+from .vault_file import VaultFile
 
 __all__ = [
     "Recipe",
@@ -22,4 +24,6 @@ __all__ = [
     "RecipeCollection",
     "RecipeNote",
     "PantryItem",
+    "Job",
+    "VaultFile",
 ]
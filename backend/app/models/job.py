@@ -0,0 +1,27 @@
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String, Text, func
+
+from app.core import Base, JobState
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    state = Column(Enum(JobState), nullable=False, default=JobState.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # Earliest start, pushed back after a failed attempt. Naive UTC, like locked_until.
+    run_at = Column(DateTime, nullable=False)
+    locked_by = Column(String(100))
+    locked_until = Column(DateTime)
+    progress_done = Column(Integer)
+    progress_total = Column(Integer)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (Index("ix_jobs_state_run_at", "state", "run_at"),)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String, func
+
+from app.core import Base
+
+
+class VaultFile(Base):
+    # An Obsidian note synced by scripts/import_obsidian_recipes.py, and its recipe.
+    __tablename__ = "vault_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Relative to the vault root, with forward slashes.
+    path = Column(String(1024), nullable=False, unique=True)
+    mtime_ns = Column(BigInteger, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # SHA-256 of the file's bytes, hex.
+    content_hash = Column(String(64), nullable=False, index=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="SET NULL"))
+    synced_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -10,7 +10,9 @@ from .recipe import (
     RecipeNoteResponse,
     ScaledIngredientResponse,
     RecipeImportRequest,
+    RecipeBulkImportRequest,
     RecipeImportResponse,
+    ParsedIngredientResponse,
     RecipeNutritionResponse,
     RecipeCostResponse,
 )
@@ -44,6 +46,16 @@ from .suggestions import (
     RecipeSuggestion,
     SuggestionsResponse,
 )
+from .admin import (
+    AllocationStat,
+    LiveBuffersResponse,
+    PoolStatsResponse,
+    ProfileResponse,
+    SessionIdentityMap,
+    SlowQueryResponse,
+    TracemallocStatusResponse,
+)
+from .job import JobResponse
 
 __all__ = [
     "IngredientCreate",
@@ -60,7 +72,9 @@ __all__ = [
     "RecipeNoteResponse",
     "ScaledIngredientResponse",
     "RecipeImportRequest",
+    "RecipeBulkImportRequest",
     "RecipeImportResponse",
+    "ParsedIngredientResponse",
     "RecipeNutritionResponse",
     "RecipeCostResponse",
     "TagCreate",
@@ -91,4 +105,12 @@ __all__ = [
     "MissingIngredient",
     "RecipeSuggestion",
     "SuggestionsResponse",
+    "PoolStatsResponse",
+    "SlowQueryResponse",
+    "ProfileResponse",
+    "TracemallocStatusResponse",
+    "AllocationStat",
+    "SessionIdentityMap",
+    "LiveBuffersResponse",
+    "JobResponse",
 ]
@@ -0,0 +1,86 @@
+import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    name: str
+    pool_class: str
+    size: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    checkouts: int | None = None
+    timeouts: int | None = None
+    wait_time_total_ms: float | None = None
+    wait_time_max_ms: float | None = None
+    connects: int | None = None
+    connect_time_total_ms: float | None = None
+    connect_time_max_ms: float | None = None
+
+
+class SlowQueryResponse(BaseModel):
+    statement: str
+    duration_ms: float
+    parameters: Any
+    route: str | None
+    plan: list[str] | None
+    recorded_at: datetime.datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ProfileResponse(BaseModel):
+    id: str
+    method: str
+    route: str
+    path: str
+    started_at: datetime.datetime
+    duration_ms: float
+    samples: int
+
+
+class SnapshotInfo(BaseModel):
+    id: str
+    taken_at: datetime.datetime
+
+
+class TracemallocStatusResponse(BaseModel):
+    tracing: bool
+    traced_current_kb: float
+    traced_peak_kb: float
+    snapshots: list[SnapshotInfo]
+
+
+class AllocationStat(BaseModel):
+    location: str
+    size_kb: float
+    count: int
+    size_diff_kb: float | None = None
+    count_diff: int | None = None
+
+
+class SessionIdentityMap(BaseModel):
+    session_id: str
+    size: int
+    by_class: dict[str, int]
+
+
+class LiveBuffer(BaseModel):
+    type: str
+    size: int
+    referrers: dict[str, int]
+
+
+class LoadedAttributeBytes(BaseModel):
+    model: str
+    attribute: str
+    instances: int
+    loaded: int
+    loaded_bytes: int
+
+
+class LiveBuffersResponse(BaseModel):
+    buffers: list[LiveBuffer]
+    recipe_images: LoadedAttributeBytes
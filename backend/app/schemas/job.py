@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.core import JobState
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    state: JobState
+    attempts: int
+    max_attempts: int
+    progress_done: int | None
+    progress_total: int | None
+    result: dict[str, Any] | None
+    error: str | None
+    run_at: datetime.datetime
+    created_at: datetime.datetime | None
+    started_at: datetime.datetime | None
+    finished_at: datetime.datetime | None
+
+    model_config = {"from_attributes": True}
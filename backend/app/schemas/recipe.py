@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 from app.core import DietaryTag, DifficultyLevel
 
@@ -46,6 +46,15 @@ class RecipeNoteResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+def _http_url(v: str | None, field: str) -> str | None:
+    if v is None:
+        return v
+    parsed = urlparse(v)
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError(f"{field} must use http or https scheme")
+    return v
+
+
 class RecipeBase(BaseModel):
     title: str
     description: str | None = None
@@ -60,17 +69,19 @@ class RecipeBase(BaseModel):
     @field_validator("source_url")
     @classmethod
     def validate_source_url(cls, v: str | None) -> str | None:
-        if v is None:
-            return v
-        parsed = urlparse(v)
-        if parsed.scheme not in ("http", "https"):
-            raise ValueError("source_url must use http or https scheme")
-        return v
+        return _http_url(v, "source_url")
 
 
 class RecipeCreate(RecipeBase):
     ingredients: list[RecipeIngredientCreate] = []
     tag_ids: list[int] = []
+    # From the import preview; the server downloads it once the recipe is created.
+    image_url: str | None = None
+
+    @field_validator("image_url")
+    @classmethod
+    def validate_image_url(cls, v: str | None) -> str | None:
+        return _http_url(v, "image_url")
 
 
 class RecipeUpdate(BaseModel):
@@ -142,6 +153,24 @@ class RecipeImportRequest(BaseModel):
     url: str
 
 
+class RecipeBulkImportRequest(BaseModel):
+    urls: list[str] = Field(min_length=1)
+    save: bool = False
+    # Run as a job and answer 202 right away instead of streaming progress.
+    background: bool = False
+
+
+class ParsedIngredientResponse(BaseModel):
+    text: str
+    quantity: str | None = None
+    unit: str | None = None
+    name: str
+    notes: str | None = None
+    # Catalog match, ready for RecipeCreate.ingredients.
+    ingredient_id: int | None = None
+    ingredient_name: str | None = None
+
+
 class RecipeImportResponse(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -150,6 +179,7 @@ class RecipeImportResponse(BaseModel):
     cook_time_minutes: int | None = None
     servings: int | None = None
     ingredients: list[str] = []
+    parsed_ingredients: list[ParsedIngredientResponse] = []
     image_url: str | None = None
     source_url: str
 
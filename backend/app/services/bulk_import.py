@@ -0,0 +1,328 @@
+"""Bulk recipe import from many URLs.
+
+``bulk_import`` fetches every URL through ``import_recipe_from_url`` and
+yields progress events as each one finishes, in completion order:
+
+- at most ``bulk_import_concurrency`` pages are in flight at once;
+- requests to one host are spaced ``bulk_import_host_interval`` seconds
+  apart, on top of the HTTP client's per-host connection cap;
+- timeouts, connection errors, 429 and 5xx responses are retried with
+  jittered exponential backoff (or the server's ``Retry-After``);
+- a host whose URLs keep failing is skipped for a while instead of being
+  retried for every remaining URL; URLs waiting for their turn at that host
+  are reported skipped straight away.
+
+With a session, fetched recipes are saved as ``Recipe`` rows, with the
+ingredients that matched the catalog, in batches of ``bulk_import_batch_size``.
+Their images are downloaded afterwards by ``recipe_image`` jobs.
+
+``bulk_import_job`` runs the same import as a background job, reporting
+progress on the job instead of streaming events.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.fetch_cache import normalize_url
+from app.core.http_client import is_transient
+from app.core.metrics import record_bulk_import
+from app.models import Recipe, RecipeIngredient
+from app.services.ingredient_matching import IngredientMatcher, load_matcher, resolve_ingredients
+from app.services.jobs import JobContext, job_handler
+from app.services.recipe_images import enqueue_image_fetch
+from app.utils.recipe_import import import_recipe_from_url, validate_url
+
+logger = logging.getLogger(__name__)
+
+
+class HostPacer:
+    """Spaces request starts to each host at least ``interval`` seconds apart."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._next_start: dict[str, float] = {}
+
+    async def wait(self, host: str, interrupt: asyncio.Event | None = None) -> None:
+        """Wait for the host's next slot, or until ``interrupt`` is set."""
+        now = time.monotonic()
+        start = max(now, self._next_start.get(host, now))
+        # Reserved before sleeping, so concurrent callers queue up behind each other.
+        self._next_start[host] = start + self._interval
+        if start <= now:
+            return
+        if interrupt is None:
+            await asyncio.sleep(start - now)
+            return
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(start - now):
+                await interrupt.wait()
+
+    def forget(self, host: str) -> None:
+        """Drop the host's reserved slots, e.g. once its waiters have given up."""
+        self._next_start.pop(host, None)
+
+
+class HostCircuitBreaker:
+    """Stops calling a host after ``threshold`` consecutive failures.
+
+    After ``reset_after`` seconds the host is tried again; one more failure
+    opens the circuit again straight away.
+    """
+
+    def __init__(self, threshold: int, reset_after: float) -> None:
+        self._threshold = threshold
+        self._reset_after = reset_after
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._tripped: dict[str, asyncio.Event] = {}
+
+    def allow(self, host: str) -> bool:
+        open_until = self._open_until.get(host)
+        if open_until is None:
+            return True
+        if time.monotonic() < open_until:
+            return False
+        del self._open_until[host]
+        self._tripped.pop(host, None)
+        self._failures[host] = self._threshold - 1
+        return True
+
+    def tripped(self, host: str) -> asyncio.Event:
+        """Set when the host's circuit opens."""
+        return self._tripped.setdefault(host, asyncio.Event())
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(host, None)
+
+    def record_failure(self, host: str) -> bool:
+        """Count a failure; True when it opened the circuit."""
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if failures >= self._threshold and host not in self._open_until:
+            logger.warning("Bulk import: skipping %s for %ss after %d failures", host, self._reset_after, failures)
+            self._open_until[host] = time.monotonic() + self._reset_after
+            self.tripped(host).set()
+            return True
+        return False
+
+
+def retry_delay(exc: Exception, attempt: int) -> float:
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), settings.bulk_import_max_retry_delay)
+    delay = settings.bulk_import_retry_backoff * 2 ** (attempt - 1)
+    return min(delay * random.uniform(0.5, 1.0), settings.bulk_import_max_retry_delay)
+
+
+def describe_error(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"HTTP {exc.response.status_code}"
+    if isinstance(exc, httpx.TransportError):
+        return f"Could not fetch page ({type(exc).__name__})"
+    if isinstance(exc, ValueError):
+        return str(exc)
+    return "Failed to import recipe from URL"
+
+
+@dataclass
+class ImportOutcome:
+    index: int
+    url: str
+    status: str
+    attempts: int = 0
+    recipe: dict | None = None
+    error: str | None = None
+
+    def event(self) -> dict[str, Any]:
+        event = {"event": "result", "index": self.index, "url": self.url, "status": self.status, "attempts": self.attempts}
+        if self.recipe is not None:
+            event["recipe"] = self.recipe
+        if self.error is not None:
+            event["error"] = self.error
+        return event
+
+
+@dataclass
+class BulkImporter:
+    pacer: HostPacer = field(default_factory=lambda: HostPacer(settings.bulk_import_host_interval))
+    breaker: HostCircuitBreaker = field(
+        default_factory=lambda: HostCircuitBreaker(
+            settings.bulk_import_circuit_failures, settings.bulk_import_circuit_reset_seconds
+        )
+    )
+    slots: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(settings.bulk_import_concurrency))
+
+    async def import_one(self, index: int, url: str) -> ImportOutcome:
+        try:
+            validate_url(url)
+        except ValueError as exc:
+            return ImportOutcome(index, url, "failed", error=str(exc))
+        host = (urlparse(url).hostname or "").lower()
+
+        attempt = 0
+        while True:
+            # The first attempt waits its turn at the host; retries are
+            # spaced by their backoff rather than queueing up again.
+            if attempt == 0 and self.breaker.allow(host):
+                await self.pacer.wait(host, interrupt=self.breaker.tripped(host))
+            async with self.slots:
+                if not self.breaker.allow(host):
+                    return ImportOutcome(index, url, "skipped", attempt, error=f"Too many failures from {host}")
+                attempt += 1
+                try:
+                    recipe = await import_recipe_from_url(url)
+                except Exception as exc:
+                    error = exc
+                else:
+                    self.breaker.record_success(host)
+                    return ImportOutcome(index, url, "imported", attempt, recipe=recipe)
+
+            if not is_transient(error):
+                if not isinstance(error, (ValueError, httpx.HTTPError)):
+                    logger.error("Failed to import recipe from %s", url, exc_info=error)
+                return ImportOutcome(index, url, "failed", attempt, error=describe_error(error))
+            if attempt > settings.bulk_import_retries:
+                if self.breaker.record_failure(host):
+                    # Everyone queued for the host has just been woken up to skip.
+                    self.pacer.forget(host)
+                return ImportOutcome(index, url, "failed", attempt, error=describe_error(error))
+            await asyncio.sleep(retry_delay(error, attempt))
+
+
+def recipe_row(recipe: dict) -> Recipe:
+    return Recipe(
+        title=(recipe["title"] or recipe["source_url"])[:255],
+        description=recipe["description"],
+        instructions=recipe["instructions"],
+        prep_time_minutes=recipe["prep_time_minutes"],
+        cook_time_minutes=recipe["cook_time_minutes"],
+        servings=recipe["servings"],
+        source_url=recipe["source_url"],
+        ingredients=[
+            RecipeIngredient(
+                ingredient_id=line["ingredient_id"],
+                quantity=line["quantity"] and line["quantity"][:50],
+                unit=line["unit"],
+                notes=line["notes"] and line["notes"][:255],
+            )
+            for line in recipe.get("parsed_ingredients", [])
+            if line["ingredient_id"] is not None
+        ],
+    )
+
+
+async def save_batch(session: AsyncSession, outcomes: list[ImportOutcome]) -> dict[str, Any]:
+    rows = [recipe_row(outcome.recipe) for outcome in outcomes]
+    session.add_all(rows)
+    await session.flush()
+    for outcome, row in zip(outcomes, rows):
+        if outcome.recipe["image_url"]:
+            enqueue_image_fetch(session, row.id, outcome.recipe["image_url"])
+    await session.commit()
+    return {
+        "event": "saved",
+        "recipes": [
+            {
+                "index": outcome.index,
+                "url": outcome.url,
+                "recipe_id": row.id,
+            }
+            for outcome, row in zip(outcomes, rows)
+        ],
+    }
+
+
+async def bulk_import(
+    urls: list[str], matcher: IngredientMatcher | None = None, session: AsyncSession | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Import ``urls``, yielding ``result``, ``saved`` and a final ``done`` event.
+
+    With a ``matcher``, ingredient lines are parsed and matched to the
+    catalog; saved recipes get the matched ones. Repeated URLs are
+    imported once, compared as the fetch cache keys them (case, default
+    port, fragment and tracking parameters aside). Closing the iterator
+    cancels the imports still in flight.
+    """
+    importer = BulkImporter()
+    counts: Counter[str] = Counter()
+    seen: set[str] = set()
+    tasks = []
+    for index, url in enumerate(urls):
+        try:
+            key = normalize_url(url)
+        except ValueError:
+            key = url  # e.g. a bad port; import_one reports it
+        if key in seen:
+            counts["duplicate"] += 1
+            continue
+        seen.add(key)
+        tasks.append(asyncio.create_task(importer.import_one(index, url)))
+
+    pending: list[ImportOutcome] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            outcome = await next_done
+            if outcome.recipe is not None:
+                outcome.recipe["parsed_ingredients"] = resolve_ingredients(outcome.recipe["ingredients"], matcher)
+            counts[outcome.status] += 1
+            record_bulk_import(outcome.status)
+            yield outcome.event()
+
+            if session is not None and outcome.status == "imported":
+                pending.append(outcome)
+                if len(pending) >= settings.bulk_import_batch_size:
+                    batch, pending = pending, []
+                    saved = await save_batch(session, batch)
+                    counts["saved"] += len(batch)
+                    yield saved
+        if pending:
+            saved = await save_batch(session, pending)
+            counts["saved"] += len(pending)
+            yield saved
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "event": "done",
+        "total": len(urls),
+        **{key: counts[key] for key in ("imported", "failed", "skipped", "duplicate", "saved")},
+    }
+
+
+@job_handler("bulk_import")
+async def bulk_import_job(session: AsyncSession, payload: dict[str, Any], job: JobContext) -> dict[str, Any]:
+    urls = payload["urls"]
+    total = len(set(urls))
+    done = 0
+    recipe_ids: list[int] = []
+    failures: list[dict[str, Any]] = []
+    summary: dict[str, Any] = {}
+    await job.progress(0, total)
+    matcher = await load_matcher(session)
+    await session.commit()  # don't sit idle in a transaction while pages download
+    events = bulk_import(urls, matcher=matcher, session=session if payload["save"] else None)
+    async for event in events:
+        if event["event"] == "result":
+            done += 1
+            if "error" in event:
+                failures.append({"url": event["url"], "status": event["status"], "error": event["error"]})
+            await job.progress(done, total)
+        elif event["event"] == "saved":
+            recipe_ids.extend(saved["recipe_id"] for saved in event["recipes"])
+        else:
+            summary = {key: value for key, value in event.items() if key != "event"}
+    return {**summary, "recipe_ids": recipe_ids, "failures": failures}
@@ -0,0 +1,168 @@
+"""Match parsed ingredient names to ``Ingredient`` catalog rows.
+
+``IngredientMatcher`` indexes the catalog once, so matching a line is a few
+dictionary lookups rather than a query:
+
+1. exact match on the normalized name (case, accents, plurals folded);
+2. token index: the catalog entry sharing the most words with the line,
+   preferring entries whose every word appears ("black pepper" for
+   "freshly ground black pepper");
+3. fuzzy fallback: words missing from the catalog vocabulary are replaced
+   by their closest known word ("tomatos", Polish inflections like
+   "czosnku") and step 2 is retried.
+
+``load_matcher`` keeps one matcher per process and rebuilds it when the
+active catalog changes.
+"""
+
+import difflib
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Ingredient
+from app.utils.ingredient_parser import parse_ingredient_line
+
+NON_WORD = re.compile(r"[^\w%]+")
+FOLD = str.maketrans({"ł": "l", "ß": "ss", "æ": "ae", "ø": "o", "œ": "oe"})
+STOPWORDS = {"of", "and", "or", "the", "a", "an", "z", "i", "w", "na"}
+# Share of words two names need in common to match when the catalog name is not fully covered.
+MIN_DICE = 0.6
+FUZZY_CUTOFF = 0.8
+MAX_CACHED_NAMES = 10_000
+
+
+def singular(word: str) -> str:
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]
+    return word[:-1]
+
+
+def name_tokens(name: str) -> tuple[str, ...]:
+    folded = unicodedata.normalize("NFKD", name.casefold().translate(FOLD))
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return tuple(singular(word) for word in NON_WORD.split(folded) if word and word not in STOPWORDS)
+
+
+@dataclass(frozen=True)
+class IngredientMatch:
+    ingredient_id: int
+    name: str
+    method: str  # "exact", "tokens" or "fuzzy"
+
+
+class IngredientMatcher:
+    def __init__(self, ingredients: Iterable[tuple[int, str]]) -> None:
+        self._names: dict[int, str] = {}
+        self._tokens: dict[int, frozenset[str]] = {}
+        self._exact: dict[tuple[str, ...], int] = {}
+        self._by_token: dict[str, list[int]] = {}
+        for ingredient_id, name in ingredients:
+            tokens = name_tokens(name)
+            if not tokens:
+                continue
+            self._names[ingredient_id] = name
+            self._tokens[ingredient_id] = frozenset(tokens)
+            self._exact.setdefault(tokens, ingredient_id)
+            for token in set(tokens):
+                self._by_token.setdefault(token, []).append(ingredient_id)
+        self._vocabulary = list(self._by_token)
+        self._corrections: dict[str, str | None] = {}
+        self._matches: dict[str, IngredientMatch | None] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _best(self, tokens: frozenset[str]) -> int | None:
+        candidates: dict[int, int] = {}
+        for token in tokens:
+            for ingredient_id in self._by_token.get(token, ()):
+                candidates[ingredient_id] = candidates.get(ingredient_id, 0) + 1
+        best, best_rank = None, None
+        for ingredient_id, shared in candidates.items():
+            size = len(self._tokens[ingredient_id])
+            covered = shared == size
+            dice = 2 * shared / (size + len(tokens))
+            if not covered and dice < MIN_DICE:
+                continue
+            rank = (covered, shared, dice)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = ingredient_id, rank
+        return best
+
+    def _correct(self, token: str) -> str | None:
+        if token not in self._corrections:
+            close = difflib.get_close_matches(token, self._vocabulary, n=1, cutoff=FUZZY_CUTOFF) if len(token) > 3 else []
+            self._corrections[token] = close[0] if close else None
+        return self._corrections[token]
+
+    def _match(self, name: str) -> IngredientMatch | None:
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        exact = self._exact.get(tokens)
+        if exact is not None:
+            return IngredientMatch(exact, self._names[exact], "exact")
+        token_set = frozenset(tokens)
+        found = self._best(token_set)
+        if found is not None:
+            return IngredientMatch(found, self._names[found], "tokens")
+
+        corrected = {token if token in self._by_token else self._correct(token) for token in token_set}
+        corrected.discard(None)
+        if corrected and corrected != token_set:
+            found = self._best(frozenset(corrected))
+            if found is not None:
+                return IngredientMatch(found, self._names[found], "fuzzy")
+        return None
+
+    def match(self, name: str) -> IngredientMatch | None:
+        if name in self._matches:
+            return self._matches[name]
+        if len(self._matches) >= MAX_CACHED_NAMES:
+            self._matches.clear()
+        result = self._matches[name] = self._match(name)
+        return result
+
+
+def resolve_ingredients(lines: list[str], matcher: IngredientMatcher | None) -> list[dict]:
+    """Parse ``lines`` and attach the matching catalog ingredient, if any."""
+    resolved = []
+    for line in lines:
+        parsed = parse_ingredient_line(line)
+        match = matcher.match(parsed["name"]) if matcher and parsed["name"] else None
+        resolved.append(
+            {
+                "text": line,
+                **parsed,
+                "ingredient_id": match.ingredient_id if match else None,
+                "ingredient_name": match.name if match else None,
+            }
+        )
+    return resolved
+
+
+_matcher: IngredientMatcher | None = None
+_signature: tuple | None = None
+
+
+async def load_matcher(session: AsyncSession) -> IngredientMatcher:
+    """Matcher over the active catalog, rebuilt only when the catalog changed."""
+    global _matcher, _signature
+    active = Ingredient.is_active.is_(True)
+    counts = await session.execute(
+        select(func.count(Ingredient.id), func.max(Ingredient.id), func.max(Ingredient.updated_at)).where(active)
+    )
+    signature = (str(session.bind.url), *counts.one())
+    if _matcher is None or signature != _signature:
+        rows = (await session.execute(select(Ingredient.id, Ingredient.name).where(active))).all()
+        _matcher, _signature = IngredientMatcher(rows), signature
+    return _matcher
@@ -0,0 +1,283 @@
+"""Persistent background jobs.
+
+Work that would hold a request open for seconds (downloading images, bulk
+imports) is stored as a ``Job`` row and run by workers instead:
+
+- ``enqueue`` adds the row to the caller's session, so a job is committed
+  together with the data it refers to, or not at all;
+- a worker claims the oldest due job with a single ``UPDATE ... RETURNING``
+  whose subquery takes the row ``FOR UPDATE SKIP LOCKED`` on Postgres, so
+  workers never queue up behind each other's locks. SQLite has no row
+  locks but runs one writer at a time, which makes the same statement
+  atomic there;
+- a claim is a lease. A running job whose worker stops reporting for
+  ``jobs_lease_seconds`` is claimed again, so a crashed worker loses
+  nothing; handlers must therefore tolerate running twice;
+- a failed attempt is retried after a jittered exponential backoff until
+  the job's ``max_attempts`` is used up, then the job is marked failed;
+- a job cancelled at shutdown is handed back without using up an attempt,
+  unless it was enqueued with ``max_attempts=1``: it may have had side
+  effects by then and must not run twice, so it is marked failed.
+
+Handlers are registered per kind with ``@job_handler("kind")``. Each run
+gets a session of its own and a ``JobContext`` to report progress on;
+what it returns is stored as the job's result.
+
+Workers run inside the app process (``start_job_workers``, from the
+lifespan) or separately with ``python -m app.worker``.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import os
+import random
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core import JobState
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import record_job
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Progress is written at most this often, apart from the final count.
+PROGRESS_INTERVAL = 1.0
+
+Handler = Callable[[AsyncSession, dict[str, Any], "JobContext"], Awaitable[dict[str, Any] | None]]
+HANDLERS: dict[str, Handler] = {}
+
+_worker_ids = itertools.count(1)
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(handler: Handler) -> Handler:
+        HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+def utcnow() -> datetime:
+    # Naive, like every DateTime column in the schema.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue(
+    session: Session | AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    max_attempts: int | None = None,
+    delay: float = 0.0,
+) -> Job:
+    """Add a job to ``session``; workers see it once the session commits."""
+    job = Job(
+        kind=kind,
+        payload=payload,
+        state=JobState.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.jobs_max_attempts,
+        run_at=utcnow() + timedelta(seconds=delay),
+    )
+    session.add(job)
+    return job
+
+
+def retry_delay(attempt: int) -> float:
+    delay = settings.jobs_retry_backoff * 2 ** (attempt - 1)
+    return min(delay * random.uniform(0.5, 1.0), settings.jobs_max_retry_delay)
+
+
+async def claim_job(session: AsyncSession, worker: str) -> Job | None:
+    """Lease the oldest due job to ``worker``, or return None when there is none."""
+    now = utcnow()
+    due = or_(
+        and_(Job.state == JobState.QUEUED, Job.run_at <= now),
+        and_(Job.state == JobState.RUNNING, Job.locked_until < now),
+    )
+    next_job = (
+        select(Job.id)
+        .where(due)
+        .order_by(Job.run_at, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    job = await session.scalar(
+        update(Job)
+        .where(Job.id == next_job)
+        .values(
+            state=JobState.RUNNING,
+            attempts=Job.attempts + 1,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=settings.jobs_lease_seconds),
+            started_at=now,
+        )
+        .returning(Job)
+    )
+    await session.commit()
+    return job
+
+
+class JobContext:
+    """What a handler knows about the job it runs, and how it reports progress."""
+
+    def __init__(self, worker: "JobWorker", job: Job) -> None:
+        self.id: int = job.id
+        self.attempt: int = job.attempts
+        self._worker = worker
+        self._last_report = 0.0
+
+    async def progress(self, done: int, total: int | None = None) -> None:
+        """Record progress, which also renews the lease."""
+        now = time.monotonic()
+        if now - self._last_report < PROGRESS_INTERVAL and done != total:
+            return
+        self._last_report = now
+        values: dict[str, Any] = {"progress_done": done}
+        if total is not None:
+            values["progress_total"] = total
+        await self._worker.update(self.id, **values)
+
+
+class JobWorker:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal, name: str | None = None):
+        self.session_factory = session_factory
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{next(_worker_ids)}"
+
+    async def update(self, job_id: int, **values: Any) -> bool:
+        """Update a job this worker holds; False when the lease went to another worker."""
+        if values.get("state", JobState.RUNNING) == JobState.RUNNING:
+            values.setdefault("locked_until", utcnow() + timedelta(seconds=settings.jobs_lease_seconds))
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.state == JobState.RUNNING, Job.locked_by == self.name)
+                .values(**values)
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def run_once(self) -> bool:
+        """Claim and run one job; False when none was due."""
+        async with self.session_factory() as session:
+            job = await claim_job(session, self.name)
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def run_job(self, job: Job) -> None:
+        handler = HANDLERS.get(job.kind)
+        if job.attempts > job.max_attempts:
+            # Claimed again after its worker stopped mid-way through the last attempt.
+            await self._fail(job, "Worker stopped during the last attempt", retry=False)
+            return
+        if handler is None:
+            await self._fail(job, f"No handler for job kind {job.kind!r}", retry=False)
+            return
+
+        logger.info("Job %s (%s) attempt %d/%d on %s", job.id, job.kind, job.attempts, job.max_attempts, self.name)
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                result = await handler(session, job.payload, JobContext(self, job))
+        except asyncio.CancelledError:
+            with contextlib.suppress(Exception):
+                if job.max_attempts == 1:
+                    await self._fail(
+                        job, "Worker stopped during the only attempt", retry=False, elapsed=time.perf_counter() - start
+                    )
+                else:
+                    # Shutting down: hand the job back without using up an attempt.
+                    await self.update(
+                        job.id, state=JobState.QUEUED, attempts=job.attempts - 1, locked_by=None, locked_until=None
+                    )
+            raise
+        except Exception as exc:
+            logger.warning("Job %s (%s) attempt %d failed", job.id, job.kind, job.attempts, exc_info=True)
+            await self._fail(job, f"{type(exc).__name__}: {exc}", retry=True, elapsed=time.perf_counter() - start)
+            return
+
+        await self.update(
+            job.id,
+            state=JobState.SUCCEEDED,
+            result=result,
+            error=None,
+            locked_until=None,
+            finished_at=utcnow(),
+        )
+        record_job(job.kind, "succeeded", time.perf_counter() - start)
+
+    async def _fail(self, job: Job, error: str, retry: bool, elapsed: float = 0.0) -> None:
+        if retry and job.attempts < job.max_attempts:
+            await self.update(
+                job.id,
+                state=JobState.QUEUED,
+                error=error,
+                run_at=utcnow() + timedelta(seconds=retry_delay(job.attempts)),
+                locked_by=None,
+                locked_until=None,
+            )
+            record_job(job.kind, "retried", elapsed)
+            return
+        await self.update(job.id, state=JobState.FAILED, error=error, locked_until=None, finished_at=utcnow())
+        record_job(job.kind, "failed", elapsed)
+        logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.kind, job.attempts, error)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Run jobs until ``stop`` is set, polling while the queue is empty."""
+        while not stop.is_set():
+            try:
+                ran = await self.run_once()
+            except Exception:
+                logger.exception("Job worker %s could not claim a job", self.name)
+                ran = False
+            if not ran:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(stop.wait(), settings.jobs_poll_interval)
+
+    async def drain(self) -> int:
+        """Run jobs until none is due, returning how many ran."""
+        count = 0
+        while await self.run_once():
+            count += 1
+        return count
+
+
+_stop: asyncio.Event | None = None
+_workers: list[asyncio.Task] = []
+
+
+async def start_job_workers(count: int | None = None) -> None:
+    global _stop
+    count = settings.jobs_workers if count is None else count
+    if _workers or count <= 0:
+        return
+    _stop = asyncio.Event()
+    for _ in range(count):
+        worker = JobWorker()
+        _workers.append(asyncio.create_task(worker.run(_stop), name=f"job-worker {worker.name}"))
+
+
+async def stop_job_workers(timeout: float = 10.0) -> None:
+    """Let running jobs finish for up to ``timeout`` seconds, then hand them back."""
+    if _stop is None or not _workers:
+        return
+    _stop.set()
+    workers = list(_workers)
+    _workers.clear()
+    _, still_running = await asyncio.wait(workers, timeout=timeout)
+    for task in still_running:
+        task.cancel()
+    await asyncio.gather(*still_running, return_exceptions=True)
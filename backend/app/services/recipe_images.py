@@ -0,0 +1,153 @@
+"""Download imported recipes' images on the server.
+
+The importer only returns ``image_url``. Instead of the browser fetching it
+and uploading the same bytes back, saving an imported recipe enqueues a
+``recipe_image`` job (see ``app.services.jobs``), so the response does not
+wait; the job downloads the image and stores it as the recipe's primary
+image:
+
+- at most ``image_fetch_concurrency`` downloads run at once per worker;
+- every redirect target goes through the same ``validate_url`` checks as
+  the original URL;
+- bodies over ``MAX_IMAGE_BYTES`` are cut off, and the type is read from
+  the file's signature rather than the server's Content-Type, keeping only
+  the types ``upload_recipe_image`` accepts.
+
+Transient failures are retried by the job queue; others are logged and
+counted, the recipe is saved either way.
+"""
+
+import asyncio
+import logging
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.http_client import fetch, http_client, is_transient
+from app.core.metrics import record_image_fetch
+from app.models import Job, Recipe, RecipeImage
+from app.services.jobs import JobContext, enqueue, job_handler
+from app.utils.recipe_import import validate_url
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+
+class UnsupportedImage(ValueError):
+    pass
+
+
+def sniff_image_type(data: bytes) -> str | None:
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+async def add_recipe_image(
+    session: AsyncSession, recipe_id: int, data: bytes, mime_type: str, is_primary: bool
+) -> RecipeImage:
+    if is_primary:
+        await session.execute(
+            update(RecipeImage)
+            .where(RecipeImage.recipe_id == recipe_id, RecipeImage.is_primary.is_(True))
+            .values(is_primary=False)
+        )
+
+    max_order = await session.scalar(
+        select(func.count()).select_from(RecipeImage).where(RecipeImage.recipe_id == recipe_id)
+    )
+
+    image = RecipeImage(
+        recipe_id=recipe_id,
+        data=data,
+        mime_type=mime_type,
+        is_primary=is_primary,
+        sort_order=max_order,
+    )
+    session.add(image)
+    await session.commit()
+    await session.refresh(image)
+    return image
+
+
+# One semaphore per event loop: a semaphore is bound to the loop it first waits on.
+_download_slots: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+
+def download_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _download_slots.get(loop)
+    if slots is None:
+        slots = _download_slots[loop] = asyncio.Semaphore(settings.image_fetch_concurrency)
+    return slots
+
+
+async def download_image(url: str) -> tuple[bytes, str]:
+    """Image bytes at ``url`` and their MIME type.
+
+    Raises ``ValueError`` for a refused URL or redirect, an oversized body
+    or an unsupported type, and ``httpx.HTTPError`` when the download fails.
+    """
+    validate_url(url)
+    async with download_slots():
+        async with http_client() as client:
+            response = await fetch(
+                client,
+                url,
+                headers={"Accept": ", ".join(IMAGE_TYPES)},
+                max_bytes=MAX_IMAGE_BYTES,
+                check_redirect=validate_url,
+            )
+    response.raise_for_status()
+    mime_type = sniff_image_type(response.content)
+    if mime_type is None:
+        raise UnsupportedImage(f"Not a JPEG, PNG or WebP image ({response.headers.get('content-type')})")
+    return response.content, mime_type
+
+
+async def fetch_recipe_image(session: AsyncSession, recipe_id: int, url: str) -> str:
+    """Download ``url`` and store it as the recipe's image, returning the outcome.
+
+    Timeouts, connection errors, 429 and 5xx responses are raised, so the
+    job is retried; anything else is logged and counted.
+    """
+    try:
+        data, mime_type = await download_image(url)
+    except (ValueError, httpx.HTTPError) as exc:
+        if is_transient(exc):
+            raise
+        status = "rejected" if isinstance(exc, ValueError) else "failed"
+        record_image_fetch(status)
+        logger.warning("Could not fetch image %s for recipe %s: %s", url, recipe_id, exc)
+        return status
+
+    if await session.get(Recipe, recipe_id) is None:
+        record_image_fetch("skipped")
+        return "skipped"
+    # An image uploaded while this one downloaded keeps its place.
+    has_primary = await session.scalar(
+        select(RecipeImage.id).where(RecipeImage.recipe_id == recipe_id, RecipeImage.is_primary.is_(True)).limit(1)
+    )
+    await add_recipe_image(session, recipe_id, data, mime_type, is_primary=has_primary is None)
+    record_image_fetch("stored")
+    return "stored"
+
+
+def enqueue_image_fetch(session: Session | AsyncSession, recipe_id: int, url: str) -> Job:
+    return enqueue(session, "recipe_image", {"recipe_id": recipe_id, "url": url})
+
+
+@job_handler("recipe_image")
+async def recipe_image_job(session: AsyncSession, payload: dict[str, Any], job: JobContext) -> dict[str, Any]:
+    return {"status": await fetch_recipe_image(session, payload["recipe_id"], payload["url"])}
@@ -0,0 +1,186 @@
+"""Split free-text ingredient lines into quantity, unit, name and notes.
+
+``parse_ingredient_line("1 1/2 cups finely chopped onions")`` gives
+``{"quantity": "1 1/2", "unit": "cup", "name": "onions", "notes": "finely chopped"}``.
+
+Quantities keep the written form ``scale_quantity`` understands, with
+unicode fractions, ``1\\2`` and decimal commas rewritten and ranges joined
+with ``-``. Units are reduced to one canonical spelling per measure,
+English and Polish alike, so shopping lists can add them up.
+"""
+
+import re
+
+UNICODE_FRACTIONS = {
+    "½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅕": "1/5", "⅖": "2/5",
+    "⅗": "3/5", "⅘": "4/5", "⅙": "1/6", "⅚": "5/6", "⅛": "1/8", "⅜": "3/8", "⅝": "5/8", "⅞": "7/8",
+}
+
+UNITS = {
+    "g": ("g", "gr", "gram", "grams", "gramy", "gramów"),
+    "dag": ("dag", "dkg"),
+    "kg": ("kg", "kilogram", "kilograms"),
+    "mg": ("mg",),
+    "ml": ("ml", "milliliter", "milliliters", "millilitre", "millilitres", "mililitr", "mililitrów"),
+    "l": ("l", "liter", "liters", "litre", "litres", "litr", "litry", "litrów"),
+    "cup": ("cup", "cups", "c"),
+    "tbsp": ("tbsp", "tbsps", "tbs", "tablespoon", "tablespoons"),
+    "tsp": ("tsp", "tsps", "teaspoon", "teaspoons"),
+    "oz": ("oz", "ounce", "ounces"),
+    "fl oz": ("fl oz", "fluid ounce", "fluid ounces"),
+    "lb": ("lb", "lbs", "pound", "pounds"),
+    "pinch": ("pinch", "pinches"),
+    "dash": ("dash", "dashes"),
+    "handful": ("handful", "handfuls"),
+    "bunch": ("bunch", "bunches"),
+    "sprig": ("sprig", "sprigs"),
+    "clove": ("clove", "cloves"),
+    "slice": ("slice", "slices"),
+    "can": ("can", "cans", "tin", "tins"),
+    "package": ("package", "packages", "pkg", "packet", "packets"),
+    "stick": ("stick", "sticks"),
+    "łyżka": ("łyżka", "łyżki", "łyżek", "łyż"),
+    "łyżeczka": ("łyżeczka", "łyżeczki", "łyżeczek", "łyżecz"),
+    "szklanka": ("szklanka", "szklanki", "szklanek"),
+    "szczypta": ("szczypta", "szczypty", "szczypt"),
+    "garść": ("garść", "garście", "garści"),
+    "ząbek": ("ząbek", "ząbki", "ząbków"),
+    "opakowanie": ("opakowanie", "opakowania", "opakowań", "op"),
+    "puszka": ("puszka", "puszki", "puszek"),
+    "pęczek": ("pęczek", "pęczki", "pęczków"),
+    "plaster": ("plaster", "plastry", "plastrów"),
+}
+UNIT_ALIASES = {alias: unit for unit, aliases in UNITS.items() for alias in aliases}
+# Measures that read naturally without an amount: "pinch of nutmeg".
+UNCOUNTED_UNITS = {"pinch", "dash", "handful", "szczypta", "garść"}
+
+WORD_NUMBERS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "half": "1/2", "dozen": "12",
+}
+
+# Leading words that describe the ingredient's preparation or size rather than name it.
+MODIFIERS = {
+    "finely", "roughly", "coarsely", "thinly", "thickly", "freshly", "lightly", "firmly", "well",
+    "chopped", "diced", "minced", "sliced", "grated", "crushed", "softened", "melted", "beaten",
+    "peeled", "shredded", "cubed", "halved", "quartered", "trimmed", "rinsed", "drained",
+    "packed", "sifted", "toasted", "cooked", "julienned", "zested", "pitted", "deseeded",
+    "large", "medium", "small", "heaped", "heaping", "level", "scant", "generous",
+    "posiekana", "posiekany", "posiekane", "starta", "starty", "drobno", "duża", "duży", "duże",
+    "mała", "mały", "małe", "średnia", "średni", "średnie",
+}
+
+_AMOUNT = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?"
+QUANTITY = re.compile(rf"({_AMOUNT})(?:\s*(?:-|–|—|to|do)\s*({_AMOUNT}))?\s*")
+WORD = re.compile(r"([^\W\d_]+)\.?(?:\s+|$)")
+PARENTHETICAL = re.compile(r"\s*\(([^)]*)\)")
+TRAILING_NOTE = re.compile(
+    r"[\s,]+(to taste|as needed|for (?:frying|serving|garnish|greasing|dusting|decoration)"
+    r"|optional|do smaku|do podania|do smażenia|opcjonalnie)$",
+    re.IGNORECASE,
+)
+BULLET = re.compile(r"^(?:[-*+•]\s+)?(?:\[[ xX]?\]\s+)?")
+WIKI_LINK = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]")
+FRACTION_CHARS = re.compile("(\\d)?\\s*([" + "".join(UNICODE_FRACTIONS) + "])")
+
+
+def _unicode_fraction(match: re.Match) -> str:
+    whole = match.group(1)
+    fraction = UNICODE_FRACTIONS[match.group(2)]
+    return f"{whole} {fraction}" if whole else f" {fraction}"
+
+
+def normalize_line(line: str) -> str:
+    line = BULLET.sub("", line.strip())
+    if "[[" in line:
+        line = WIKI_LINK.sub(r"\1", line)
+    if FRACTION_CHARS.search(line):
+        line = FRACTION_CHARS.sub(_unicode_fraction, line)
+    # Written as "1\2" in the Obsidian vault; "⁄" is the unicode fraction slash.
+    line = line.replace("\\", "/").replace("⁄", "/")
+    return " ".join(line.split())
+
+
+def _clean_amount(amount: str) -> str:
+    return " ".join(amount.replace(",", ".").split())
+
+
+def _unit_at(text: str, pos: int) -> tuple[str, int, bool] | None:
+    """Canonical unit starting at ``pos``, the position after it, and whether "of" followed."""
+    match = WORD.match(text, pos)
+    if not match:
+        return None
+    word = match.group(1).lower()
+    end = match.end()
+    if word in ("fl", "fluid"):
+        following = WORD.match(text, end)
+        if following and following.group(1).lower() in ("oz", "ounce", "ounces"):
+            word, end = "fl oz", following.end()
+    unit = UNIT_ALIASES.get(word)
+    if unit is None:
+        return None
+    if text.startswith("of ", end):
+        return unit, end + 3, True
+    return unit, end, False
+
+
+def parse_ingredient_line(line: str) -> dict:
+    text = normalize_line(line)
+    quantity = unit = None
+    notes: list[str] = []
+    pos = 0
+
+    match = QUANTITY.match(text)
+    if match:
+        quantity = _clean_amount(match.group(1))
+        if match.group(2):
+            quantity = f"{quantity}-{_clean_amount(match.group(2))}"
+        pos = match.end()
+    else:
+        first = WORD.match(text)
+        if first:
+            word = first.group(1).lower()
+            if word in ("a", "an") and _unit_at(text, first.end()):
+                quantity, pos = "1", first.end()
+            elif word in WORD_NUMBERS:
+                quantity, pos = WORD_NUMBERS[word], first.end()
+
+    # "1 (14 oz) can tomatoes": the size belongs to the unit, not the name.
+    size = PARENTHETICAL.match(text, pos)
+    if quantity and size:
+        notes.append(size.group(1).strip())
+        pos = size.end() + (1 if text[size.end():size.end() + 1] == " " else 0)
+
+    found = _unit_at(text, pos)
+    if found and (quantity or found[0] in UNCOUNTED_UNITS or found[2]):
+        unit, pos = found[0], found[1]
+
+    rest = text[pos:]
+    if "(" in rest:
+        notes.extend(note.strip() for note in PARENTHETICAL.findall(rest) if note.strip())
+        rest = PARENTHETICAL.sub("", rest)
+    name, _, after_comma = rest.partition(",")
+    trailing = TRAILING_NOTE.search(name)
+    if trailing:
+        name = name[: trailing.start()]
+
+    words = name.split()
+    if len(words) > 1 and words[0].lower() in ("a", "an", "of"):
+        words.pop(0)
+    leading = []
+    while len(words) > 1 and words[0].lower() in MODIFIERS:
+        leading.append(words.pop(0))
+    if leading:
+        notes.insert(0, " ".join(leading))
+    if after_comma.strip():
+        notes.append(after_comma.strip())
+    if trailing:
+        notes.append(trailing.group(1))
+
+    return {
+        "quantity": quantity,
+        "unit": unit,
+        "name": " ".join(words),
+        "notes": ", ".join(notes) or None,
+    }
@@ -1,17 +1,36 @@
+import asyncio
+import html as html_entities
 import ipaddress
+import json
 import logging
 import re
+import time
+from collections.abc import Iterator
 from typing import Any
 from urllib.parse import urlparse
 
 import extruct
-import httpx
-from bs4 import BeautifulSoup
+import orjson
+from extruct.utils import parse_html
+
+from app.core.config import settings
+from app.core.executors import run_cpu_bound
+from app.core.fetch_cache import CachedPage, FetchCache, freshness_lifetime, get_fetch_cache
+from app.core.http_client import fetch, http_client
+from app.core.metrics import record_cache_lookup, record_recipe_extraction
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
 BLOCKED_HOSTS = {"localhost", "127.0.0.1", "0.0.0.0", "169.254.169.254"}
 
+# Script contents are raw text in HTML, so the first closing tag ends the block.
+JSONLD_SCRIPT = re.compile(
+    r"""<script\b[^>]*?\btype\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+TITLE_TAG = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
 
 def is_private_ip(host: str) -> bool:
     try:
@@ -26,6 +45,8 @@ def validate_url(url: str) -> None:
     if parsed.scheme not in ("http", "https"):
         raise ValueError("Only http and https URLs are allowed")
     host = parsed.hostname or ""
+    if host.lower() in settings.recipe_import_allowed_hosts:
+        return
     if host.lower() in BLOCKED_HOSTS:
         raise ValueError("URL host is not allowed")
     if is_private_ip(host):
@@ -97,47 +118,65 @@ def parse_servings(yield_value: Any) -> int | None:
     return None
 
 
+def is_recipe_type(value: Any) -> bool:
+    """``Recipe``, ``schema:Recipe`` or ``https://schema.org/Recipe``, alone or in a list."""
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(t, str) and re.split(r"[/:]", t)[-1] == "Recipe" for t in types)
+
+
 def extract_recipe_from_jsonld(data: list[dict]) -> dict | None:
     for item in data:
-        if item.get("@type") == "Recipe":
+        if not isinstance(item, dict):
+            continue
+        if is_recipe_type(item.get("@type")):
             return item
         if isinstance(item.get("@graph"), list):
             for graph_item in item["@graph"]:
-                if graph_item.get("@type") == "Recipe":
+                if isinstance(graph_item, dict) and is_recipe_type(graph_item.get("@type")):
                     return graph_item
     return None
 
 
 def extract_recipe_from_microdata(data: list[dict]) -> dict | None:
     for item in data:
+        # extruct's uniform output flattens properties next to "@type".
+        if is_recipe_type(item.get("@type")):
+            return item
         if "Recipe" in str(item.get("type", [])):
             return item.get("properties", {})
     return None
 
 
-async def import_recipe_from_url(url: str) -> dict:
-    validate_url(url)
-    async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; KitchenBuddy/1.0)",
-            "Accept": "text/html,application/xhtml+xml",
-        }
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        html = response.text
-
-    soup = BeautifulSoup(html, "html.parser")
-    metadata = extruct.extract(
-        html,
-        base_url=url,
-        syntaxes=["json-ld", "microdata"],
-        uniform=True,
-    )
+def iter_jsonld(html: str) -> Iterator[Any]:
+    """Top-level items of every ``application/ld+json`` script, without building a DOM.
+
+    Blocks that are not valid JSON are skipped; the full parser in
+    ``parse_recipe_html`` has more lenient recovery for those.
+    """
+    for match in JSONLD_SCRIPT.finditer(html):
+        script = match.group(1)
+        try:
+            data = orjson.loads(script)
+        except orjson.JSONDecodeError:
+            try:
+                # Raw control characters inside strings, as extruct accepts.
+                data = json.loads(script, strict=False)
+            except ValueError:
+                continue
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
 
-    recipe_data = extract_recipe_from_jsonld(
-        metadata.get("json-ld", [])
-    ) or extract_recipe_from_microdata(metadata.get("microdata", []))
 
+def page_title(html: str) -> str | None:
+    match = TITLE_TAG.search(html)
+    if match is None:
+        return None
+    return html_entities.unescape(match.group(1)).strip()
+
+
+def recipe_fields(recipe_data: dict | None, url: str) -> dict:
     result = {
         "title": None,
         "description": None,
@@ -171,9 +210,109 @@ async def import_recipe_from_url(url: str) -> dict:
         elif isinstance(image, dict):
             result["image_url"] = image.get("url")
 
+    return result
+
+
+def parse_recipe_html(html: str, url: str) -> dict:
+    """Extract a recipe from a fetched page with a full parse.
+
+    The page is parsed once with lxml, and the JSON-LD, microdata and
+    ``<title>`` lookups all read that tree.
+    """
+    with span("parse.lxml", **{"html.length": len(html)}):
+        tree = parse_html(html, encoding="UTF-8")
+    with span("parse.extruct"):
+        metadata = extruct.extract(
+            tree,
+            base_url=url,
+            syntaxes=["json-ld", "microdata"],
+            uniform=True,
+        )
+
+    recipe_data = extract_recipe_from_jsonld(
+        metadata.get("json-ld", [])
+    ) or extract_recipe_from_microdata(metadata.get("microdata", []))
+    result = recipe_fields(recipe_data, url)
+
     if not result["title"]:
-        title_tag = soup.find("title")
-        if title_tag:
-            result["title"] = title_tag.get_text().strip()
+        title_tag = next(tree.iter("title"), None)
+        if title_tag is not None:
+            result["title"] = title_tag.text_content().strip()
+
+    return result
+
 
+def extract_recipe(html: str, url: str) -> tuple[dict, str]:
+    """Extract a recipe, returning it with the path that found it.
+
+    CPU-bound and free of I/O so it can run in a worker pool. Most sites
+    embed a JSON-LD Recipe, which is found by scanning for its script tags
+    (``"jsonld"``). Only pages without one pay for the full DOM parse and
+    microdata extraction (``"full"``).
+    """
+    with span("parse.jsonld", **{"html.length": len(html)}):
+        recipe_data = extract_recipe_from_jsonld(iter_jsonld(html))
+    if recipe_data is None:
+        return parse_recipe_html(html, url), "full"
+    result = recipe_fields(recipe_data, url)
+    if not result["title"]:
+        result["title"] = page_title(html)
+    return result, "jsonld"
+
+
+async def _parse(html: str, url: str) -> dict:
+    with span("parse", executor=settings.parse_executor) as parse_span:
+        result, path = await run_cpu_bound(extract_recipe, html, url)
+        if parse_span:
+            parse_span.attributes["recipe.extraction"] = path
+    record_recipe_extraction(path)
+    logger.debug("Extracted recipe from %s via %s", url, path)
+    return result
+
+
+async def _from_cache(cache: FetchCache, page: CachedPage) -> dict:
+    if not page.has_current_result:
+        page.store_result(await _parse(page.html, page.url))
+        await asyncio.to_thread(cache.put, page)
+    return page.result
+
+
+async def import_recipe_from_url(url: str) -> dict:
+    validate_url(url)
+    cache = get_fetch_cache()
+    cached = await asyncio.to_thread(cache.get, url) if cache else None
+    if cached is not None and cached.is_fresh():
+        record_cache_lookup("recipe_pages", hit=True)
+        return await _from_cache(cache, cached)
+
+    headers = {"Accept": "text/html,application/xhtml+xml"}
+    if cached is not None:
+        headers.update(cached.validators())
+    async with http_client() as client:
+        with span("GET", kind="client", **{"http.method": "GET", "http.url": url}) as http_span:
+            response = await fetch(client, url, headers=headers, check_redirect=validate_url)
+            if http_span:
+                http_span.attributes["http.status_code"] = response.status_code
+
+    lifetime = freshness_lifetime(response.headers) if cache else None
+    if response.status_code == 304 and cached is not None:
+        record_cache_lookup("recipe_pages", hit=True)
+        cached.revalidated(response.headers, lifetime or 0.0)
+        await asyncio.to_thread(cache.put, cached)
+        return await _from_cache(cache, cached)
+    if cache:
+        record_cache_lookup("recipe_pages", hit=False)
+    response.raise_for_status()
+
+    result = await _parse(response.text, url)
+    if lifetime is not None:
+        page = CachedPage(
+            url=url,
+            html=response.text,
+            fresh_until=time.time() + lifetime,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            result=result,
+        )
+        await asyncio.to_thread(cache.put, page)
     return result
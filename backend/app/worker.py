@@ -0,0 +1,54 @@
+"""Run background jobs outside the web processes.
+
+    python -m app.worker                # until SIGINT or SIGTERM
+    python -m app.worker --workers 8
+    python -m app.worker --drain        # run the jobs that are due, then exit
+
+Set ``JOBS_WORKERS=0`` for the web processes when jobs run here instead.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+import app.services.bulk_import  # noqa: F401  (registers the job handlers)
+import app.services.recipe_images  # noqa: F401
+from app.core.config import settings
+from app.core.executors import shutdown_executor
+from app.core.http_client import close_http_client, start_http_client
+from app.services.jobs import JobWorker
+
+logger = logging.getLogger("app.worker")
+
+
+async def run(workers: int, drain: bool) -> None:
+    await start_http_client()
+    try:
+        if drain:
+            counts = await asyncio.gather(*(JobWorker().drain() for _ in range(workers)))
+            logger.info("Ran %d jobs", sum(counts))
+            return
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        logger.info("Running %d job workers", workers)
+        # Running jobs finish before the workers return.
+        await asyncio.gather(*(JobWorker().run(stop) for _ in range(workers)))
+    finally:
+        await close_http_client()
+        shutdown_executor()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.jobs_workers or 4)
+    parser.add_argument("--drain", action="store_true", help="exit once no job is due")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run(args.workers, args.drain))
+
+
+if __name__ == "__main__":
+    main()
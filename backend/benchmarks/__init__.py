@@ -0,0 +1,4 @@
+"""Performance tooling for the Kitchen Buddy backend.
+
+Run modules from the ``backend`` directory, e.g. ``python -m benchmarks.endpoints``.
+"""
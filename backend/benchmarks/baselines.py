@@ -0,0 +1,366 @@
+"""Frozen copies of the benchmarked code paths as they were first measured.
+
+Optimised versions in ``app`` and ``scripts`` are measured against these, and
+``python -m benchmarks.micro --check`` verifies they still produce the same
+output on the corpus. Do not edit: the point is a fixed reference.
+"""
+
+import re
+from fractions import Fraction
+from pathlib import Path
+from typing import Any
+
+import extruct
+from bs4 import BeautifulSoup
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas import RecipeListResponse
+
+
+def scale_quantity(quantity: str | None, original_servings: int, target_servings: int) -> str | None:
+    if not quantity or original_servings == target_servings:
+        return quantity
+
+    scale_factor = Fraction(target_servings, original_servings)
+
+    pattern = r"(\d+/\d+|\d+\.?\d*)"
+    matches = re.findall(pattern, quantity)
+
+    if not matches:
+        return quantity
+
+    result = quantity
+    for match in matches:
+        if "/" in match:
+            original_value = Fraction(match)
+        else:
+            original_value = Fraction(match).limit_denominator()
+
+        scaled_value = original_value * scale_factor
+
+        if scaled_value.denominator == 1:
+            scaled_str = str(scaled_value.numerator)
+        else:
+            scaled_float = float(scaled_value)
+            if scaled_float == int(scaled_float):
+                scaled_str = str(int(scaled_float))
+            else:
+                scaled_str = f"{scaled_float:.2f}".rstrip("0").rstrip(".")
+
+        result = result.replace(match, scaled_str, 1)
+
+    return result
+
+
+def parse_duration(duration: str | None) -> int | None:
+    if not duration:
+        return None
+    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$", duration)
+    if match:
+        hours = int(match.group(1) or 0)
+        minutes = int(match.group(2) or 0)
+        seconds = int(match.group(3) or 0)
+        total_minutes = hours * 60 + minutes
+        if seconds > 0:
+            total_minutes += 1
+        return total_minutes
+    return None
+
+
+def parse_instructions(instructions: Any) -> str | None:
+    if not instructions:
+        return None
+    if isinstance(instructions, str):
+        return instructions.strip()
+    if isinstance(instructions, list):
+        steps = []
+        for i, item in enumerate(instructions, 1):
+            if isinstance(item, str):
+                steps.append(f"{i}. {item.strip()}")
+            elif isinstance(item, dict):
+                text = item.get("text") or item.get("name", "")
+                if text:
+                    steps.append(f"{i}. {text.strip()}")
+        return "\n".join(steps)
+    return None
+
+
+def parse_servings(yield_value: Any) -> int | None:
+    if not yield_value:
+        return None
+    if isinstance(yield_value, int):
+        return yield_value
+    if isinstance(yield_value, str):
+        match = re.search(r"\d+", yield_value)
+        if match:
+            return int(match.group())
+    if isinstance(yield_value, list) and yield_value:
+        return parse_servings(yield_value[0])
+    return None
+
+
+def parse_obsidian_recipe(file_path: Path) -> dict:
+    """Parse Obsidian markdown recipe file."""
+    content = file_path.read_text(encoding="utf-8")
+
+    # Remove frontmatter if present
+    content = re.sub(r'^---\s*\n.*?\n---\s*\n', '', content, flags=re.DOTALL)
+
+    # Extract title from H1 or filename
+    title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+    title = title_match.group(1).strip() if title_match else file_path.stem
+    has_title_header = bool(title_match)
+
+    # Extract ingredients section
+    ingredients = []
+    # Try with header first
+    ingredients_match = re.search(
+        r'##\s+ingredients\s*\n(.*?)(?=\n##|\Z)',
+        content,
+        re.IGNORECASE | re.DOTALL
+    )
+    if ingredients_match:
+        ingredients_text = ingredients_match.group(1)
+        # Extract list items, remove wiki-links [[...]]
+        ingredient_lines = re.findall(r'^[-*]\s+(.+)$', ingredients_text, re.MULTILINE)
+        if ingredient_lines:
+            ingredients = [re.sub(r'\[\[(.+?)\]\]', r'\1', line.strip()) for line in ingredient_lines]
+        else:
+            # Fallback: try plain text lines (non-empty lines that aren't headers)
+            lines = [l.strip() for l in ingredients_text.split('\n')
+                    if l.strip() and not l.strip().startswith('#')]
+            if lines:
+                ingredients = [re.sub(r'\[\[(.+?)\]\]', r'\1', line) for line in lines]
+    else:
+        # Try to extract all bullet points after title (if no ingredients header)
+        # Look for list items before any other header or end of file
+        if has_title_header:
+            after_title = re.search(r'^#\s+.+?\n(.*?)(?=\n##|\Z)', content, re.DOTALL)
+            text = after_title.group(1) if after_title else ""
+        else:
+            # No title header, extract from beginning of content
+            text = content
+
+        if text:
+            ingredient_lines = re.findall(r'^[-*]\s+(.+)$', text, re.MULTILINE)
+            # Only consider it ingredients if we have some lines
+            if ingredient_lines:
+                ingredients = [re.sub(r'\[\[(.+?)\]\]', r'\1', line.strip()) for line in ingredient_lines]
+            else:
+                # Last fallback: try plain text lines after title
+                lines = [l.strip() for l in text.split('\n')
+                        if l.strip() and not l.strip().startswith('#')]
+                # Heuristic: extract lines that look like ingredients (short, contain quantities)
+                ingredient_pattern = r'^[\d/]+\s*(?:[\d/]+)?\s*(?:to\s+[\d/]+\s+)?(?:cups?|tablespoons?|teaspoons?|g|grams?|ml|oz|lbs?|kg|mg|pinch|dash|stick|package)?'
+                ingredient_candidates = []
+                for line in lines:
+                    # Match if: starts with quantity, or short line with quantity anywhere, or in file with no header
+                    has_quantity = bool(re.search(r'\d+\s*(?:ml|g|cup|tsp|tbsp|oz|lb|kg|mg)', line, re.IGNORECASE))
+                    if len(line) < 200 and (re.match(ingredient_pattern, line, re.IGNORECASE) or
+                                            re.match(r'^[\d.]+\s*[a-z]*\s+\w+', line) or
+                                            (not has_title_header and (has_quantity or len(line) < 100))):
+                        ingredient_candidates.append(line)
+                    elif len(ingredient_candidates) > 0 and len(line) > 100:
+                        # Long line after ingredients likely means instructions started
+                        break
+                if ingredient_candidates and 1 <= len(ingredient_candidates) <= 25:
+                    ingredients = [re.sub(r'\[\[(.+?)\]\]', r'\1', line) for line in ingredient_candidates]
+
+    # Extract steps section
+    steps = []
+    steps_match = re.search(
+        r'##\s+(steps?|instructions?)\s*\n(.*?)(?=\n##|\Z)',
+        content,
+        re.IGNORECASE | re.DOTALL
+    )
+    if steps_match:
+        steps_text = steps_match.group(2)
+        # Extract numbered steps
+        step_lines = re.findall(r'^\d+\.\s+(.+)$', steps_text, re.MULTILINE)
+        if step_lines:
+            steps = [step.strip() for step in step_lines]
+        else:
+            # Fallback: extract paragraphs as steps if no numbered list found
+            paragraphs = [p.strip() for p in steps_text.split('\n\n') if p.strip()]
+            if paragraphs:
+                steps = paragraphs
+    else:
+        # Try to extract remaining content after ingredients as instructions
+        # This handles recipes with no headers at all
+        if not ingredients_match:
+            # No headers at all - try to split content after title
+            after_title = re.search(r'^#\s+.+?\n(.+)', content, re.DOTALL)
+            if after_title:
+                remaining_text = after_title.group(1).strip()
+                # Skip the first few lines (likely ingredients) and get the rest
+                lines = remaining_text.split('\n')
+                # Find where ingredient-like lines end (heuristic: lines get longer)
+                split_point = 0
+                for i, line in enumerate(lines):
+                    if i > len(ingredients) and len(line.strip()) > 100:
+                        split_point = i
+                        break
+                if split_point > 0:
+                    instruction_lines = lines[split_point:]
+                    instruction_text = '\n'.join(instruction_lines).strip()
+                    paragraphs = [p.strip() for p in instruction_text.split('\n\n') if p.strip()]
+                    if paragraphs:
+                        steps = paragraphs
+
+    # Get category from directory structure
+    category = file_path.parent.name if file_path.parent.name != "recipes 2" else "other"
+
+    return {
+        "title": title,
+        "ingredients": ingredients,
+        "steps": steps,
+        "category": category,
+        "file_path": str(file_path)
+    }
+
+
+def parse_ingredient_text(text: str) -> dict:
+    """Parse ingredient text to extract quantity, unit, and name."""
+    # Pattern: optional quantity + optional unit + ingredient name
+    # Examples: "200g flour", "2 cups milk", "salt", "1 large egg"
+    pattern = r'^(\d+\.?\d*)\s*([a-zA-Z]*)\s+(.+)$'
+    match = re.match(pattern, text)
+
+    if match:
+        quantity = match.group(1)
+        unit = match.group(2) if match.group(2) else None
+        name = match.group(3).strip()
+    else:
+        # No quantity/unit found, entire text is ingredient name
+        quantity = None
+        unit = None
+        name = text.strip()
+
+    return {
+        "quantity": quantity,
+        "unit": unit,
+        "name": name
+    }
+
+
+_recipe_list = TypeAdapter(list[RecipeListResponse])
+
+
+def render_recipe_list(recipes: list) -> bytes:
+    """``list_recipes`` before the dict fast path: validate, re-validate, dump, json.dumps."""
+    items = [
+        RecipeListResponse(
+            id=r.id,
+            title=r.title,
+            description=r.description,
+            prep_time_minutes=r.prep_time_minutes,
+            cook_time_minutes=r.cook_time_minutes,
+            servings=r.servings,
+            difficulty=r.difficulty,
+            dietary_tags=r.dietary_tags or [],
+            is_favorite=r.favorite is not None,
+            primary_image_id=next((img.id for img in r.images if img.is_primary), r.images[0].id if r.images else None),
+            tags=r.tags,
+            created_at=r.created_at,
+        )
+        for r in recipes
+    ]
+    # What FastAPI's serialize_response does with response_model=, then JSONResponse.render.
+    validated = _recipe_list.validate_python(items)
+    return JSONResponse(_recipe_list.dump_python(validated, mode="json")).body
+
+
+def _extract_text(value: Any) -> str | None:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return "\n".join(str(v) for v in value if v)
+    if isinstance(value, dict):
+        return value.get("text") or value.get("name")
+    return None
+
+
+def _parse_ingredients(ingredients: Any) -> list[str]:
+    if not ingredients:
+        return []
+    if isinstance(ingredients, list):
+        return [str(i).strip() for i in ingredients if i]
+    return []
+
+
+def _extract_recipe_from_jsonld(data: list[dict]) -> dict | None:
+    for item in data:
+        if item.get("@type") == "Recipe":
+            return item
+        if isinstance(item.get("@graph"), list):
+            for graph_item in item["@graph"]:
+                if graph_item.get("@type") == "Recipe":
+                    return graph_item
+    return None
+
+
+def _extract_recipe_from_microdata(data: list[dict]) -> dict | None:
+    for item in data:
+        # Later fix for extruct's uniform microdata shape, carried over so
+        # --check compares parsing strategies rather than this bug.
+        if item.get("@type") == "Recipe":
+            return item
+        if "Recipe" in str(item.get("type", [])):
+            return item.get("properties", {})
+    return None
+
+
+def parse_recipe_html(html: str, url: str) -> dict:
+    """The parsing half of ``import_recipe_from_url``: BeautifulSoup, then extruct re-parsing."""
+    soup = BeautifulSoup(html, "html.parser")
+    metadata = extruct.extract(
+        html,
+        base_url=url,
+        syntaxes=["json-ld", "microdata"],
+        uniform=True,
+    )
+
+    recipe_data = _extract_recipe_from_jsonld(
+        metadata.get("json-ld", [])
+    ) or _extract_recipe_from_microdata(metadata.get("microdata", []))
+
+    result = {
+        "title": None,
+        "description": None,
+        "instructions": None,
+        "prep_time_minutes": None,
+        "cook_time_minutes": None,
+        "servings": None,
+        "ingredients": [],
+        "image_url": None,
+        "source_url": url,
+    }
+
+    if recipe_data:
+        result["title"] = _extract_text(recipe_data.get("name"))
+        result["description"] = _extract_text(recipe_data.get("description"))
+        result["instructions"] = parse_instructions(
+            recipe_data.get("recipeInstructions")
+        )
+        result["prep_time_minutes"] = parse_duration(recipe_data.get("prepTime"))
+        result["cook_time_minutes"] = parse_duration(recipe_data.get("cookTime"))
+        result["servings"] = parse_servings(recipe_data.get("recipeYield"))
+        result["ingredients"] = _parse_ingredients(
+            recipe_data.get("recipeIngredient") or recipe_data.get("ingredients")
+        )
+
+        image = recipe_data.get("image")
+        if isinstance(image, str):
+            result["image_url"] = image
+        elif isinstance(image, list) and image:
+            result["image_url"] = image[0] if isinstance(image[0], str) else image[0].get("url")
+        elif isinstance(image, dict):
+            result["image_url"] = image.get("url")
+
+    if not result["title"]:
+        title_tag = soup.find("title")
+        if title_tag:
+            result["title"] = title_tag.get_text().strip()
+
+    return result
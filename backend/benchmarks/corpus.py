@@ -0,0 +1,212 @@
+"""Deterministic inputs for the parser microbenchmarks.
+
+The mix mirrors what imports actually see: metric and imperial units, unicode
+and ASCII fractions, ranges, Polish measures from the Obsidian vault, free-text
+amounts, and markdown recipes with and without headers or frontmatter.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.core import DietaryTag, DifficultyLevel
+from app.models import Recipe, RecipeImage, Tag
+
+FOODS = [
+    "flour", "sugar", "butter", "eggs", "milk", "heavy cream", "onion", "garlic cloves",
+    "olive oil", "salt", "black pepper", "chicken thighs", "basmati rice", "canned tomatoes",
+    "fresh basil", "parmesan", "lemon juice", "baking powder", "soy sauce", "ginger",
+    "mąka pszenna", "cukier", "masło", "ziemniaki", "cebula", "czosnek", "śmietana 18%",
+]
+UNITS = ["g", "kg", "ml", "l", "cup", "cups", "tbsp", "tsp", "oz", "lb", "pinch", "łyżki", "łyżeczki", "szklanki", ""]
+AMOUNTS = ["1", "2", "3", "12", "250", "0.5", "1.5", "1/2", "3/4", "1 1/2", "2-3", "5-6", "1\\2", "½", "¼"]
+NOTES = ["", "", "", ", finely chopped", ", softened", " (optional)", ", to taste", ", divided", ", room temperature"]
+FREE_TEXT = ["salt to taste", "a handful of parsley", "oil for frying", "pinch of nutmeg", "sól", "pieprz do smaku"]
+VERBS = ["Preheat", "Whisk", "Stir", "Fold", "Simmer", "Roast", "Season", "Chop", "Combine", "Serve"]
+
+
+def ingredient_lines(n: int = 5000, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            lines.append(rng.choice(FREE_TEXT))
+            continue
+        unit = rng.choice(UNITS)
+        amount = rng.choice(AMOUNTS)
+        spacer = "" if unit in {"g", "kg", "ml"} and rng.random() < 0.5 else " "
+        lines.append(f"{amount}{spacer}{unit} {rng.choice(FOODS)}{rng.choice(NOTES)}".replace("  ", " "))
+    return lines
+
+
+def ingredient_catalog(n: int = 1000, seed: int = 9) -> list[tuple[int, str]]:
+    """``(id, name)`` catalog rows: every corpus food plus generated variants, as a matcher indexes them."""
+    rng = random.Random(seed)
+    qualifiers = ["red", "white", "smoked", "dried", "frozen", "organic", "wholegrain", "young", "wild", "sweet"]
+    names = set(FOODS)
+    while len(names) < n:
+        names.add(f"{rng.choice(qualifiers)} {rng.choice(FOODS)} {rng.randint(1, 99)}")
+    return list(enumerate(sorted(names), start=1))
+
+
+def quantities(n: int = 5000, seed: int = 2) -> list[tuple[str | None, int, int]]:
+    """(quantity, original servings, target servings) triples for scale_quantity."""
+    rng = random.Random(seed)
+    values = AMOUNTS + ["2 cups", "100g", "1 (14 oz) can", "a pinch", None, ""]
+    return [(rng.choice(values), rng.choice([1, 2, 4, 6]), rng.choice([1, 2, 3, 4, 8, 12])) for _ in range(n)]
+
+
+def durations(n: int = 5000, seed: int = 3) -> list[str | None]:
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.6:
+            pool.append(f"PT{rng.randint(1, 3)}H{rng.randint(0, 59)}M" if rng.random() < 0.4 else f"PT{rng.randint(1, 90)}M")
+        elif kind < 0.75:
+            pool.append(f"PT{rng.randint(0, 2)}H{rng.randint(0, 59)}M{rng.randint(1, 59)}S")
+        elif kind < 0.85:
+            pool.append(f"P0DT{rng.randint(0, 5)}H{rng.randint(0, 59)}M")
+        elif kind < 0.95:
+            pool.append(rng.choice(["30 minutes", "1 hour", "PT", ""]))
+        else:
+            pool.append(None)
+    return pool
+
+
+def yields(n: int = 5000, seed: int = 4) -> list:
+    rng = random.Random(seed)
+    pool = [4, "4", "4 servings", "Serves 6", "Makes 24 cookies", ["8", "8 slices"], "2-3", "one loaf", None, [], ""]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def instruction_payloads(n: int = 1000, seed: int = 5) -> list:
+    """JSON-LD ``recipeInstructions`` values in the shapes sites publish."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        steps = [f"{rng.choice(VERBS)} the {rng.choice(FOODS)} for {rng.randint(1, 30)} minutes." for _ in range(rng.randint(3, 14))]
+        shape = rng.random()
+        if shape < 0.4:
+            payloads.append([{"@type": "HowToStep", "text": step} for step in steps])
+        elif shape < 0.7:
+            payloads.append(steps)
+        elif shape < 0.85:
+            payloads.append(" ".join(steps))
+        else:
+            payloads.append([{"@type": "HowToSection", "name": "Prep"}, *({"name": step} for step in steps)])
+    return payloads
+
+
+def markdown_recipe(rng: random.Random, n: int) -> str:
+    title = f"{rng.choice(['Grandma', 'Quick', 'Weekday', 'Babcia'])} {rng.choice(FOODS).title()} {n}"
+    ingredients = ingredient_lines(rng.randint(4, 18), seed=rng.randrange(1 << 30))
+    steps = [
+        f"{rng.choice(VERBS)} the [[{rng.choice(FOODS)}]] until golden, about {rng.randint(2, 40)} minutes. " * rng.randint(1, 3)
+        for _ in range(rng.randint(3, 10))
+    ]
+    frontmatter = f"---\ntags: [recipe, {rng.choice(['dinner', 'baking', 'soup'])}]\nsource: vault\n---\n" if rng.random() < 0.5 else ""
+    layout = rng.random()
+    if layout < 0.6:
+        body = (
+            f"# {title}\n\n## Ingredients\n"
+            + "\n".join(f"- [[{line}]]" if rng.random() < 0.2 else f"- {line}" for line in ingredients)
+            + "\n\n## Steps\n"
+            + "\n".join(f"{i}. {step.strip()}" for i, step in enumerate(steps, 1))
+            + "\n\n## Notes\nKeeps for three days.\n"
+        )
+    elif layout < 0.8:
+        body = f"# {title}\n" + "\n".join(f"* {line}" for line in ingredients) + "\n\n## Instructions\n\n" + "\n\n".join(steps)
+    else:
+        # Header-less notes: bare ingredient lines followed by long instruction paragraphs.
+        body = f"# {title}\n" + "\n".join(ingredients) + "\n" + "\n\n".join(step * 2 for step in steps)
+    return frontmatter + body
+
+
+def markdown_vault(directory: Path, n: int = 300, seed: int = 6) -> list[Path]:
+    """Write ``n`` recipe notes under category folders and return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n):
+        folder = directory / rng.choice(["Dinner", "Baking", "Soups", "recipes 2"])
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"recipe-{i:04d}.md"
+        path.write_text(markdown_recipe(rng, i), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def recipe_page(n: int = 50, seed: int = 7) -> list[Recipe]:
+    """Detached ``Recipe`` rows shaped like one page of ``GET /api/recipes``."""
+    rng = random.Random(seed)
+    created = datetime(2025, 1, 1)
+    tags = [Tag(id=i, name=f"tag-{i}", created_at=created) for i in range(1, 21)]
+    recipes = []
+    for i in range(1, n + 1):
+        recipe = Recipe(
+            id=i,
+            title=f"{rng.choice(VERBS)}ed {rng.choice(FOODS)} {i}",
+            description=" ".join(rng.choice(FOODS) for _ in range(25)),
+            prep_time_minutes=rng.randint(5, 60),
+            cook_time_minutes=rng.randint(0, 120),
+            servings=rng.choice([2, 4, 6]),
+            difficulty=rng.choice(list(DifficultyLevel)),
+            dietary_tags=[t.value for t in rng.sample(list(DietaryTag), rng.randint(0, 3))],
+            created_at=created + timedelta(hours=i),
+        )
+        recipe.tags = rng.sample(tags, rng.randint(0, 5))
+        recipe.images = [RecipeImage(id=i * 10 + k, is_primary=k == 0, data=b"") for k in range(rng.randint(0, 3))]
+        recipes.append(recipe)
+    return recipes
+
+
+def recipe_html(n: int = 20, seed: int = 8) -> list[tuple[str, str]]:
+    """``(html, url)`` recipe blog pages: JSON-LD (flat or ``@graph``), microdata, or neither."""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n):
+        name = f"{rng.choice(['Weeknight', 'Classic', 'Babcia'])} {rng.choice(FOODS)} {i}"
+        ingredients = ingredient_lines(rng.randint(5, 15), seed=rng.randrange(1 << 30))
+        steps = [f"{rng.choice(VERBS)} the {rng.choice(FOODS)}." for _ in range(rng.randint(4, 10))]
+        recipe = {
+            "@context": "https://schema.org",
+            "@type": "Recipe",
+            "name": name,
+            "description": f"A {rng.choice(FOODS)} recipe.",
+            "prepTime": f"PT{rng.randint(5, 45)}M",
+            "cookTime": f"PT1H{rng.randint(0, 59)}M",
+            "recipeYield": f"{rng.randint(2, 8)} servings",
+            "recipeIngredient": ingredients,
+            "recipeInstructions": [{"@type": "HowToStep", "text": step} for step in steps],
+            "image": [f"https://example.com/{i}.jpg"],
+        }
+        kind = rng.random()
+        if kind < 0.5:
+            head = f"<script type='application/ld+json'>{json.dumps(recipe)}</script>"
+            body = ""
+        elif kind < 0.7:
+            graph = {"@context": "https://schema.org", "@graph": [{"@type": "WebPage", "name": name}, recipe]}
+            head = f"<script type='application/ld+json'>{json.dumps(graph)}</script>"
+            body = ""
+        elif kind < 0.9:
+            head = ""
+            body = (
+                "<div itemscope itemtype='https://schema.org/Recipe'>"
+                f"<h1 itemprop='name'>{name}</h1>"
+                + "".join(f"<li itemprop='recipeIngredient'>{line}</li>" for line in ingredients)
+                + "</div>"
+            )
+        else:
+            head, body = "", ""
+        # Blog chrome around the recipe: navigation, story paragraphs, comments.
+        filler = "".join(
+            f"<p class='story'>Paragraph {k} about this {rng.choice(FOODS)}, <a href='/tag/{k}'>tag</a>.</p>"
+            for k in range(rng.randint(200, 1500))
+        )
+        html = (
+            f"<!DOCTYPE html><html><head><title>{name} | Food Blog</title>{head}</head>"
+            f"<body><nav>{'<a href=/>home</a>' * 30}</nav><article>{body}{filler}</article></body></html>"
+        )
+        pages.append((html, f"https://blog.example/recipes/{i}"))
+    return pages
@@ -0,0 +1,309 @@
+"""Deterministic large-dataset generator.
+
+The same ``DatasetConfig`` (including ``seed``) always produces the same
+rows, so benchmark runs against different commits are comparable.
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core import DietaryTag, DifficultyLevel, IngredientCategory, MealType
+from app.models import (
+    Collection,
+    Favorite,
+    Ingredient,
+    MealPlan,
+    PantryItem,
+    Recipe,
+    RecipeCollection,
+    RecipeImage,
+    RecipeIngredient,
+    RecipeNote,
+    RecipeTag,
+    ShoppingList,
+    ShoppingListItem,
+    Tag,
+)
+
+ADJECTIVES = [
+    "Smoky", "Crispy", "Creamy", "Spicy", "Roasted", "Grilled", "Lemony", "Garlicky",
+    "Rustic", "Hearty", "Zesty", "Golden", "Braised", "Herbed", "Sticky", "Charred",
+]
+DISHES = [
+    "Chicken", "Lentil Soup", "Risotto", "Tacos", "Curry", "Salad", "Lasagna", "Stir Fry",
+    "Pancakes", "Stew", "Pasta", "Flatbread", "Chili", "Dumplings", "Frittata", "Noodles",
+]
+STYLES = ["", "with Herbs", "with Rice", "Bowl", "Bake", "for Two", "Deluxe", "Classic"]
+FOODS = [
+    "onion", "garlic", "tomato", "carrot", "celery", "potato", "flour", "sugar", "butter",
+    "egg", "milk", "cream", "rice", "pasta", "lentils", "chickpeas", "chicken breast",
+    "beef mince", "salmon", "tofu", "spinach", "kale", "pepper", "chili", "cumin",
+    "paprika", "oregano", "basil", "parsley", "lemon", "lime", "olive oil", "soy sauce",
+    "ginger", "coconut milk", "mushroom", "zucchini", "cheddar", "parmesan", "yogurt",
+]
+UNITS = ["g", "ml", "cup", "tbsp", "tsp", "piece", None]
+WORDS = (
+    "stir heat add mix season simmer bake chop slice serve combine whisk fold pour "
+    "until golden tender fragrant minutes gently over medium high low pan pot oven"
+).split()
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass
+class DatasetConfig:
+    recipes: int = 500
+    ingredients: int = 300
+    ingredients_per_recipe: int = 8
+    images_per_recipe: int = 1
+    image_size: int = 20_000
+    tags: int = 30
+    tags_per_recipe: int = 3
+    notes_per_recipe: int = 1
+    collections: int = 20
+    recipes_per_collection: int = 15
+    meal_plan_days: int = 365
+    meals_per_day: int = 3
+    pantry_items: int = 60
+    favorites: int = 50
+    shopping_lists: int = 10
+    items_per_shopping_list: int = 25
+    seed: int = 42
+    # Meal plans span meal_plan_days centred on this date (today by default).
+    anchor_date: date = field(default_factory=date.today)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["anchor_date"] = self.anchor_date.isoformat()
+        return data
+
+
+@dataclass
+class Dataset:
+    config: DatasetConfig
+    recipe_ids: list[int]
+    ingredient_ids: list[int]
+    tag_ids: list[int]
+    image_ids: list[int]
+    collection_ids: list[int]
+    shopping_list_ids: list[int]
+    shopping_item_ids: dict[int, list[int]]
+    favorite_recipe_ids: list[int]
+    pantry_item_ids: list[int]
+    meal_plan_start: date
+    meal_plan_end: date
+
+
+def _insert(db: Session, model, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    return list(
+        db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    )
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate(db: Session, config: DatasetConfig | None = None) -> Dataset:
+    """Insert a synthetic household's worth of data and return the generated ids."""
+    config = config or DatasetConfig()
+    rng = random.Random(config.seed)
+
+    ingredient_ids = _insert(
+        db,
+        Ingredient,
+        [
+            {
+                "name": f"{FOODS[i % len(FOODS)]} {i // len(FOODS)}" if i >= len(FOODS) else FOODS[i],
+                "category": rng.choice(list(IngredientCategory)),
+                "default_unit": rng.choice(UNITS),
+                "calories": round(rng.uniform(10, 900), 2),
+                "protein": round(rng.uniform(0, 40), 2),
+                "carbs": round(rng.uniform(0, 80), 2),
+                "fat": round(rng.uniform(0, 50), 2),
+                "fiber": round(rng.uniform(0, 15), 2),
+                "cost_per_unit": round(rng.uniform(0.01, 2), 2),
+            }
+            for i in range(config.ingredients)
+        ],
+    )
+    tag_ids = _insert(db, Tag, [{"name": f"tag-{i}"} for i in range(config.tags)])
+
+    recipe_ids = _insert(
+        db,
+        Recipe,
+        [
+            {
+                "title": f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} {rng.choice(STYLES)} #{i}".replace("  ", " "),
+                "description": _sentence(rng, 20),
+                "instructions": "\n".join(
+                    f"{step}. {_sentence(rng, rng.randint(8, 25))}" for step in range(1, rng.randint(4, 10))
+                ),
+                "prep_time_minutes": rng.randint(5, 60),
+                "cook_time_minutes": rng.randint(0, 180),
+                "servings": rng.choice([1, 2, 4, 6, 8]),
+                "difficulty": rng.choice(list(DifficultyLevel)),
+                "dietary_tags": [t.value for t in rng.sample(list(DietaryTag), rng.randint(0, 3))],
+                "is_active": True,
+            }
+            for i in range(config.recipes)
+        ],
+    )
+
+    per_recipe = min(config.ingredients_per_recipe, len(ingredient_ids))
+    _insert(
+        db,
+        RecipeIngredient,
+        [
+            {
+                "recipe_id": recipe_id,
+                "ingredient_id": ingredient_id,
+                "quantity": rng.choice(["1", "2", "1/2", "100", "250", "1.5", "a pinch"]),
+                "unit": rng.choice(UNITS),
+                "notes": rng.choice([None, "finely chopped", "to taste"]),
+            }
+            for recipe_id in recipe_ids
+            for ingredient_id in rng.sample(ingredient_ids, per_recipe)
+        ],
+    )
+
+    if tag_ids:
+        db.execute(
+            insert(RecipeTag),
+            [
+                {"recipe_id": recipe_id, "tag_id": tag_id}
+                for recipe_id in recipe_ids
+                for tag_id in rng.sample(tag_ids, min(config.tags_per_recipe, len(tag_ids)))
+            ],
+        )
+
+    image_ids = _insert(
+        db,
+        RecipeImage,
+        [
+            {
+                "recipe_id": recipe_id,
+                "data": PNG_HEADER + rng.randbytes(max(config.image_size - len(PNG_HEADER), 0)),
+                "mime_type": "image/png",
+                "is_primary": n == 0,
+                "sort_order": n,
+            }
+            for recipe_id in recipe_ids
+            for n in range(config.images_per_recipe)
+        ],
+    )
+
+    _insert(
+        db,
+        RecipeNote,
+        [
+            {"recipe_id": recipe_id, "content": _sentence(rng, 12)}
+            for recipe_id in recipe_ids
+            for _ in range(config.notes_per_recipe)
+        ],
+    )
+
+    collection_ids = _insert(
+        db,
+        Collection,
+        [{"name": f"Collection {i}", "description": _sentence(rng, 8)} for i in range(config.collections)],
+    )
+    if collection_ids and recipe_ids:
+        db.execute(
+            insert(RecipeCollection),
+            [
+                {"collection_id": collection_id, "recipe_id": recipe_id}
+                for collection_id in collection_ids
+                for recipe_id in rng.sample(recipe_ids, min(config.recipes_per_collection, len(recipe_ids)))
+            ],
+        )
+
+    favorite_recipe_ids = rng.sample(recipe_ids, min(config.favorites, len(recipe_ids)))
+    _insert(db, Favorite, [{"recipe_id": recipe_id} for recipe_id in favorite_recipe_ids])
+
+    start = config.anchor_date - timedelta(days=config.meal_plan_days // 2)
+    end = start + timedelta(days=config.meal_plan_days - 1)
+    meal_types = list(MealType)
+    if recipe_ids:
+        _insert(
+            db,
+            MealPlan,
+            [
+                {
+                    "date": start + timedelta(days=day),
+                    "meal_type": meal_types[slot % len(meal_types)],
+                    "recipe_id": rng.choice(recipe_ids),
+                    "servings": rng.choice([1, 2, 4]),
+                    "is_completed": start + timedelta(days=day) < config.anchor_date,
+                }
+                for day in range(config.meal_plan_days)
+                for slot in range(config.meals_per_day)
+            ],
+        )
+
+    pantry_item_ids = _insert(
+        db,
+        PantryItem,
+        [
+            {
+                "ingredient_id": ingredient_id,
+                "quantity": round(rng.uniform(0.1, 5), 2),
+                "unit": rng.choice(UNITS),
+                "expiration_date": config.anchor_date + timedelta(days=rng.randint(-5, 60)),
+            }
+            for ingredient_id in rng.sample(ingredient_ids, min(config.pantry_items, len(ingredient_ids)))
+        ],
+    )
+
+    shopping_list_ids = _insert(
+        db,
+        ShoppingList,
+        [
+            {
+                "name": f"Week {i}",
+                "start_date": config.anchor_date - timedelta(weeks=i),
+                "end_date": config.anchor_date - timedelta(weeks=i) + timedelta(days=6),
+                "is_active": i < 3,
+            }
+            for i in range(config.shopping_lists)
+        ],
+    )
+    shopping_item_ids = {}
+    for list_id in shopping_list_ids:
+        shopping_item_ids[list_id] = _insert(
+            db,
+            ShoppingListItem,
+            [
+                {
+                    "shopping_list_id": list_id,
+                    "ingredient_id": ingredient_id,
+                    "quantity": str(rng.randint(1, 500)),
+                    "unit": rng.choice(UNITS),
+                    "is_checked": rng.random() < 0.3,
+                }
+                for ingredient_id in rng.sample(
+                    ingredient_ids, min(config.items_per_shopping_list, len(ingredient_ids))
+                )
+            ],
+        )
+
+    db.commit()
+    return Dataset(
+        config=config,
+        recipe_ids=recipe_ids,
+        ingredient_ids=ingredient_ids,
+        tag_ids=tag_ids,
+        image_ids=image_ids,
+        collection_ids=collection_ids,
+        shopping_list_ids=shopping_list_ids,
+        shopping_item_ids=shopping_item_ids,
+        favorite_recipe_ids=favorite_recipe_ids,
+        pantry_item_ids=pantry_item_ids,
+        meal_plan_start=start,
+        meal_plan_end=end,
+    )
@@ -0,0 +1,549 @@
+"""Endpoint benchmarks: drive every API router through the ASGI app.
+
+    python -m benchmarks.endpoints                      # SQLite in a temp dir
+    python -m benchmarks.endpoints --database-url postgresql://localhost/kb_bench --reset
+    python -m benchmarks.endpoints --compare benchmarks/results/<previous>.json
+
+Each scenario is requested ``--warmup`` times untimed, then ``--iterations`` times
+timed. Allocations are measured in a separate pass under tracemalloc so its
+overhead does not skew the latency numbers. ``POST /api/recipes/import`` is
+skipped because it fetches a remote page.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import create_engine, inspect, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import Base, get_async_db, get_db, get_read_db, settings
+from app.core.database import to_async_url
+from app.core.sql_events import on_statement
+from app.main import app
+
+from .datagen import Dataset, DatasetConfig, generate
+from .reporting import RESULTS_DIR, git_revision, percentile, write_report
+
+ADMIN_TOKEN = "benchmark"
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(2048)
+
+
+@dataclass
+class Call:
+    method: str
+    url: str
+    params: dict[str, Any] | None = None
+    json: Any = None
+    files: dict[str, Any] | None = None
+    headers: dict[str, str] | None = None
+
+
+# Builds the request for iteration ``i``. May issue untimed setup requests first
+# (e.g. creating the row a DELETE scenario removes).
+Builder = Callable[[httpx.AsyncClient, Dataset, int], Awaitable[Call]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Builder
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    queries: float
+    alloc_peak_kb: float = 0.0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+class QueryCounter:
+    """Counts statements on every engine; requests are issued one at a time."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, statement, parameters, elapsed):
+        self.count += 1
+
+
+query_counter = on_statement(QueryCounter())
+
+
+def _pick(ids: list[int], i: int) -> int:
+    return ids[i % len(ids)]
+
+
+async def _created_id(client: httpx.AsyncClient, url: str, **kwargs) -> int:
+    response = await client.post(url, **kwargs)
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def _recipe_payload(ds: Dataset, i: int) -> dict:
+    return {
+        "title": f"Benchmark recipe {i}",
+        "description": "Created by the benchmark suite",
+        "instructions": "1. Mix.\n2. Cook.\n3. Serve.",
+        "servings": 4,
+        "ingredients": [
+            {"ingredient_id": _pick(ds.ingredient_ids, i + n), "quantity": "100", "unit": "g"}
+            for n in range(ds.config.ingredients_per_recipe)
+        ],
+        "tag_ids": ds.tag_ids[:2],
+    }
+
+
+def _request(method: str, url: str | Callable[[Dataset, int], Any], **kwargs) -> Builder:
+    """Builder for a single request; ``url`` and any keyword may be ``f(ds, i)``."""
+
+    async def build(client, ds, i):
+        resolved = {key: value(ds, i) if callable(value) else value for key, value in kwargs.items()}
+        return Call(method, url(ds, i) if callable(url) else url, **resolved)
+
+    return build
+
+
+async def _delete_ingredient(client, ds, i):
+    ingredient_id = await _created_id(client, "/api/ingredients", json={"name": f"bench-del-{i}"})
+    return Call("DELETE", f"/api/ingredients/{ingredient_id}")
+
+
+async def _delete_recipe(client, ds, i):
+    recipe_id = await _created_id(client, "/api/recipes", json=_recipe_payload(ds, i))
+    return Call("DELETE", f"/api/recipes/{recipe_id}")
+
+
+async def _delete_image(client, ds, i):
+    image_id = await _created_id(
+        client,
+        f"/api/recipes/{_pick(ds.recipe_ids, i)}/images",
+        files={"file": ("bench.png", PNG, "image/png")},
+    )
+    return Call("DELETE", f"/api/images/{image_id}")
+
+
+async def _update_note(client, ds, i):
+    recipe_id = _pick(ds.recipe_ids, i)
+    note_id = await _created_id(client, f"/api/recipes/{recipe_id}/notes", json={"content": "note"})
+    return Call("PUT", f"/api/recipes/{recipe_id}/notes/{note_id}", json={"content": f"edited {i}"})
+
+
+async def _delete_note(client, ds, i):
+    recipe_id = _pick(ds.recipe_ids, i)
+    note_id = await _created_id(client, f"/api/recipes/{recipe_id}/notes", json={"content": "note"})
+    return Call("DELETE", f"/api/recipes/{recipe_id}/notes/{note_id}")
+
+
+async def _delete_tag(client, ds, i):
+    tag_id = await _created_id(client, "/api/tags", json={"name": f"bench-del-{i}"})
+    return Call("DELETE", f"/api/tags/{tag_id}")
+
+
+def _meal_plan_payload(ds: Dataset, i: int) -> dict:
+    return {
+        "date": (ds.config.anchor_date + timedelta(days=i % 7)).isoformat(),
+        "meal_type": "dinner",
+        "recipe_id": _pick(ds.recipe_ids, i),
+    }
+
+
+async def _update_meal_plan(client, ds, i):
+    meal_id = await _created_id(client, "/api/meal-plans", json=_meal_plan_payload(ds, i))
+    return Call("PUT", f"/api/meal-plans/{meal_id}", json={"servings": 2, "is_completed": True})
+
+
+async def _delete_meal_plan(client, ds, i):
+    meal_id = await _created_id(client, "/api/meal-plans", json=_meal_plan_payload(ds, i))
+    return Call("DELETE", f"/api/meal-plans/{meal_id}")
+
+
+async def _copy_week(client, ds, i):
+    # Copy into weeks past the generated plan so the target never accumulates copies.
+    target = ds.meal_plan_end + timedelta(weeks=i + 1)
+    return Call(
+        "POST",
+        "/api/meal-plans/copy-week",
+        params={"source_date": ds.config.anchor_date.isoformat(), "target_date": target.isoformat()},
+    )
+
+
+async def _toggle_item(client, ds, i):
+    list_id = _pick(ds.shopping_list_ids, i)
+    return Call("POST", f"/api/shopping-lists/{list_id}/items/{_pick(ds.shopping_item_ids[list_id], i)}/toggle")
+
+
+async def _delete_item(client, ds, i):
+    list_id = _pick(ds.shopping_list_ids, i)
+    item_id = await _created_id(client, f"/api/shopping-lists/{list_id}/items", json={"name": "extra"})
+    return Call("DELETE", f"/api/shopping-lists/{list_id}/items/{item_id}")
+
+
+async def _delete_shopping_list(client, ds, i):
+    list_id = await _created_id(client, "/api/shopping-lists", json={"name": f"bench-del-{i}"})
+    return Call("DELETE", f"/api/shopping-lists/{list_id}")
+
+
+async def _remove_favorite(client, ds, i):
+    recipe_id = _pick(ds.recipe_ids, i)
+    (await client.post(f"/api/favorites/{recipe_id}")).raise_for_status()
+    return Call("DELETE", f"/api/favorites/{recipe_id}")
+
+
+async def _add_to_collection(client, ds, i):
+    collection_id = await _created_id(client, "/api/collections", json={"name": f"bench-add-{i}"})
+    return Call("POST", f"/api/collections/{collection_id}/recipes/{_pick(ds.recipe_ids, i)}")
+
+
+async def _remove_from_collection(client, ds, i):
+    collection_id = await _created_id(client, "/api/collections", json={"name": f"bench-rm-{i}"})
+    recipe_id = _pick(ds.recipe_ids, i)
+    (await client.post(f"/api/collections/{collection_id}/recipes/{recipe_id}")).raise_for_status()
+    return Call("DELETE", f"/api/collections/{collection_id}/recipes/{recipe_id}")
+
+
+async def _delete_collection(client, ds, i):
+    collection_id = await _created_id(client, "/api/collections", json={"name": f"bench-del-{i}"})
+    return Call("DELETE", f"/api/collections/{collection_id}")
+
+
+async def _delete_pantry_item(client, ds, i):
+    item_id = await _created_id(
+        client, "/api/pantry", json={"ingredient_id": _pick(ds.ingredient_ids, i), "quantity": "1"}
+    )
+    return Call("DELETE", f"/api/pantry/{item_id}")
+
+
+def _recipe_url(suffix: str = "") -> Callable[[Dataset, int], str]:
+    return lambda ds, i: f"/api/recipes/{_pick(ds.recipe_ids, i)}{suffix}"
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario("GET /health", _request("GET", "/health")),
+    # ingredients
+    Scenario("GET /api/ingredients", _request("GET", "/api/ingredients")),
+    Scenario("GET /api/ingredients?search", _request("GET", "/api/ingredients", params={"search": "on"})),
+    Scenario(
+        "GET /api/ingredients/{id}",
+        _request("GET", lambda ds, i: f"/api/ingredients/{_pick(ds.ingredient_ids, i)}"),
+    ),
+    Scenario("POST /api/ingredients", _request("POST", "/api/ingredients", json=lambda ds, i: {"name": f"bench-{i}"})),
+    Scenario(
+        "PUT /api/ingredients/{id}",
+        _request("PUT", lambda ds, i: f"/api/ingredients/{_pick(ds.ingredient_ids, i)}", json={"default_unit": "g"}),
+    ),
+    Scenario("DELETE /api/ingredients/{id}", _delete_ingredient),
+    # recipes
+    Scenario("GET /api/recipes", _request("GET", "/api/recipes")),
+    Scenario("GET /api/recipes?search", _request("GET", "/api/recipes", params={"search": "curry"})),
+    Scenario("GET /api/recipes?favorites_only", _request("GET", "/api/recipes", params={"favorites_only": "true"})),
+    Scenario("GET /api/recipes/{id}", _request("GET", _recipe_url())),
+    Scenario("POST /api/recipes", _request("POST", "/api/recipes", json=_recipe_payload)),
+    Scenario("PUT /api/recipes/{id}", _request("PUT", _recipe_url(), json={"servings": 6})),
+    Scenario("DELETE /api/recipes/{id}", _delete_recipe),
+    Scenario(
+        "POST /api/recipes/{id}/images",
+        _request("POST", _recipe_url("/images"), files={"file": ("bench.png", PNG, "image/png")}),
+    ),
+    Scenario("GET /api/recipes/{id}/scale/{servings}", _request("GET", _recipe_url("/scale/8"))),
+    Scenario("GET /api/recipes/{id}/nutrition", _request("GET", _recipe_url("/nutrition"))),
+    Scenario("GET /api/recipes/{id}/cost", _request("GET", _recipe_url("/cost"))),
+    Scenario("POST /api/recipes/{id}/notes", _request("POST", _recipe_url("/notes"), json={"content": "Tasty"})),
+    Scenario("PUT /api/recipes/{id}/notes/{note_id}", _update_note),
+    Scenario("DELETE /api/recipes/{id}/notes/{note_id}", _delete_note),
+    # tags
+    Scenario("GET /api/tags", _request("GET", "/api/tags")),
+    Scenario("POST /api/tags", _request("POST", "/api/tags", json=lambda ds, i: {"name": f"bench-{i}"})),
+    Scenario("DELETE /api/tags/{id}", _delete_tag),
+    # meal plans
+    Scenario(
+        "GET /api/meal-plans/week/{date}",
+        _request("GET", lambda ds, i: f"/api/meal-plans/week/{ds.config.anchor_date.isoformat()}"),
+    ),
+    Scenario("POST /api/meal-plans", _request("POST", "/api/meal-plans", json=_meal_plan_payload)),
+    Scenario("PUT /api/meal-plans/{id}", _update_meal_plan),
+    Scenario("DELETE /api/meal-plans/{id}", _delete_meal_plan),
+    Scenario("POST /api/meal-plans/copy-week", _copy_week),
+    # shopping lists
+    Scenario("GET /api/shopping-lists", _request("GET", "/api/shopping-lists")),
+    Scenario(
+        "GET /api/shopping-lists/{id}",
+        _request("GET", lambda ds, i: f"/api/shopping-lists/{_pick(ds.shopping_list_ids, i)}"),
+    ),
+    Scenario("POST /api/shopping-lists", _request("POST", "/api/shopping-lists", json=lambda ds, i: {"name": f"bench-{i}"})),
+    Scenario(
+        "POST /api/shopping-lists/generate",
+        _request(
+            "POST",
+            "/api/shopping-lists/generate",
+            json=lambda ds, i: {
+                "name": f"Generated {i}",
+                "start_date": ds.config.anchor_date.isoformat(),
+                "end_date": (ds.config.anchor_date + timedelta(days=6)).isoformat(),
+            },
+        ),
+    ),
+    Scenario(
+        "POST /api/shopping-lists/{id}/items",
+        _request(
+            "POST",
+            lambda ds, i: f"/api/shopping-lists/{_pick(ds.shopping_list_ids, i)}/items",
+            json={"name": "Paper towels", "quantity": "1"},
+        ),
+    ),
+    Scenario("POST /api/shopping-lists/{id}/items/{item_id}/toggle", _toggle_item),
+    Scenario("DELETE /api/shopping-lists/{id}/items/{item_id}", _delete_item),
+    Scenario("DELETE /api/shopping-lists/{id}", _delete_shopping_list),
+    # favorites
+    Scenario("GET /api/favorites", _request("GET", "/api/favorites")),
+    Scenario("POST /api/favorites/{id}", _request("POST", lambda ds, i: f"/api/favorites/{_pick(ds.recipe_ids, i)}")),
+    Scenario("DELETE /api/favorites/{id}", _remove_favorite),
+    # dashboard, images, suggestions
+    Scenario("GET /api/dashboard", _request("GET", "/api/dashboard")),
+    Scenario("GET /api/images/{id}", _request("GET", lambda ds, i: f"/api/images/{_pick(ds.image_ids, i)}")),
+    Scenario("DELETE /api/images/{id}", _delete_image),
+    Scenario("GET /api/suggestions", _request("GET", "/api/suggestions")),
+    # collections
+    Scenario("GET /api/collections", _request("GET", "/api/collections")),
+    Scenario(
+        "GET /api/collections/{id}",
+        _request("GET", lambda ds, i: f"/api/collections/{_pick(ds.collection_ids, i)}"),
+    ),
+    Scenario("POST /api/collections", _request("POST", "/api/collections", json=lambda ds, i: {"name": f"bench-{i}"})),
+    Scenario(
+        "PUT /api/collections/{id}",
+        _request(
+            "PUT", lambda ds, i: f"/api/collections/{_pick(ds.collection_ids, i)}", json={"description": "edited"}
+        ),
+    ),
+    Scenario("DELETE /api/collections/{id}", _delete_collection),
+    Scenario("POST /api/collections/{id}/recipes/{recipe_id}", _add_to_collection),
+    Scenario("DELETE /api/collections/{id}/recipes/{recipe_id}", _remove_from_collection),
+    # pantry
+    Scenario("GET /api/pantry", _request("GET", "/api/pantry")),
+    Scenario("GET /api/pantry/{id}", _request("GET", lambda ds, i: f"/api/pantry/{_pick(ds.pantry_item_ids, i)}")),
+    Scenario(
+        "POST /api/pantry",
+        _request("POST", "/api/pantry", json=lambda ds, i: {"ingredient_id": _pick(ds.ingredient_ids, i), "quantity": "2"}),
+    ),
+    Scenario(
+        "PUT /api/pantry/{id}",
+        _request("PUT", lambda ds, i: f"/api/pantry/{_pick(ds.pantry_item_ids, i)}", json={"quantity": "3"}),
+    ),
+    Scenario("DELETE /api/pantry/{id}", _delete_pantry_item),
+    Scenario(
+        "POST /api/pantry/add-ingredient/{id}",
+        _request(
+            "POST",
+            lambda ds, i: f"/api/pantry/add-ingredient/{_pick(ds.ingredient_ids, i)}",
+            params={"quantity": 1, "unit": "g"},
+        ),
+    ),
+    # admin
+    Scenario("GET /api/admin/pool", _request("GET", "/api/admin/pool", headers={"X-Admin-Token": ADMIN_TOKEN})),
+]
+
+
+async def _send(client: httpx.AsyncClient, call: Call) -> httpx.Response:
+    return await client.request(
+        call.method, call.url, params=call.params, json=call.json, files=call.files, headers=call.headers
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, ds: Dataset, scenario: Scenario, iterations: int, warmup: int, alloc_samples: int
+) -> EndpointResult:
+    i = 0
+    for _ in range(warmup):
+        await _send(client, await scenario.build(client, ds, i))
+        i += 1
+
+    durations, queries, statuses = [], [], {}
+    for _ in range(iterations):
+        call = await scenario.build(client, ds, i)
+        i += 1
+        query_counter.count = 0
+        start = time.perf_counter()
+        response = await _send(client, call)
+        durations.append((time.perf_counter() - start) * 1000)
+        queries.append(query_counter.count)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_samples):
+            call = await scenario.build(client, ds, i)
+            i += 1
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await _send(client, call)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return EndpointResult(
+        name=scenario.name,
+        requests=iterations,
+        errors=sum(count for status, count in statuses.items() if int(status) >= 400),
+        p50_ms=round(percentile(durations, 50), 3),
+        p95_ms=round(percentile(durations, 95), 3),
+        p99_ms=round(percentile(durations, 99), 3),
+        mean_ms=round(statistics.fmean(durations), 3),
+        queries=round(statistics.fmean(queries), 2),
+        alloc_peak_kb=round(statistics.median(peaks) / 1024, 1) if peaks else 0.0,
+        statuses=statuses,
+    )
+
+
+def prepare_database(database_url: str, config: DatasetConfig, reset: bool) -> Dataset:
+    engine = create_engine(database_url)
+    try:
+        if inspect(engine).get_table_names():
+            if not reset:
+                raise SystemExit(f"{make_url(database_url)!r} is not empty; pass --reset to drop and reseed it")
+            Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            return generate(db, config)
+    finally:
+        engine.dispose()
+
+
+async def run(
+    database_url: str,
+    dataset: Dataset,
+    scenarios: list[Scenario],
+    iterations: int,
+    warmup: int,
+    alloc_samples: int,
+) -> list[EndpointResult]:
+    sync_engine = create_engine(database_url)
+    async_engine = create_async_engine(to_async_url(database_url))
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with SyncSession() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    previous_token, settings.admin_token = settings.admin_token, ADMIN_TOKEN
+
+    results = []
+    try:
+        # Server errors are recorded as 500s rather than aborting the run.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                result = await run_scenario(client, dataset, scenario, iterations, warmup, alloc_samples)
+                print(_format_row(result), file=sys.stderr)
+                results.append(result)
+    finally:
+        settings.admin_token = previous_token
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        sync_engine.dispose()
+    return results
+
+
+def build_report(database_url: str, config: DatasetConfig, results: list[EndpointResult], **options) -> dict:
+    return {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "database": make_url(database_url).get_backend_name(),
+        "dataset": config.to_dict(),
+        "options": options,
+        "endpoints": [asdict(result) for result in results],
+    }
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    """One line per endpoint present in both reports, with p50/p95 and query deltas."""
+    before = {entry["name"]: entry for entry in previous["endpoints"]}
+    lines = [f"{'endpoint':<56} {'p50 ms':>18} {'p95 ms':>18} {'queries':>12}"]
+    for entry in current["endpoints"]:
+        old = before.get(entry["name"])
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            change = (entry[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]:.2f}->{entry[key]:.2f} {change:+.0f}%".rjust(18))
+        cells.append(f"{old['queries']:g}->{entry['queries']:g}".rjust(12))
+        lines.append(f"{entry['name']:<56} " + " ".join(cells))
+    return lines
+
+
+def _format_row(result: EndpointResult) -> str:
+    errors = f"  errors={result.errors}" if result.errors else ""
+    return (
+        f"{result.name:<56} p50={result.p50_ms:8.2f}ms p95={result.p95_ms:8.2f}ms "
+        f"p99={result.p99_ms:8.2f}ms queries={result.queries:<5g} alloc={result.alloc_peak_kb:g}KiB{errors}"
+    )
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: SQLite in a temp dir)")
+    parser.add_argument("--reset", action="store_true", help="drop and reseed a non-empty database")
+    parser.add_argument("--recipes", type=int, default=DatasetConfig.recipes)
+    parser.add_argument("--seed", type=int, default=DatasetConfig.seed)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-samples", type=int, default=5)
+    parser.add_argument("-k", "--filter", help="only run scenarios whose name contains this")
+    parser.add_argument("--output", type=Path, help=f"results file (default: {RESULTS_DIR}/endpoints-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="previous results file to diff against")
+    args = parser.parse_args(argv)
+
+    config = DatasetConfig(recipes=args.recipes, seed=args.seed, anchor_date=date.today())
+    scenarios = [s for s in SCENARIOS if not args.filter or args.filter in s.name]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        dataset = prepare_database(database_url, config, args.reset or not args.database_url)
+        results = asyncio.run(
+            run(database_url, dataset, scenarios, args.iterations, args.warmup, args.alloc_samples)
+        )
+
+    report = build_report(
+        database_url, config, results, iterations=args.iterations, warmup=args.warmup, alloc_samples=args.alloc_samples
+    )
+    output = write_report(report, args.output, "endpoints")
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        print("\n".join(compare(json.loads(args.compare.read_text()), report)))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""Load generator: replay a weighted mix of household traffic against a running server.
+
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 4,8,16,32 --duration 30
+
+Closed-loop mode (default) keeps ``--concurrency`` virtual users busy, each
+sending its next request as soon as the previous one returns (plus optional
+think time). Open-loop mode (``--mode open --rate 20,40,80``) sends requests
+at a Poisson arrival rate regardless of how fast the server answers, and
+measures latency from the scheduled send time, so queueing shows up in the
+numbers instead of silently lowering the offered load.
+
+Each comma-separated concurrency or rate is one step. Throughput and latency
+are printed every ``--interval`` seconds and summarised per step, and the
+first step where the server stops keeping up is reported as the saturation
+point.
+
+The import action fetches pages from a fake recipe site served on
+``--site-port``. The server must be started with
+``RECIPE_IMPORT_ALLOWED_HOSTS='["127.0.0.1"]'`` to allow it past the
+importer's private-address check.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+from .reporting import RESULTS_DIR, git_revision, percentile, write_report
+
+DEFAULT_MIX = {"browse": 40, "detail": 30, "week": 15, "toggle": 10, "import": 5}
+
+
+class FakeRecipeSite:
+    """Serves deterministic schema.org recipe pages from a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like real recipe sites, so the importer's pool is exercised.
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, delayed ACKs add ~40 ms.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency)
+                body = site.page(self.path).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.latency = latency
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-recipe-site", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def page(path: str) -> str:
+        n = sum(path.encode()) % 1000
+        recipe = {
+            "@context": "https://schema.org",
+            "@type": "Recipe",
+            "name": f"Load test stew {n}",
+            "description": "A hearty stew served by the load test's fake recipe site. " * 3,
+            "prepTime": f"PT{10 + n % 20}M",
+            "cookTime": f"PT1H{n % 60}M",
+            "recipeYield": f"{2 + n % 6} servings",
+            "recipeIngredient": [f"{i + 1} cups ingredient {i}" for i in range(12)],
+            "recipeInstructions": [{"@type": "HowToStep", "text": f"Step {i + 1}: stir and simmer."} for i in range(8)],
+            "image": f"https://example.com/images/{n}.jpg",
+        }
+        # Pad with ordinary markup so parsing cost resembles a real recipe blog page.
+        filler = "".join(f"<p class='story'>Paragraph {i} about this family recipe.</p>" for i in range(300))
+        return (
+            f"<html><head><title>{recipe['name']}</title>"
+            f"<script type='application/ld+json'>{json.dumps(recipe)}</script></head>"
+            f"<body><article>{filler}</article></body></html>"
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@dataclass
+class Sample:
+    action: str
+    started: float
+    latency: float
+    ok: bool
+
+
+@dataclass
+class Target:
+    """Ids discovered on the server, used to build realistic requests."""
+
+    recipe_ids: list[int]
+    shopping_items: list[tuple[int, int]]
+    site_url: str
+
+
+@dataclass
+class StepResult:
+    mode: str
+    level: float
+    duration: float
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    error_rate: float
+    actions: dict[str, dict] = field(default_factory=dict)
+
+
+Action = Callable[[httpx.AsyncClient, Target, random.Random], Awaitable[httpx.Response]]
+
+
+async def browse(client, target, rng):
+    return await client.get("/api/recipes", params={"skip": rng.choice([0, 0, 0, 50]), "limit": 50})
+
+
+async def detail(client, target, rng):
+    return await client.get(f"/api/recipes/{rng.choice(target.recipe_ids)}")
+
+
+async def week(client, target, rng):
+    return await client.get(f"/api/meal-plans/week/{date.today().isoformat()}")
+
+
+async def toggle(client, target, rng):
+    if not target.shopping_items:
+        return await week(client, target, rng)
+    list_id, item_id = rng.choice(target.shopping_items)
+    return await client.post(f"/api/shopping-lists/{list_id}/items/{item_id}/toggle")
+
+
+async def import_url(client, target, rng):
+    return await client.post("/api/recipes/import", json={"url": f"{target.site_url}/recipes/{rng.randrange(1000)}"})
+
+
+ACTIONS: dict[str, Action] = {
+    "browse": browse,
+    "detail": detail,
+    "week": week,
+    "toggle": toggle,
+    "import": import_url,
+}
+
+
+async def discover(client: httpx.AsyncClient, site_url: str) -> Target:
+    """Find ids to request, creating a minimal fixture on an empty server."""
+    recipes = (await client.get("/api/recipes", params={"limit": 500})).raise_for_status().json()
+    if not recipes:
+        print("target has no recipes; creating a small fixture", file=sys.stderr)
+        await _create_fixture(client)
+        recipes = (await client.get("/api/recipes", params={"limit": 500})).raise_for_status().json()
+    lists = (await client.get("/api/shopping-lists")).raise_for_status().json()
+    return Target(
+        recipe_ids=[recipe["id"] for recipe in recipes],
+        shopping_items=[(lst["id"], item["id"]) for lst in lists for item in lst["items"]],
+        site_url=site_url,
+    )
+
+
+async def _create_fixture(client: httpx.AsyncClient) -> None:
+    ingredient_ids = []
+    for i in range(20):
+        response = await client.post("/api/ingredients", json={"name": f"load-ingredient-{i}"})
+        ingredient_ids.append(response.raise_for_status().json()["id"])
+    for i in range(50):
+        response = await client.post(
+            "/api/recipes",
+            json={
+                "title": f"Load test recipe {i}",
+                "ingredients": [
+                    {"ingredient_id": ingredient_ids[(i + n) % 20], "quantity": "100", "unit": "g"} for n in range(6)
+                ],
+            },
+        )
+        recipe_id = response.raise_for_status().json()["id"]
+        if i < 21:
+            await client.post(
+                "/api/meal-plans",
+                json={"date": date.today().isoformat(), "meal_type": "dinner", "recipe_id": recipe_id},
+            )
+    shopping_list = (await client.post("/api/shopping-lists", json={"name": "Load test"})).json()
+    for i in range(20):
+        await client.post(f"/api/shopping-lists/{shopping_list['id']}/items", json={"name": f"item {i}"})
+
+
+class Recorder:
+    def __init__(self, error_threshold: float):
+        self.samples: list[Sample] = []
+        self.error_threshold = error_threshold
+        self.origin = time.perf_counter()
+
+    async def perform(self, name: str, client: httpx.AsyncClient, target: Target, rng: random.Random, started: float):
+        try:
+            response = await ACTIONS[name](client, target, rng)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        self.samples.append(Sample(name, started - self.origin, time.perf_counter() - started, ok))
+
+    def window(self, start: float, end: float) -> list[Sample]:
+        return [s for s in self.samples if start <= s.started + s.latency < end]
+
+    def format_window(self, samples: list[Sample], start: float, end: float) -> str:
+        if not samples:
+            return f"[{start:6.1f}s] no completed requests"
+        latencies = [s.latency * 1000 for s in samples]
+        errors = sum(not s.ok for s in samples)
+        rate = errors / len(samples)
+        flag = "  ERRORS" if rate > self.error_threshold else ""
+        return (
+            f"[{end:6.1f}s] {len(samples) / (end - start):8.1f} req/s  p50={percentile(latencies, 50):8.1f}ms "
+            f"p95={percentile(latencies, 95):8.1f}ms p99={percentile(latencies, 99):8.1f}ms "
+            f"errors={rate:6.2%}{flag}"
+        )
+
+
+async def _report_progress(recorder: Recorder, interval: float, stop: asyncio.Event) -> None:
+    start = time.perf_counter() - recorder.origin
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except TimeoutError:
+            pass
+        end = time.perf_counter() - recorder.origin
+        print(recorder.format_window(recorder.window(start, end), start, end), file=sys.stderr)
+        start = end
+
+
+def _choose(rng: random.Random, mix: dict[str, float]) -> str:
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+async def closed_loop(
+    client, target, recorder, mix, concurrency: int, duration: float, think_time: float, seed: int
+) -> None:
+    deadline = time.perf_counter() + duration
+
+    async def user(n: int):
+        rng = random.Random(seed + n)
+        while time.perf_counter() < deadline:
+            await recorder.perform(_choose(rng, mix), client, target, rng, time.perf_counter())
+            if think_time:
+                await asyncio.sleep(rng.expovariate(1 / think_time))
+
+    await asyncio.gather(*(user(n) for n in range(concurrency)))
+
+
+async def open_loop(client, target, recorder, mix, rate: float, duration: float, max_in_flight: int, seed: int) -> None:
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+
+    async def send(name: str, scheduled: float):
+        async with slots:
+            await recorder.perform(name, client, target, rng, scheduled)
+
+    start = time.perf_counter()
+    scheduled = start
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(_choose(rng, mix), scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        scheduled += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+def summarise(mode: str, level: float, samples: list[Sample], duration: float) -> StepResult:
+    latencies = [s.latency * 1000 for s in samples] or [0.0]
+    errors = sum(not s.ok for s in samples)
+    actions = {}
+    for name in sorted({s.action for s in samples}):
+        subset = [s for s in samples if s.action == name]
+        action_latencies = [s.latency * 1000 for s in subset]
+        actions[name] = {
+            "requests": len(subset),
+            "errors": sum(not s.ok for s in subset),
+            "p50_ms": round(percentile(action_latencies, 50), 2),
+            "p95_ms": round(percentile(action_latencies, 95), 2),
+        }
+    return StepResult(
+        mode=mode,
+        level=level,
+        duration=round(duration, 2),
+        requests=len(samples),
+        errors=errors,
+        throughput=round(len(samples) / duration, 2) if duration else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        error_rate=round(errors / len(samples), 4) if samples else 0.0,
+        actions=actions,
+    )
+
+
+def saturation_point(steps: list[StepResult], min_gain: float = 0.1, error_threshold: float = 0.01) -> StepResult | None:
+    """First step where the server stopped keeping up.
+
+    That is a step over the error threshold, an open-loop step that completed
+    less than ``1 - min_gain`` of its offered rate, or a closed-loop step whose
+    throughput grew by less than ``min_gain`` over the previous step.
+    """
+    previous = None
+    for step in steps:
+        if step.error_rate > error_threshold:
+            return step
+        if step.mode == "open" and step.throughput < step.level * (1 - min_gain):
+            return step
+        if step.mode == "closed" and previous and previous.throughput:
+            if (step.throughput - previous.throughput) / previous.throughput < min_gain:
+                return step
+        previous = step
+    return None
+
+
+async def run(args: argparse.Namespace, site_url: str) -> list[StepResult]:
+    levels = args.rate if args.mode == "open" else args.concurrency
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    steps = []
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        target = await discover(client, site_url)
+        for level in levels:
+            print(f"--- {args.mode} loop, {'rate' if args.mode == 'open' else 'concurrency'}={level:g}", file=sys.stderr)
+            recorder = Recorder(args.max_error_rate)
+            stop = asyncio.Event()
+            progress = asyncio.create_task(_report_progress(recorder, args.interval, stop))
+            started = time.perf_counter()
+            if args.mode == "open":
+                await open_loop(client, target, recorder, args.mix, level, args.duration, max(args.concurrency), args.seed)
+            else:
+                await closed_loop(
+                    client, target, recorder, args.mix, int(level), args.duration, args.think_time, args.seed
+                )
+            stop.set()
+            await progress
+            step = summarise(args.mode, level, recorder.samples, time.perf_counter() - started)
+            flag = "  ERRORS" if step.error_rate > args.max_error_rate else ""
+            print(
+                f"=== {step.throughput:.1f} req/s  p50={step.p50_ms:.1f}ms p95={step.p95_ms:.1f}ms "
+                f"p99={step.p99_ms:.1f}ms errors={step.error_rate:.2%}{flag}",
+                file=sys.stderr,
+            )
+            steps.append(step)
+    return steps
+
+
+def _levels(value: str) -> list[float]:
+    return [float(level) for level in value.split(",")]
+
+
+def _mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=_levels, default=[10], help="virtual users per step (closed loop), "
+                        "or the in-flight cap (open loop)")
+    parser.add_argument("--rate", type=_levels, default=[20], help="requests/second per step (open loop)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per step")
+    parser.add_argument("--think-time", type=float, default=0, help="mean pause between a user's requests (s)")
+    parser.add_argument("--mix", type=_mix, default=DEFAULT_MIX, help="e.g. browse=40,detail=30,week=15,toggle=10,import=5")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between progress lines")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="flag windows/steps above this error rate")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--site-port", type=int, default=8765, help="port for the fake recipe site")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="seconds the fake site waits per page")
+    parser.add_argument("--label", help="free-form note stored with the results, e.g. 'workers=4'")
+    parser.add_argument("--output", type=Path, help=f"results file (default: {RESULTS_DIR}/load-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(level) for level in args.concurrency]
+
+    with FakeRecipeSite(port=args.site_port, latency=args.site_latency) as site:
+        steps = asyncio.run(run(args, site.base_url))
+
+    knee = saturation_point(steps, error_threshold=args.max_error_rate)
+    if knee:
+        print(
+            f"saturated at {args.mode}-loop level {knee.level:g}: {knee.throughput:.1f} req/s, "
+            f"p95 {knee.p95_ms:.1f}ms, errors {knee.error_rate:.2%}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "base_url": args.base_url,
+        "label": args.label,
+        "mode": args.mode,
+        "mix": args.mix,
+        "steps": [asdict(step) for step in steps],
+        "saturation_level": knee.level if knee else None,
+    }
+    output = write_report(report, args.output, "load")
+    print(f"results written to {output}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Microbenchmarks for the pure parsing, scaling and serialization paths.
+
+    python -m benchmarks.micro                  # current vs. baseline, every function
+    python -m benchmarks.micro -k duration --min-time 1
+    python -m benchmarks.micro --check          # also verify outputs match the baselines
+
+Each benchmark calls the function once per corpus item. Passes repeat until
+``--min-time`` has elapsed, and the best of ``--repeat`` runs is reported as
+ops/sec. Peak allocation per call comes from a separate tracemalloc pass.
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+
+from app.api.recipes import recipe_list_item
+from app.services import ingredient_matching
+from app.services.ingredient_matching import IngredientMatcher
+from app.utils import ingredient_parser, recipe_import, scaling
+
+from . import baselines, corpus
+from .reporting import RESULTS_DIR, git_revision, write_report
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+
+
+def load_script(name: str) -> ModuleType:
+    """Import a module from ``scripts/``, which is not a package."""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class Bench:
+    name: str
+    current: Callable
+    # None for code written fresh, with no earlier implementation to compare against.
+    baseline: Callable | None
+    inputs: list[tuple]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    implementation: str
+    calls: int
+    ops_per_sec: float
+    ns_per_op: float
+    peak_bytes_per_op: float
+
+
+def render_recipe_list(recipes: list) -> bytes:
+    return ORJSONResponse([recipe_list_item(r, is_favorite=r.favorite is not None) for r in recipes]).body
+
+
+def extract_recipe(html: str, url: str) -> dict:
+    """What the importer runs: JSON-LD fast path, falling back to the full parse."""
+    return recipe_import.extract_recipe(html, url)[0]
+
+
+def resolve_ingredients(matcher: IngredientMatcher) -> Callable[[str], list[dict]]:
+    """Parse and match one line, as imports do for every ingredient."""
+    return lambda line: ingredient_matching.resolve_ingredients([line], matcher)
+
+
+def build_benches(vault: Path) -> list[Bench]:
+    obsidian = load_script("import_obsidian_recipes")
+    matcher = IngredientMatcher(corpus.ingredient_catalog())
+    return [
+        Bench("scale_quantity", scaling.scale_quantity, baselines.scale_quantity, corpus.quantities()),
+        Bench("parse_duration", recipe_import.parse_duration, baselines.parse_duration,
+              [(value,) for value in corpus.durations()]),
+        Bench("parse_servings", recipe_import.parse_servings, baselines.parse_servings,
+              [(value,) for value in corpus.yields()]),
+        Bench("parse_instructions", recipe_import.parse_instructions, baselines.parse_instructions,
+              [(value,) for value in corpus.instruction_payloads()]),
+        Bench("parse_ingredient_text", obsidian.parse_ingredient_text, baselines.parse_ingredient_text,
+              [(line,) for line in corpus.ingredient_lines()]),
+        Bench("parse_ingredient_line", ingredient_parser.parse_ingredient_line, None,
+              [(line,) for line in corpus.ingredient_lines()]),
+        Bench("resolve_ingredients", resolve_ingredients(matcher), None,
+              [(line,) for line in corpus.ingredient_lines()]),
+        Bench("parse_obsidian_recipe", obsidian.parse_obsidian_recipe, baselines.parse_obsidian_recipe,
+              [(path,) for path in corpus.markdown_vault(vault)]),
+        Bench("parse_recipe_html", recipe_import.parse_recipe_html, baselines.parse_recipe_html,
+              corpus.recipe_html()),
+        Bench("extract_recipe", extract_recipe, baselines.parse_recipe_html, corpus.recipe_html()),
+        # One call renders a whole 50-recipe list page.
+        Bench("render_recipe_list", render_recipe_list, baselines.render_recipe_list,
+              [(corpus.recipe_page(50),)]),
+    ]
+
+
+def _one_pass(func: Callable, inputs: list[tuple]) -> float:
+    start = time.perf_counter()
+    for args in inputs:
+        func(*args)
+    return time.perf_counter() - start
+
+
+def measure(name: str, implementation: str, func: Callable, inputs: list[tuple], min_time: float, repeat: int) -> BenchResult:
+    _one_pass(func, inputs)  # warm caches (regex compilation, file system)
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            passes, elapsed = 0, 0.0
+            while elapsed < min_time or not passes:
+                elapsed += _one_pass(func, inputs)
+                passes += 1
+            best = min(best, elapsed / passes)
+    finally:
+        gc.enable()
+
+    peaks = 0
+    tracemalloc.start()
+    try:
+        for args in inputs:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            peaks += tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    per_op = best / len(inputs)
+    return BenchResult(
+        name=name,
+        implementation=implementation,
+        calls=len(inputs),
+        ops_per_sec=round(1 / per_op, 1),
+        ns_per_op=round(per_op * 1e9, 1),
+        peak_bytes_per_op=round(peaks / len(inputs), 1),
+    )
+
+
+def _normalise(value: Any) -> Any:
+    # parse_obsidian_recipe echoes the path it read; compare everything else.
+    if isinstance(value, bytes):
+        return json.loads(value)
+    if isinstance(value, dict):
+        return {key: item for key, item in value.items() if key != "file_path"}
+    return value
+
+
+def check(bench: Bench) -> list[tuple]:
+    """Inputs where the current implementation disagrees with the baseline."""
+    if bench.baseline is None:
+        return []
+    return [args for args in bench.inputs if _normalise(bench.current(*args)) != _normalise(bench.baseline(*args))]
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    before = {(entry["name"], entry["implementation"]): entry for entry in previous["results"]}
+    lines = []
+    for entry in current["results"]:
+        old = before.get((entry["name"], entry["implementation"]))
+        if old:
+            change = entry["ops_per_sec"] / old["ops_per_sec"] - 1
+            lines.append(
+                f"{entry['name']:<24} {entry['implementation']:<9} "
+                f"{old['ops_per_sec']:>12,.0f} -> {entry['ops_per_sec']:>12,.0f} ops/s {change:+.1%}"
+            )
+    return lines
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-baseline", action="store_true", help="skip the baseline implementations")
+    parser.add_argument("--check", action="store_true", help="fail if outputs differ from the baselines")
+    parser.add_argument("--output", type=Path, help=f"results file (default: {RESULTS_DIR}/micro-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="previous results file to diff against")
+    args = parser.parse_args(argv)
+
+    results, mismatches = [], {}
+    with tempfile.TemporaryDirectory() as vault:
+        for bench in build_benches(Path(vault)):
+            if args.filter and args.filter not in bench.name:
+                continue
+            implementations = [("current", bench.current)]
+            if not args.no_baseline and bench.baseline is not None:
+                implementations.append(("baseline", bench.baseline))
+            timings = {}
+            for implementation, func in implementations:
+                result = measure(bench.name, implementation, func, bench.inputs, args.min_time, args.repeat)
+                timings[implementation] = result
+                results.append(result)
+            speedup = (
+                f"  x{timings['current'].ops_per_sec / timings['baseline'].ops_per_sec:.2f} vs baseline"
+                if "baseline" in timings
+                else ""
+            )
+            current = timings["current"]
+            print(
+                f"{bench.name:<24} {current.ops_per_sec:>12,.0f} ops/s {current.ns_per_op:>10,.0f} ns/op "
+                f"{current.peak_bytes_per_op:>8,.0f} B/op{speedup}",
+                file=sys.stderr,
+            )
+            if args.check and (diff := check(bench)):
+                mismatches[bench.name] = [repr(a) for a in diff[:5]]
+                print(f"  {len(diff)} inputs differ from baseline, e.g. {diff[0]!r}", file=sys.stderr)
+
+    report = {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "options": {"min_time": args.min_time, "repeat": args.repeat},
+        "results": [asdict(result) for result in results],
+        "mismatches": mismatches,
+    }
+    output = write_report(report, args.output, "micro")
+    print(f"results written to {output}", file=sys.stderr)
+    if args.compare:
+        print("\n".join(compare(json.loads(args.compare.read_text()), report)))
+    if mismatches:
+        raise SystemExit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
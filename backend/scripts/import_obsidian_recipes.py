@@ -1,16 +1,41 @@
 #!/usr/bin/env python3
-"""Import recipes from Obsidian vault into kitchen-buddy database."""
-
+"""Import recipes from Obsidian vault into kitchen-buddy database.
+
+Notes are parsed in a process pool, then written in batches: each batch
+inserts its new ingredients, recipes and recipe ingredients with one
+multi-row INSERT per table and commits once; a batch that fails is
+retried one note at a time, so a bad note costs only itself. Ingredient
+names and existing recipe titles are loaded up front and resolved in
+memory, so the import runs a handful of statements per batch instead of
+several per note.
+
+With --sync only notes added, changed, renamed or removed since the last
+sync are applied (see ``VaultSync``); --watch keeps syncing as they change.
+The vault comes from --vault or the OBSIDIAN_VAULT_PATH setting.
+"""
+
+import argparse
+import hashlib
+import os
 import re
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy import delete, insert, select, update
+
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.recipe import Recipe, RecipeIngredient
 from app.models.ingredient import Ingredient
+from app.models.vault_file import VaultFile
 from app.core.enums import DifficultyLevel
 
 
@@ -158,172 +183,595 @@ def parse_ingredient_text(text: str) -> dict:
     }
 
 
-def get_or_create_ingredient(db, name: str) -> Ingredient:
-    """Get existing ingredient or create new one."""
-    # Normalize name: remove leading quantities, units, and other noise
+def normalize_ingredient_name(name: str) -> str:
+    """Strip leading quantities and units the line parser left in the name."""
     normalized_name = name.lower().strip()
 
     # Strip leading quantity patterns (e.g., "1\2 łyżki", "5-6 łyżek", etc.)
     normalized_name = re.sub(r'^[\d\\/\\\-]+\s+', '', normalized_name)  # Remove leading numbers/slashes
     normalized_name = re.sub(r'^(łyżk[ia]|łyżek|ząbk(ów|a|i)|cup|cups|tablespoon|tablespoons|teaspoon|teaspoons|tsp|tbsp|g|ml|oz|kg|pinch|dash|stick)\s+', '', normalized_name, flags=re.IGNORECASE)
-    normalized_name = normalized_name.strip()
+    return normalized_name.strip()
 
-    # Try to find existing (use exact match since we normalized)
-    ingredient = db.query(Ingredient).filter(
-        Ingredient.name.ilike(normalized_name)
-    ).first()
 
-    if not ingredient:
-        ingredient = Ingredient(name=normalized_name)
-        db.add(ingredient)
-        db.flush()
+def instructions_text(steps: list[str]) -> str | None:
+    return "\n".join(f"{i+1}. {step}" for i, step in enumerate(steps)) or None
 
-    return ingredient
 
+def _parse_file(file_path: Path) -> tuple[Path, dict | None, str | None]:
+    # Runs in a worker process; errors come back as values so one bad note
+    # does not abort the whole map.
+    try:
+        return file_path, parse_obsidian_recipe(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
 
-def import_recipe(db, parsed_recipe: dict, dry_run: bool = False, update: bool = False) -> tuple[Recipe | None, str]:
-    """Import a single recipe into database.
 
-    Returns tuple of (Recipe, status) where status is 'imported', 'skipped', 'updated', or 'error'
-    """
-    # Check if recipe already exists
-    existing = db.query(Recipe).filter(
-        Recipe.title == parsed_recipe["title"]
-    ).first()
-
-    if existing:
-        if not update:
-            print(f"  ⚠️  Recipe '{parsed_recipe['title']}' already exists (ID: {existing.id})")
-            return existing, "skipped"
-
-        # Update existing recipe
-        instructions = "\n".join(f"{i+1}. {step}" for i, step in enumerate(parsed_recipe["steps"]))
-        existing.instructions = instructions if instructions else existing.instructions
-
-        if not dry_run:
-            # Delete existing ingredients
-            db.query(RecipeIngredient).filter(RecipeIngredient.recipe_id == existing.id).delete()
-
-            # Add new ingredients
-            for ing_text in parsed_recipe["ingredients"]:
-                parsed_ing = parse_ingredient_text(ing_text)
-                ingredient = get_or_create_ingredient(db, parsed_ing["name"])
-
-                recipe_ing = RecipeIngredient(
-                    recipe_id=existing.id,
-                    ingredient_id=ingredient.id,
-                    quantity=parsed_ing["quantity"],
-                    unit=parsed_ing["unit"]
-                )
-                db.add(recipe_ing)
-
-            db.commit()
-            print(f"  🔄 Updated '{existing.title}' (ID: {existing.id}, {len(parsed_recipe['ingredients'])} ingredients)")
-            return existing, "updated"
+# Below this many notes, starting worker processes costs more than parsing.
+POOL_MIN_FILES = 32
+
+
+def parse_vault(recipe_files: list[Path], workers: int) -> list[dict]:
+    """Parse notes in up to ``workers`` processes, keeping the files' order."""
+    workers = min(workers, len(recipe_files))
+    if workers <= 1 or len(recipe_files) < POOL_MIN_FILES:
+        results = map(_parse_file, recipe_files)
+        return _collect_parsed(results)
+
+    chunksize = max(1, len(recipe_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _collect_parsed(pool.map(_parse_file, recipe_files, chunksize=chunksize))
+
+
+def _collect_parsed(results) -> list[dict]:
+    parsed_recipes = []
+    for file_path, parsed, error in results:
+        if error is not None:
+            print(f"❌ Error parsing {file_path.name}: {error}")
         else:
-            print(f"  [DRY RUN] Would update '{existing.title}' with {len(parsed_recipe['ingredients'])} ingredients")
-            return existing, "updated"
-
-    # Build instructions from steps
-    instructions = "\n".join(f"{i+1}. {step}" for i, step in enumerate(parsed_recipe["steps"]))
-
-    # Create recipe
-    recipe = Recipe(
-        title=parsed_recipe["title"],
-        instructions=instructions if instructions else None,
-        difficulty=DifficultyLevel.MEDIUM,  # Default
-        servings=4,  # Default
-    )
+            parsed_recipes.append(parsed)
+    return parsed_recipes
+
+
+class RecipeImporter:
+    """Write parsed recipes in batches, resolving names against in-memory maps.
 
-    if not dry_run:
-        db.add(recipe)
-        db.flush()  # Get recipe ID
+    Both maps are loaded once: ingredient ids by lower-cased name (the old
+    per-line ``ilike`` lookup) and recipe ids by title. Rows a batch adds
+    are put into the maps too, and taken out again if the batch rolls back.
+    """
+
+    def __init__(self, db, dry_run: bool = False, update: bool = False) -> None:
+        self.db = db
+        self.dry_run = dry_run
+        self.update = update
+        self.ingredient_ids: dict[str, int | None] = {}
+        for ingredient_id, name in db.execute(select(Ingredient.id, Ingredient.name).order_by(Ingredient.id)):
+            self.ingredient_ids.setdefault(name.lower(), ingredient_id)
+        self.recipe_ids: dict[str, int | None] = {}
+        for recipe_id, title in db.execute(select(Recipe.id, Recipe.title).order_by(Recipe.id)):
+            self.recipe_ids.setdefault(title, recipe_id)
+        self.counts = {"imported": 0, "updated": 0, "skipped": 0, "errors": 0, "ingredients": 0}
+
+    def import_batch(self, parsed_recipes: list[dict]) -> None:
+        error = self._import(parsed_recipes)
+        if error is None:
+            return
+        if len(parsed_recipes) == 1:
+            print(f"❌ Error importing '{parsed_recipes[0]['title']}': {error}")
+            self.counts["errors"] += 1
+            return
+        # One bad note should not cost the rest of its batch: retry them one at a time.
+        titles = f"'{parsed_recipes[0]['title']}' … '{parsed_recipes[-1]['title']}'"
+        print(f"⚠️  Batch {titles} failed ({error}), retrying one recipe at a time")
+        for parsed_recipe in parsed_recipes:
+            self.import_batch([parsed_recipe])
 
-        # Add ingredients
+    def _import(self, parsed_recipes: list[dict]) -> Exception | None:
+        """Write and commit one batch; on failure roll it back and return the error."""
+        added_titles: list[str] = []
+        added_names: list[str] = []
+        try:
+            counts = self._write_batch(parsed_recipes, added_titles, added_names)
+            if not self.dry_run:
+                self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for title in added_titles:
+                del self.recipe_ids[title]
+            for name in added_names:
+                del self.ingredient_ids[name]
+            return e
+        for key, value in counts.items():
+            self.counts[key] += value
+        return None
+
+    def _write_batch(self, parsed_recipes: list[dict], added_titles: list[str], added_names: list[str]) -> dict:
+        counts = {"imported": 0, "updated": 0, "skipped": 0, "ingredients": 0}
+        new_recipes: list[dict] = []
+        updated_recipes: list[dict] = []
+        for parsed_recipe in parsed_recipes:
+            title = parsed_recipe["title"]
+            if title in self.recipe_ids:
+                if not self.update:
+                    counts["skipped"] += 1
+                    continue
+                updated_recipes.append(parsed_recipe)
+            else:
+                # A second note with the same title is a duplicate of this one.
+                self.recipe_ids[title] = None
+                added_titles.append(title)
+                new_recipes.append(parsed_recipe)
+
+        # Resolve every ingredient line, collecting names not seen before.
+        new_names: list[str] = []
+        lines_by_recipe = {
+            parsed_recipe["title"]: self.resolve_lines(parsed_recipe, new_names)
+            for parsed_recipe in new_recipes + updated_recipes
+        }
+        added_names.extend(new_names)
+        counts["imported"] = len(new_recipes)
+        counts["updated"] = len(updated_recipes)
+        counts["ingredients"] = len(new_names)
+        if self.dry_run:
+            return counts
+
+        self.insert_ingredients(new_names)
+        self.insert_recipes(new_recipes)
+
+        if updated_recipes:
+            updated_ids = [self.recipe_ids[parsed_recipe["title"]] for parsed_recipe in updated_recipes]
+            # Empty steps keep the existing instructions, as before.
+            instructions = [
+                {"id": self.recipe_ids[parsed_recipe["title"]], "instructions": instructions_text(parsed_recipe["steps"])}
+                for parsed_recipe in updated_recipes
+                if parsed_recipe["steps"]
+            ]
+            if instructions:
+                self.db.execute(update(Recipe), instructions)
+            self.db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id.in_(updated_ids)))
+
+        recipe_ingredients = [
+            {
+                "recipe_id": self.recipe_ids[title],
+                "ingredient_id": self.ingredient_ids[name],
+                "quantity": parsed_ing["quantity"],
+                "unit": parsed_ing["unit"],
+            }
+            for title, lines in lines_by_recipe.items()
+            for parsed_ing, name in lines
+        ]
+        if recipe_ingredients:
+            self.db.execute(insert(RecipeIngredient), recipe_ingredients)
+        return counts
+
+    def resolve_lines(self, parsed_recipe: dict, new_names: list[str]) -> list[tuple[dict, str]]:
+        """Parse a recipe's ingredient lines, adding names not seen before to ``new_names``."""
+        lines = []
         for ing_text in parsed_recipe["ingredients"]:
             parsed_ing = parse_ingredient_text(ing_text)
-            ingredient = get_or_create_ingredient(db, parsed_ing["name"])
+            name = normalize_ingredient_name(parsed_ing["name"])
+            if name not in self.ingredient_ids:
+                self.ingredient_ids[name] = None
+                new_names.append(name)
+            lines.append((parsed_ing, name))
+        return lines
+
+    def insert_ingredients(self, names: list[str]) -> None:
+        if not names:
+            return
+        rows = self.db.execute(
+            insert(Ingredient).returning(Ingredient.id, sort_by_parameter_order=True),
+            [{"name": name} for name in names],
+        )
+        for name, ingredient_id in zip(names, rows.scalars()):
+            self.ingredient_ids[name] = ingredient_id
+
+    def insert_recipes(self, parsed_recipes: list[dict]) -> list[int]:
+        if not parsed_recipes:
+            return []
+        rows = self.db.execute(
+            insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": parsed_recipe["title"],
+                    "instructions": instructions_text(parsed_recipe["steps"]),
+                    "difficulty": DifficultyLevel.MEDIUM,  # Default
+                    "servings": 4,  # Default
+                }
+                for parsed_recipe in parsed_recipes
+            ],
+        )
+        recipe_ids = list(rows.scalars())
+        for parsed_recipe, recipe_id in zip(parsed_recipes, recipe_ids):
+            self.recipe_ids[parsed_recipe["title"]] = recipe_id
+        return recipe_ids
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclass
+class NoteChange:
+    path: str  # relative to the vault, as stored in vault_files
+    file: Path
+    mtime_ns: int
+    size: int
+    content_hash: str
+    kind: str  # "new", "changed", "renamed" or "touched"
+    row: Any = None  # the note's vault_files row, when it has one
+
+
+class VaultSync:
+    """Bring the database in line with the vault, touching only what changed.
+
+    Every synced note is recorded in ``vault_files`` with its mtime, size
+    and content hash:
+
+    - a note with the same mtime and size is not read at all;
+    - one whose bytes hash the same (touched, or saved without edits) only
+      has its mtime recorded;
+    - a new path with the hash of a note that disappeared is a rename and
+      keeps its recipe;
+    - changed and renamed notes are parsed again and their recipe updated
+      with a diff: title and instructions when they differ, and only the
+      ingredient rows that were added or removed;
+    - a new note takes over the recipe with its title when no other note
+      has it (one imported before the vault was synced) and updates it,
+      or becomes a new recipe.
+
+    Recipes of notes deleted from the vault are kept; only their
+    ``vault_files`` row is removed.
+    """
 
-            recipe_ing = RecipeIngredient(
-                recipe_id=recipe.id,
-                ingredient_id=ingredient.id,
-                quantity=parsed_ing["quantity"],
-                unit=parsed_ing["unit"]
+    def __init__(self, db, vault: Path, workers: int = 1, batch_size: int = 500, dry_run: bool = False) -> None:
+        self.db = db
+        self.vault = vault
+        self.workers = workers
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def scan(self) -> tuple[list[NoteChange], list[Any], int]:
+        """Changed notes, ``vault_files`` rows of removed ones, and the unchanged count."""
+        known = {
+            row.path: row
+            for row in self.db.execute(
+                select(VaultFile.id, VaultFile.path, VaultFile.mtime_ns, VaultFile.size,
+                       VaultFile.content_hash, VaultFile.recipe_id)
+            )
+        }
+        present = set()
+        changes = []
+        unchanged = 0
+        for file in sorted(self.vault.rglob("*.md")):
+            path = file.relative_to(self.vault).as_posix()
+            try:
+                stat = file.stat()
+                row = known.get(path)
+                if row is not None and (row.mtime_ns, row.size) == (stat.st_mtime_ns, stat.st_size):
+                    present.add(path)
+                    unchanged += 1
+                    continue
+                content_hash = file_hash(file)
+            except FileNotFoundError:
+                continue  # deleted while scanning
+            present.add(path)
+            if row is None:
+                kind = "new"
+            elif row.content_hash == content_hash:
+                kind = "touched"
+            else:
+                kind = "changed"
+            changes.append(NoteChange(path, file, stat.st_mtime_ns, stat.st_size, content_hash, kind, row))
+
+        removed = {path: row for path, row in known.items() if path not in present}
+        by_hash: dict[str, list[Any]] = {}
+        for row in removed.values():
+            by_hash.setdefault(row.content_hash, []).append(row)
+        for change in changes:
+            if change.kind == "new" and by_hash.get(change.content_hash):
+                change.row = by_hash[change.content_hash].pop()
+                change.kind = "renamed"
+                del removed[change.row.path]
+        return changes, list(removed.values()), unchanged
+
+    def run(self) -> dict:
+        changes, removed, unchanged = self.scan()
+        counts = {
+            "unchanged": unchanged,
+            "touched": 0,
+            "renamed": 0,
+            "removed": len(removed),
+            "created": 0,
+            "linked": 0,
+            "updated": 0,
+            "errors": 0,
+            "ingredients": 0,
+        }
+        for change in changes:
+            if change.kind in ("touched", "renamed"):
+                counts[change.kind] += 1
+        if self.dry_run:
+            counts["new"] = sum(change.kind == "new" for change in changes)
+            counts["changed"] = sum(change.kind == "changed" for change in changes)
+            return counts
+
+        touched = [change for change in changes if change.kind == "touched"]
+        if touched:
+            self.db.execute(update(VaultFile), [
+                {"id": change.row.id, "mtime_ns": change.mtime_ns, "size": change.size} for change in touched
+            ])
+        if removed:
+            self.db.execute(delete(VaultFile).where(VaultFile.id.in_([row.id for row in removed])))
+        self.db.commit()
+
+        importer = RecipeImporter(self.db)
+        to_parse = [change for change in changes if change.kind != "touched"]
+        for i in range(0, len(to_parse), self.batch_size):
+            batch = to_parse[i:i + self.batch_size]
+            claimed = set(self.db.scalars(select(VaultFile.recipe_id).where(VaultFile.recipe_id.is_not(None))))
+            try:
+                self._sync_batch(importer, batch, claimed, counts)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                print(f"❌ Error syncing {batch[0].path} … {batch[-1].path}: {e}")
+                counts["errors"] += len(batch)
+                # The maps may hold ids from the rolled-back transaction.
+                importer = RecipeImporter(self.db)
+        return counts
+
+    def _sync_batch(self, importer: RecipeImporter, batch: list[NoteChange], claimed: set[int], counts: dict) -> None:
+        parsed_by_file = {parsed["file_path"]: parsed for parsed in parse_vault([c.file for c in batch], self.workers)}
+
+        # Each note keeps its recipe, takes over an unclaimed one with the
+        # same title, or gets a new one.
+        synced: list[tuple[NoteChange, dict]] = []
+        recipe_ids: dict[int, int] = {}  # by id() of the parsed note
+        created: list[dict] = []
+        for change in batch:
+            parsed = parsed_by_file.get(str(change.file))
+            if parsed is None:
+                counts["errors"] += 1  # reported by parse_vault, retried next sync
+                continue
+            synced.append((change, parsed))
+            recipe_id = change.row.recipe_id if change.row is not None else None
+            if recipe_id is None:
+                recipe_id = importer.recipe_ids.get(parsed["title"])
+                if recipe_id is None or recipe_id in claimed:
+                    created.append(parsed)
+                    continue
+                claimed.add(recipe_id)
+                counts["linked"] += 1
+            recipe_ids[id(parsed)] = recipe_id
+
+        new_names: list[str] = []
+        lines = {id(parsed): importer.resolve_lines(parsed, new_names) for _, parsed in synced}
+        importer.insert_ingredients(new_names)
+        for parsed, recipe_id in zip(created, importer.insert_recipes(created)):
+            recipe_ids[id(parsed)] = recipe_id
+            claimed.add(recipe_id)
+        created_lines = [
+            self._ingredient_row(importer, recipe_ids[id(parsed)], parsed_ing, name)
+            for parsed in created
+            for parsed_ing, name in lines[id(parsed)]
+        ]
+        if created_lines:
+            self.db.execute(insert(RecipeIngredient), created_lines)
+        counts["created"] += len(created)
+        counts["ingredients"] += len(new_names)
+
+        new_ids = {id(parsed) for parsed in created}
+        updates = {recipe_ids[id(parsed)]: parsed for _, parsed in synced if id(parsed) not in new_ids}
+        counts["updated"] += self._apply_diffs(importer, updates, lines)
+
+        rows = [
+            {
+                "path": change.path,
+                "mtime_ns": change.mtime_ns,
+                "size": change.size,
+                "content_hash": change.content_hash,
+                "recipe_id": recipe_ids[id(parsed)],
+            }
+            for change, parsed in synced
+        ]
+        inserts = [row for (change, _), row in zip(synced, rows) if change.row is None]
+        updated = [{"id": change.row.id, **row} for (change, _), row in zip(synced, rows) if change.row is not None]
+        if inserts:
+            self.db.execute(insert(VaultFile), inserts)
+        if updated:
+            self.db.execute(update(VaultFile), updated)
+
+    @staticmethod
+    def _ingredient_row(importer: RecipeImporter, recipe_id: int, parsed_ing: dict, name: str) -> dict:
+        return {
+            "recipe_id": recipe_id,
+            "ingredient_id": importer.ingredient_ids[name],
+            "quantity": parsed_ing["quantity"],
+            "unit": parsed_ing["unit"],
+        }
+
+    def _apply_diffs(self, importer: RecipeImporter, updates: dict[int, dict], lines: dict) -> int:
+        """Update recipes whose note changed; returns how many actually differed."""
+        if not updates:
+            return 0
+        ids = list(updates)
+        current = {
+            row.id: row for row in self.db.execute(
+                select(Recipe.id, Recipe.title, Recipe.instructions).where(Recipe.id.in_(ids))
+            )
+        }
+        current_lines: dict[int, list[tuple[int, tuple]]] = {}
+        for row in self.db.execute(
+            select(RecipeIngredient.id, RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id,
+                   RecipeIngredient.quantity, RecipeIngredient.unit)
+            .where(RecipeIngredient.recipe_id.in_(ids))
+            .order_by(RecipeIngredient.id)
+        ):
+            current_lines.setdefault(row.recipe_id, []).append(
+                (row.id, (row.ingredient_id, row.quantity, row.unit))
             )
-            db.add(recipe_ing)
 
-        db.commit()
-        print(f"  ✅ Imported '{recipe.title}' (ID: {recipe.id}, {len(parsed_recipe['ingredients'])} ingredients)")
-        return recipe, "imported"
-    else:
-        print(f"  [DRY RUN] Would import '{recipe.title}' with {len(parsed_recipe['ingredients'])} ingredients")
-        return None, "imported"
+        recipe_updates, stale, added = [], [], []
+        changed = 0
+        for recipe_id, parsed in updates.items():
+            recipe = current.get(recipe_id)
+            if recipe is None:
+                continue  # deleted since the scan
+            wanted = [
+                self._ingredient_row(importer, recipe_id, parsed_ing, name) for parsed_ing, name in lines[id(parsed)]
+            ]
+            # Keep the rows that are still wanted; delete the rest, insert what is missing.
+            missing = Counter((row["ingredient_id"], row["quantity"], row["unit"]) for row in wanted)
+            removed = []
+            for line_id, key in current_lines.get(recipe_id, ()):
+                if missing[key] > 0:
+                    missing[key] -= 1
+                else:
+                    removed.append(line_id)
+            new_lines = []
+            for row in wanted:
+                key = (row["ingredient_id"], row["quantity"], row["unit"])
+                if missing[key] > 0:
+                    missing[key] -= 1
+                    new_lines.append(row)
+
+            # Empty steps keep the existing instructions, as with --update.
+            instructions = instructions_text(parsed["steps"]) if parsed["steps"] else recipe.instructions
+            edited = (parsed["title"], instructions) != (recipe.title, recipe.instructions)
+            if edited:
+                recipe_updates.append({"id": recipe_id, "title": parsed["title"], "instructions": instructions})
+                importer.recipe_ids.setdefault(parsed["title"], recipe_id)
+            if edited or removed or new_lines:
+                changed += 1
+            stale.extend(removed)
+            added.extend(new_lines)
+
+        if recipe_updates:
+            self.db.execute(update(Recipe), recipe_updates)
+        if stale:
+            self.db.execute(delete(RecipeIngredient).where(RecipeIngredient.id.in_(stale)))
+        if added:
+            self.db.execute(insert(RecipeIngredient), added)
+        return changed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="parse and resolve without writing")
+    parser.add_argument("--update", action="store_true", help="replace existing recipes' steps and ingredients")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parser processes (default: CPUs)")
+    parser.add_argument("--batch-size", type=int, default=500, help="recipes per transaction (default: 500)")
+    parser.add_argument("--vault", default=settings.obsidian_vault_path,
+                        help="folder of recipe notes (default: OBSIDIAN_VAULT_PATH)")
+    parser.add_argument("--sync", action="store_true",
+                        help="only apply notes added, changed, renamed or removed since the last sync")
+    parser.add_argument("--watch", action="store_true", help="sync, then keep syncing as notes change")
+    args = parser.parse_args(argv)
+    if not args.vault:
+        parser.error("no vault given: pass --vault or set OBSIDIAN_VAULT_PATH")
+    args.vault = Path(args.vault).expanduser()
+    if not args.vault.is_dir():
+        parser.error(f"vault not found: {args.vault}")
+    if args.watch and args.dry_run:
+        parser.error("--watch cannot be combined with --dry-run")
+    return args
 
 
 def main():
     """Main import function."""
-    obsidian_recipes_path = Path(
-        "/Users/marcin.skalski@konghq.com/Library/Mobile Documents/"
-        "iCloud~md~obsidian/Documents/second-brain/3_Resources/Cooking/recipes 2"
-    )
+    args = parse_args()
+    if args.watch:
+        watch_vault(args, args.vault)
+    elif args.sync:
+        sync_vault(args, args.vault)
+    else:
+        import_vault(args, args.vault)
+
+
+def sync_vault(args: argparse.Namespace, vault: Path) -> dict:
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counts = VaultSync(db, vault, args.workers, args.batch_size, dry_run=args.dry_run).run()
+        seconds = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"{'[DRY RUN] ' if args.dry_run else ''}Synced {vault} in {seconds:.2f}s:")
+    for key, value in counts.items():
+        if value:
+            print(f"  {key.capitalize()}: {value}")
+    return counts
+
+
+def watch_vault(args: argparse.Namespace, vault: Path) -> None:
+    # Imported here so one-off imports do not load it; uses inotify on Linux.
+    from watchfiles import DefaultFilter, watch
+
+    sync_vault(args, vault)
+    # Obsidian rewrites its workspace files constantly; those are not notes.
+    watch_filter = DefaultFilter(ignore_dirs=(*DefaultFilter.ignore_dirs, ".obsidian", ".trash"))
+    print(f"\n👀 Watching {vault} for changes (Ctrl+C to stop)\n")
+    try:
+        # A rescan only reads notes whose mtime or size moved, and sees
+        # both halves of a rename, so each change set just re-runs the sync.
+        for _ in watch(vault, watch_filter=watch_filter):
+            try:
+                sync_vault(args, vault)
+            except Exception as e:
+                # The database may be restarting; the next change syncs again.
+                print(f"❌ Sync failed: {e}")
+    except KeyboardInterrupt:
+        pass
 
+
+def import_vault(args: argparse.Namespace, vault: Path) -> None:
     # Find all recipe markdown files
-    recipe_files = list(obsidian_recipes_path.rglob("*.md"))
+    recipe_files = sorted(vault.rglob("*.md"))
     print(f"Found {len(recipe_files)} recipe files in Obsidian vault\n")
 
-    # Parse all recipes
-    parsed_recipes = []
-    for file_path in sorted(recipe_files):
-        try:
-            parsed = parse_obsidian_recipe(file_path)
-            parsed_recipes.append(parsed)
-        except Exception as e:
-            print(f"❌ Error parsing {file_path.name}: {e}")
+    start = time.perf_counter()
+    parsed_recipes = parse_vault(recipe_files, args.workers)
+    parse_seconds = time.perf_counter() - start
 
-    print(f"\nSuccessfully parsed {len(parsed_recipes)} recipes")
+    print(f"\nSuccessfully parsed {len(parsed_recipes)} recipes "
+          f"in {parse_seconds:.2f}s ({len(recipe_files) / max(parse_seconds, 1e-9):.0f} files/s, "
+          f"{args.workers} workers)")
     print("\nImporting to database...\n")
 
-    # Import to database
+    if args.dry_run:
+        print("🔍 DRY RUN MODE - No changes will be made\n")
+    if args.update:
+        print("🔄 UPDATE MODE - Existing recipes will be updated\n")
+
     db = SessionLocal()
     try:
-        dry_run = "--dry-run" in sys.argv
-        update = "--update" in sys.argv
-        if dry_run:
-            print("🔍 DRY RUN MODE - No changes will be made\n")
-        if update:
-            print("🔄 UPDATE MODE - Existing recipes will be updated\n")
-
-        imported_count = 0
-        updated_count = 0
-        skipped_count = 0
-        error_count = 0
-
-        for parsed_recipe in parsed_recipes:
-            try:
-                recipe, status = import_recipe(db, parsed_recipe, dry_run=dry_run, update=update)
-                if status == "imported":
-                    imported_count += 1
-                elif status == "updated":
-                    updated_count += 1
-                elif status == "skipped":
-                    skipped_count += 1
-            except Exception as e:
-                print(f"❌ Error importing '{parsed_recipe['title']}': {e}")
-                error_count += 1
-                db.rollback()
-
-        print(f"\n{'[DRY RUN] ' if dry_run else ''}Summary:")
-        print(f"  Imported: {imported_count}")
-        if update:
-            print(f"  Updated: {updated_count}")
-        print(f"  Skipped (already exist): {skipped_count}")
-        if error_count:
-            print(f"  Errors: {error_count}")
-        print(f"  Total: {len(parsed_recipes)}")
-
+        start = time.perf_counter()
+        importer = RecipeImporter(db, dry_run=args.dry_run, update=args.update)
+        for i in range(0, len(parsed_recipes), args.batch_size):
+            batch = parsed_recipes[i:i + args.batch_size]
+            importer.import_batch(batch)
+            done = i + len(batch)
+            elapsed = time.perf_counter() - start
+            print(f"  {done}/{len(parsed_recipes)} recipes ({done / max(elapsed, 1e-9):.0f} recipes/s)")
+        import_seconds = time.perf_counter() - start
     finally:
         db.close()
 
+    counts = importer.counts
+    print(f"\n{'[DRY RUN] ' if args.dry_run else ''}Summary:")
+    print(f"  Imported: {counts['imported']}")
+    if args.update:
+        print(f"  Updated: {counts['updated']}")
+    print(f"  Skipped (already exist): {counts['skipped']}")
+    if counts["errors"]:
+        print(f"  Errors: {counts['errors']}")
+    print(f"  New ingredients: {counts['ingredients']}")
+    print(f"  Total: {len(parsed_recipes)}")
+    print(f"  Time: parse {parse_seconds:.2f}s, import {import_seconds:.2f}s "
+          f"({len(parsed_recipes) / max(import_seconds, 1e-9):.0f} recipes/s)")
+
 
 if __name__ == "__main__":
     main()
@@ -1,19 +1,51 @@
+import asyncio
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.core import Base, get_db
+from app.core import Base, get_async_db, get_db, get_read_db, settings
 from app.main import app
+from app.services.jobs import JobWorker
+
+
+@pytest.fixture(autouse=True)
+def no_fetch_cache(monkeypatch):
+    # Imports go to the network unless a test opts into the page cache.
+    monkeypatch.setattr(settings, "fetch_cache_enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def no_job_workers(monkeypatch):
+    # Jobs stay queued until a test runs them with run_jobs.
+    monkeypatch.setattr(settings, "jobs_workers", 0)
 
 
 @pytest.fixture
-def db_session():
+def fetch_cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "fetch-cache"
+    monkeypatch.setattr(settings, "fetch_cache_enabled", True)
+    monkeypatch.setattr(settings, "fetch_cache_dir", str(directory))
+    return directory
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    # A file rather than :memory: so the sync and async engines share one database.
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def db_session(db_path):
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
     Base.metadata.create_all(bind=engine)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,16 +55,118 @@ def db_session():
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_path):
+    # TestClient runs each request on a fresh event loop, so connections must not be pooled.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def run_jobs(async_session_factory):
+    """Run every due job, as a worker would, returning how many ran."""
+
+    def run() -> int:
+        return asyncio.run(JobWorker(async_session_factory, name="test-worker").drain())
+
+    return run
 
 
 @pytest.fixture
-def client(db_session):
+def client(db_session, async_session_factory):
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def scrape_metrics(client, monkeypatch):
+    """Fetch /metrics text the way Prometheus does, with the scrape token."""
+    monkeypatch.setattr(settings, "metrics_token", "scrape")
+    return lambda: client.get("/metrics", headers={"Authorization": "Bearer scrape"}).text
+
+
+class FakeSite:
+    """Local HTTP/1.1 server with keep-alive, counting the connections it accepts."""
+
+    def __init__(self) -> None:
+        site = self
+        self.pages: dict[str, tuple[int, str | bytes, dict[str, str]]] = {}
+        self.connections = 0
+        self.requests = 0
+        self.hits: Counter[str] = Counter()
+        self.failures: dict[str, int] = {}
+        self.not_modified = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, delayed ACKs add ~40 ms.
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                site.connections += 1
+
+            def do_GET(self):
+                site.requests += 1
+                site.hits[self.path] += 1
+                status, body, headers = site.pages.get(self.path, (404, "not found", {}))
+                headers = dict(headers)
+                if site.hits[self.path] <= site.failures.get(self.path, 0):
+                    status, body, headers = 503, "try again", {"Retry-After": "0"}
+                elif "Etag" in headers and self.headers.get("If-None-Match") == headers["Etag"]:
+                    site.not_modified += 1
+                    status, body = 304, b""
+                body = body.encode() if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", headers.pop("Content-Type", "text/html; charset=utf-8"))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if "Content-Length" not in headers:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+
+    def add(self, path: str, body: str | bytes, status: int = 200, fail_first: int = 0, **headers: str) -> str:
+        """Serve ``body`` at ``path``, after ``fail_first`` 503 responses."""
+        self.pages[path] = (status, body, {name.replace("_", "-").title(): v for name, v in headers.items()})
+        self.failures[path] = fail_first
+        return self.url(path)
+
+    def url(self, path: str) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    site = FakeSite()
+    monkeypatch.setattr(settings, "recipe_import_allowed_hosts", ["127.0.0.1"])
+    thread = threading.Thread(target=site.server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield site
+    finally:
+        site.server.shutdown()
+        site.server.server_close()
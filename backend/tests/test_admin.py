@@ -0,0 +1,150 @@
+import pytest
+
+from app.core import settings
+from app.core.slow_queries import parameters_shape, slow_query_log
+from app.models import Ingredient, RecipeImage
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    return {"X-Admin-Token": "s3cret"}
+
+
+class TestAdminAccess:
+    def test_disabled_without_token_setting(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", None)
+        response = client.get("/api/admin/pool")
+        assert response.status_code == 404
+
+    def test_rejects_wrong_token(self, client, admin_headers):
+        response = client.get("/api/admin/pool", headers={"X-Admin-Token": "nope"})
+        assert response.status_code == 403
+
+    def test_rejects_missing_token(self, client, admin_headers):
+        response = client.get("/api/admin/pool")
+        assert response.status_code == 403
+
+
+class TestPoolStats:
+    def test_lists_engine_pools(self, client, admin_headers):
+        response = client.get("/api/admin/pool", headers=admin_headers)
+        assert response.status_code == 200
+        names = [p["name"] for p in response.json()]
+        assert names == ["primary", "primary_async"]
+
+
+@pytest.fixture
+def log_every_query(monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+class TestSlowQueries:
+    def test_records_route_and_plan(self, client, admin_headers, log_every_query):
+        client.get("/api/ingredients?skip=0&limit=5")
+
+        response = client.get("/api/admin/slow-queries", headers=admin_headers)
+        assert response.status_code == 200
+        record = next(r for r in response.json() if r["route"] == "GET /api/ingredients")
+        assert record["statement"].startswith("SELECT")
+        assert record["parameters"] == ["int", "int"]
+        assert record["plan"]
+
+    def test_async_route(self, client, admin_headers, log_every_query):
+        client.get("/api/recipes/1")
+        records = client.get("/api/admin/slow-queries", headers=admin_headers).json()
+        assert any(r["route"] == "GET /api/recipes/{recipe_id}" for r in records)
+
+    def test_explain_is_rate_limited(self, client, admin_headers, log_every_query):
+        client.get("/api/ingredients")
+        client.get("/api/ingredients")
+        records = [
+            r
+            for r in client.get("/api/admin/slow-queries", headers=admin_headers).json()
+            if r["route"] == "GET /api/ingredients"
+        ]
+        assert len(records) == 2
+        assert sum(1 for r in records if r["plan"]) == 1
+
+    def test_below_threshold_not_recorded(self, client, admin_headers, monkeypatch):
+        slow_query_log.clear()
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 60_000)
+        client.get("/api/ingredients")
+        assert client.get("/api/admin/slow-queries", headers=admin_headers).json() == []
+
+    def test_clear(self, client, admin_headers, log_every_query):
+        client.get("/api/ingredients")
+        client.delete("/api/admin/slow-queries", headers=admin_headers)
+        assert slow_query_log.records() == []
+
+
+class TestParametersShape:
+    def test_dict(self):
+        assert parameters_shape({"id": 1, "name": "x"}) == {"id": "int", "name": "str"}
+
+    def test_executemany(self):
+        shape = parameters_shape([(1, "a"), (2, "b")])
+        assert shape == {"executemany": 2, "row": ["int", "str"]}
+
+    def test_unknown(self):
+        assert parameters_shape(None) is None
+
+
+@pytest.fixture
+def tracemalloc_running(client, admin_headers):
+    client.post("/api/admin/memory/tracemalloc/start", headers=admin_headers)
+    yield
+    client.post("/api/admin/memory/tracemalloc/stop", headers=admin_headers)
+
+
+class TestMemoryDiagnostics:
+    def test_snapshot_requires_tracing(self, client, admin_headers):
+        response = client.post("/api/admin/memory/snapshots", headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_snapshots_and_diff(self, client, admin_headers, tracemalloc_running):
+        status = client.get("/api/admin/memory/tracemalloc", headers=admin_headers).json()
+        assert status["tracing"] is True
+
+        first = client.post("/api/admin/memory/snapshots", headers=admin_headers)
+        assert first.status_code == 201
+        base = first.headers["x-snapshot-id"]
+        retained = [bytearray(4096) for _ in range(50)]  # noqa: F841
+        target = client.post(
+            "/api/admin/memory/snapshots?group_by=module", headers=admin_headers
+        ).headers["x-snapshot-id"]
+
+        top = client.get(f"/api/admin/memory/snapshots/{target}", headers=admin_headers)
+        assert top.status_code == 200
+        assert top.json()[0]["size_kb"] > 0
+
+        diff = client.get(
+            f"/api/admin/memory/diff?base={base}&target={target}", headers=admin_headers
+        ).json()
+        assert any("test_admin.py" in d["location"] and d["size_diff_kb"] > 0 for d in diff)
+
+    def test_unknown_snapshot(self, client, admin_headers):
+        response = client.get("/api/admin/memory/snapshots/missing", headers=admin_headers)
+        assert response.status_code == 404
+
+    def test_session_identity_maps(self, client, admin_headers, db_session):
+        db_session.add(Ingredient(name="Salt"))
+        db_session.commit()
+        ingredients = db_session.query(Ingredient).all()  # the identity map holds weak refs
+
+        sessions = client.get("/api/admin/memory/sessions", headers=admin_headers).json()
+        assert any(s["by_class"].get("Ingredient") == len(ingredients) for s in sessions)
+
+    def test_live_buffers(self, client, admin_headers):
+        image = RecipeImage(data=b"x" * 300_000, mime_type="image/png")
+
+        response = client.get("/api/admin/memory/buffers?limit=500", headers=admin_headers)
+        data = response.json()
+        assert data["recipe_images"]["loaded_bytes"] >= 300_000
+        assert any(
+            b["size"] == 300_000 and "RecipeImage" in b["referrers"] for b in data["buffers"]
+        )
+        del image
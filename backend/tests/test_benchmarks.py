@@ -0,0 +1,120 @@
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core import Base, settings
+from app.models import MealPlan, Recipe
+from app.utils.recipe_import import import_recipe_from_url
+from benchmarks import corpus, endpoints, load, micro
+from benchmarks.datagen import DatasetConfig, generate
+
+SMALL = {"recipes": 12, "ingredients": 20, "meal_plan_days": 14, "image_size": 64, "anchor_date": date(2025, 1, 15)}
+
+
+def _generate(path, **overrides):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        dataset = generate(db, DatasetConfig(**{**SMALL, **overrides}))
+        titles = db.scalars(select(Recipe.title).order_by(Recipe.id)).all()
+        meals = db.query(MealPlan).count()
+    engine.dispose()
+    return dataset, titles, meals
+
+
+class TestDatagen:
+    def test_same_seed_same_data(self, tmp_path):
+        first, first_titles, meals = _generate(tmp_path / "a.db")
+        _, second_titles, _ = _generate(tmp_path / "b.db")
+        assert first_titles == second_titles
+        assert len(first.recipe_ids) == 12
+        assert meals == 14 * first.config.meals_per_day
+        assert first.meal_plan_start <= first.config.anchor_date <= first.meal_plan_end
+
+    def test_different_seed_different_data(self, tmp_path):
+        _, first_titles, _ = _generate(tmp_path / "a.db")
+        _, second_titles, _ = _generate(tmp_path / "b.db", seed=7)
+        assert first_titles != second_titles
+
+
+class TestEndpointBenchmarks:
+    def test_run_writes_results(self, tmp_path):
+        output = tmp_path / "results.json"
+        report = endpoints.main(
+            ["--recipes", "5", "--iterations", "3", "--warmup", "0", "--alloc-samples", "1",
+             "-k", "recipes/{id}", "--output", str(output)]
+        )
+
+        assert json.loads(output.read_text()) == report
+        names = {entry["name"] for entry in report["endpoints"]}
+        assert "GET /api/recipes/{id}/scale/{servings}" in names
+        for entry in report["endpoints"]:
+            assert entry["errors"] == 0, entry
+            assert entry["p50_ms"] <= entry["p99_ms"]
+        assert report["dataset"]["recipes"] == 5
+
+    def test_compare(self):
+        before = {"endpoints": [{"name": "GET /x", "p50_ms": 10.0, "p95_ms": 20.0, "queries": 3}]}
+        after = {"endpoints": [{"name": "GET /x", "p50_ms": 5.0, "p95_ms": 20.0, "queries": 1}]}
+        line = endpoints.compare(before, after)[1]
+        assert "-50%" in line and "3->1" in line
+
+
+def _step(level, throughput, mode="closed", error_rate=0.0):
+    return load.StepResult(
+        mode=mode, level=level, duration=10, requests=int(throughput * 10), errors=0, throughput=throughput,
+        p50_ms=1, p95_ms=2, p99_ms=3, error_rate=error_rate,
+    )
+
+
+class TestLoad:
+    def test_saturation_when_throughput_flattens(self):
+        steps = [_step(2, 100), _step(4, 190), _step(8, 200), _step(16, 150)]
+        assert load.saturation_point(steps).level == 8
+
+    def test_saturation_on_errors(self):
+        steps = [_step(2, 100), _step(4, 190, error_rate=0.05)]
+        assert load.saturation_point(steps).level == 4
+
+    def test_open_loop_saturates_when_rate_not_met(self):
+        steps = [_step(20, 19.8, mode="open"), _step(200, 86, mode="open")]
+        assert load.saturation_point(steps).level == 200
+
+    def test_no_saturation(self):
+        assert load.saturation_point([_step(2, 100), _step(4, 195)]) is None
+
+    @pytest.mark.asyncio
+    async def test_fake_site_is_importable(self, monkeypatch):
+        monkeypatch.setattr(settings, "recipe_import_allowed_hosts", ["127.0.0.1"])
+        with load.FakeRecipeSite() as site:
+            result = await import_recipe_from_url(f"{site.base_url}/recipes/7")
+
+        assert result["title"].startswith("Load test stew")
+        assert len(result["ingredients"]) == 12
+        assert result["servings"] is not None
+
+
+class TestMicro:
+    def test_corpus_is_deterministic(self, tmp_path):
+        assert corpus.ingredient_lines(50) == corpus.ingredient_lines(50)
+        first = [p.read_text() for p in corpus.markdown_vault(tmp_path / "a", n=10)]
+        second = [p.read_text() for p in corpus.markdown_vault(tmp_path / "b", n=10)]
+        assert first == second
+
+    def test_current_matches_baseline(self, tmp_path):
+        for bench in micro.build_benches(tmp_path):
+            assert micro.check(bench) == [], bench.name
+
+    def test_run_writes_results(self, tmp_path):
+        output = tmp_path / "micro.json"
+        report = micro.main(["-k", "parse_servings", "--min-time", "0", "--repeat", "1", "--output", str(output)])
+
+        assert [(r["name"], r["implementation"]) for r in report["results"]] == [
+            ("parse_servings", "current"),
+            ("parse_servings", "baseline"),
+        ]
+        assert report["results"][0]["ops_per_sec"] > 0
+        assert json.loads(output.read_text()) == report
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.api import recipes as recipes_api
+from app.core import settings
+from app.services.bulk_import import HostCircuitBreaker, HostPacer, bulk_import
+from app.services.ingredient_matching import load_matcher
+
+
+def recipe_page(title: str) -> str:
+    recipe = {"@type": "Recipe", "name": title, "recipeIngredient": ["1 egg"]}
+    return f'<html><script type="application/ld+json">{json.dumps(recipe)}</script></html>'
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "bulk_import_host_interval", 0.0)
+    monkeypatch.setattr(settings, "bulk_import_retry_backoff", 0.0)
+
+
+def events(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def results(events: list[dict]) -> dict[str, dict]:
+    return {e["url"]: e for e in events if e["event"] == "result"}
+
+
+class TestBulkImportEndpoint:
+    def test_streams_ndjson_progress(self, client, fake_site):
+        urls = [fake_site.add(f"/r/{i}", recipe_page(f"Soup {i}")) for i in range(3)]
+        response = client.post("/api/recipes/import/bulk", json={"urls": urls})
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        body = events(response)
+        assert {url: e["recipe"]["title"] for url, e in results(body).items()} == {
+            url: f"Soup {i}" for i, url in enumerate(urls)
+        }
+        assert body[-1] == {
+            "event": "done", "total": 3, "imported": 3, "failed": 0, "skipped": 0, "duplicate": 0, "saved": 0,
+        }
+        assert client.get("/api/recipes").json() == []
+
+    def test_saves_in_batches(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_batch_size", 2)
+        urls = [fake_site.add(f"/r/{i}", recipe_page(f"Soup {i}")) for i in range(3)]
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": urls, "save": True}))
+
+        saved = [e for e in body if e["event"] == "saved"]
+        assert [len(e["recipes"]) for e in saved] == [2, 1]
+        assert body[-1]["saved"] == 3
+        recipe_id = saved[0]["recipes"][0]["recipe_id"]
+        recipe = client.get(f"/api/recipes/{recipe_id}").json()
+        assert recipe["source_url"] == saved[0]["recipes"][0]["url"]
+        assert {r["title"] for r in client.get("/api/recipes").json()} == {"Soup 0", "Soup 1", "Soup 2"}
+
+    def test_no_transaction_held_while_streaming(self, client, fake_site, monkeypatch):
+        sessions, in_transaction = [], []
+
+        async def recording_load_matcher(session):
+            sessions.append(session)
+            return await load_matcher(session)
+
+        async def recording_bulk_import(urls, matcher=None, session=None):
+            in_transaction.append(sessions[0].in_transaction())
+            async for event in bulk_import(urls, matcher, session):
+                yield event
+
+        monkeypatch.setattr(recipes_api, "load_matcher", recording_load_matcher)
+        monkeypatch.setattr(recipes_api, "bulk_import", recording_bulk_import)
+        url = fake_site.add("/soup", recipe_page("Soup"))
+        client.post("/api/recipes/import/bulk", json={"urls": [url]})
+        assert in_transaction == [False]
+
+    def test_server_sent_events(self, client, fake_site):
+        url = fake_site.add("/soup", recipe_page("Soup"))
+        response = client.post(
+            "/api/recipes/import/bulk", json={"urls": [url]}, headers={"accept": "text/event-stream"}
+        )
+        assert response.headers["content-type"].startswith("text/event-stream")
+        messages = response.text.strip().split("\n\n")
+        assert [m.split("\n")[0] for m in messages] == ["event: result", "event: done"]
+        assert json.loads(messages[0].split("\n")[1].removeprefix("data: "))["status"] == "imported"
+
+    def test_invalid_and_duplicate_urls(self, client, fake_site):
+        url = fake_site.add("/soup", recipe_page("Soup"))
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": [url, "ftp://example.com/x", url]}))
+        failed = results(body)["ftp://example.com/x"]
+        assert failed["status"] == "failed"
+        assert failed["error"] == "Only http and https URLs are allowed"
+        assert body[-1]["duplicate"] == 1
+        assert fake_site.hits["/soup"] == 1
+
+    def test_duplicates_compared_as_cache_keys(self, client, fake_site):
+        url = fake_site.add("/soup", recipe_page("Soup"))
+        variants = [f"{url}#steps", f"{url}?utm_source=feed", url.replace("http://", "HTTP://")]
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": [url, *variants, "http://a.example:x/"]}))
+        assert body[-1]["duplicate"] == 3
+        assert body[-1]["failed"] == 1
+        assert fake_site.hits["/soup"] == 1
+
+    def test_too_many_urls(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_max_urls", 2)
+        response = client.post("/api/recipes/import/bulk", json={"urls": ["https://a.example/"] * 3})
+        assert response.status_code == 400
+
+
+class TestRetries:
+    def test_retries_transient_failures(self, client, fake_site):
+        url = fake_site.add("/flaky", recipe_page("Soup"), fail_first=2)
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": [url]}))
+        assert results(body)[url]["status"] == "imported"
+        assert results(body)[url]["attempts"] == 3
+
+    def test_gives_up_after_retries(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_retries", 1)
+        url = fake_site.add("/down", recipe_page("Soup"), fail_first=5)
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": [url]}))
+        assert results(body)[url]["error"] == "HTTP 503"
+        assert fake_site.hits["/down"] == 2
+
+    def test_client_errors_not_retried(self, client, fake_site):
+        url = fake_site.url("/missing")
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": [url]}))
+        assert results(body)[url]["error"] == "HTTP 404"
+        assert fake_site.hits["/missing"] == 1
+
+    def test_failing_host_skipped(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_concurrency", 1)
+        monkeypatch.setattr(settings, "bulk_import_retries", 0)
+        monkeypatch.setattr(settings, "bulk_import_circuit_failures", 2)
+        urls = [fake_site.add(f"/down/{i}", "", fail_first=1) for i in range(5)]
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": urls}))
+        assert body[-1]["failed"] == 2
+        assert body[-1]["skipped"] == 3
+        assert fake_site.requests == 2
+
+    def test_queued_urls_skipped_when_circuit_opens(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 0.5)
+        monkeypatch.setattr(settings, "bulk_import_retries", 0)
+        monkeypatch.setattr(settings, "bulk_import_circuit_failures", 2)
+        urls = [fake_site.add(f"/down/{i}", "", fail_first=1) for i in range(10)]
+        start = time.monotonic()
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": urls}))
+        # Two paced attempts open the circuit; the other eight do not sit out their turn.
+        assert time.monotonic() - start < 2.0
+        assert (body[-1]["failed"], body[-1]["skipped"]) == (2, 8)
+        assert fake_site.requests == 2
+
+    def test_retry_not_queued_behind_host(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 0.3)
+        flaky = fake_site.add("/flaky", recipe_page("Soup"), fail_first=1)
+        urls = [flaky] + [fake_site.add(f"/r/{i}", recipe_page(f"Soup {i}")) for i in range(4)]
+        body = events(client.post("/api/recipes/import/bulk", json={"urls": urls}))
+        order = [e["url"] for e in body if e["event"] == "result"]
+        assert order.index(flaky) < 2
+        assert results(body)[flaky]["attempts"] == 2
+
+
+class TestPolitenessPrimitives:
+    @pytest.mark.asyncio
+    async def test_pacer_spaces_one_host(self):
+        pacer = HostPacer(0.05)
+        start = time.monotonic()
+        await asyncio.gather(*(pacer.wait("a.example") for _ in range(3)), pacer.wait("b.example"))
+        assert 0.1 <= time.monotonic() - start < 0.2
+
+    def test_breaker_half_open(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        breaker = HostCircuitBreaker(threshold=2, reset_after=10)
+        breaker.record_failure("a")
+        assert breaker.allow("a")
+        breaker.record_failure("a")
+        assert not breaker.allow("a")
+        now[0] = 11
+        assert breaker.allow("a")
+        breaker.record_failure("a")
+        assert not breaker.allow("a")
+
+    @pytest.mark.asyncio
+    async def test_closing_cancels_imports(self, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 60.0)
+        urls = [fake_site.add(f"/r/{i}", recipe_page("Soup")) for i in range(3)]
+        stream = bulk_import(urls)
+        assert (await anext(stream))["status"] == "imported"
+        await stream.aclose()
+        await asyncio.sleep(0)
+        assert not [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
@@ -0,0 +1,128 @@
+import gzip
+
+import brotli
+import pytest
+import zstandard
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, negotiate, precompress_directory
+
+LARGE = "x" * 5000
+
+
+def raw_body(response) -> bytes:
+    # httpx decodes transparently; tests need the bytes on the wire.
+    return b"".join(response.iter_raw())
+
+
+class TestNegotiate:
+    def test_server_preference_wins(self):
+        assert negotiate("gzip, br, zstd") == "zstd"
+        assert negotiate("gzip, br") == "br"
+        assert negotiate("gzip;q=0.1") == "gzip"
+
+    def test_refused_and_missing(self):
+        assert negotiate("br;q=0, gzip") == "gzip"
+        assert negotiate("identity") is None
+        assert negotiate(None) is None
+
+    def test_wildcard(self):
+        assert negotiate("*;q=0.5, zstd;q=0") == "br"
+
+
+@pytest.fixture
+def echo_app():
+    async def large(request):
+        return PlainTextResponse(LARGE)
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def image(request):
+        return Response(b"\x89PNG" + b"\0" * 5000, media_type="image/png")
+
+    async def stream(request):
+        async def chunks():
+            for i in range(3):
+                yield f'{{"done": {i}}}\n' * 100
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    async def events(request):
+        return StreamingResponse(iter(["data: 1\n\n"]), media_type="text/event-stream")
+
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+            Route("/events", events),
+        ]
+    )
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+class TestCompressionMiddleware:
+    @pytest.mark.parametrize(
+        ("accept", "decode"),
+        [("gzip", gzip.decompress), ("br", brotli.decompress), ("zstd", zstandard.decompress)],
+    )
+    def test_compresses_large_responses(self, echo_app, accept, decode):
+        with echo_app.stream("GET", "/large", headers={"accept-encoding": accept}) as response:
+            body = raw_body(response)
+        assert response.headers["content-encoding"] == accept
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(body) < 100
+        assert decode(body).decode() == LARGE
+
+    def test_small_responses_uncompressed(self, echo_app):
+        response = echo_app.get("/small", headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+
+    def test_identity_client(self, echo_app):
+        response = echo_app.get("/large", headers={"accept-encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE
+
+    def test_images_skipped(self, echo_app):
+        response = echo_app.get("/image", headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_event_streams_skipped(self, echo_app):
+        response = echo_app.get("/events", headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_streams_flushed_per_chunk(self, echo_app):
+        with echo_app.stream("GET", "/stream", headers={"accept-encoding": "gzip"}) as response:
+            body = raw_body(response)
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(body).decode().count("done") == 300
+
+    def test_api_json(self, client):
+        for i in range(20):
+            client.post("/api/recipes", json={"title": f"Recipe {i}", "description": LARGE[:200]})
+        response = client.get("/api/recipes", headers={"accept-encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()) == 20
+
+
+class TestPrecompress:
+    def test_skips_images_and_small_files(self, tmp_path):
+        (tmp_path / "_app").mkdir()
+        (tmp_path / "index.html").write_text("<html>" + LARGE + "</html>")
+        (tmp_path / "_app" / "start.js").write_text("console.log(1);" * 500)
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 5000)
+        (tmp_path / "robots.txt").write_text("User-agent: *\n")
+
+        written = precompress_directory(tmp_path, min_size=1024)
+
+        assert {p.name for p in written} == {"index.html.br", "index.html.gz", "start.js.br", "start.js.gz"}
+        assert brotli.decompress((tmp_path / "index.html.br").read_bytes()) == (tmp_path / "index.html").read_bytes()
+        assert (tmp_path / "index.html.gz").stat().st_mtime == (tmp_path / "index.html").stat().st_mtime
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core import settings
+from app.core.database import to_async_url
+from app.core.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+    pool_status,
+)
+
+
+class TestToAsyncUrl:
+    def test_postgresql(self):
+        url = to_async_url("postgresql://user:secret@db:5432/kitchen")
+        assert url == "postgresql+asyncpg://user:secret@db:5432/kitchen"
+
+    def test_postgresql_with_sync_driver(self):
+        url = to_async_url("postgresql+psycopg2://user:secret@db/kitchen")
+        assert url == "postgresql+asyncpg://user:secret@db/kitchen"
+
+    def test_sqlite(self):
+        assert to_async_url("sqlite:///./kitchen.db") == "sqlite+aiosqlite:///./kitchen.db"
+
+    def test_unsupported_backend(self):
+        with pytest.raises(ValueError):
+            to_async_url("mysql://user@db/kitchen")
+
+
+class TestPoolOptions:
+    def test_memory_sqlite_keeps_default_pool(self):
+        assert pool_options("sqlite:///:memory:") == {}
+
+    def test_uses_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "db_pool_size", 7)
+        monkeypatch.setattr(settings, "db_max_overflow", 3)
+        options = pool_options("postgresql://db/kitchen")
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert "connect_args" not in options
+
+    def test_async_pool_class(self):
+        options = pool_options("postgresql+asyncpg://db/kitchen", use_async=True)
+        assert options["poolclass"] is InstrumentedAsyncQueuePool
+
+    def test_pgbouncer_disables_prepared_statements(self, monkeypatch):
+        monkeypatch.setattr(settings, "db_pgbouncer", True)
+        options = pool_options("postgresql+asyncpg://db/kitchen", use_async=True)
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["connect_args"]["prepared_statement_cache_size"] == 0
+        name_func = options["connect_args"]["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+class TestPoolStatus:
+    def test_tracks_checkouts(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        engine = create_engine(url, **pool_options(url))
+        with engine.connect():
+            status = pool_status("primary", engine.pool)
+            assert status["checked_out"] == 1
+        status = pool_status("primary", engine.pool)
+        assert status["checked_out"] == 0
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 0
+        assert status["wait_time_max_ms"] >= 0
+        engine.dispose()
+
+    def test_connect_time_kept_out_of_wait(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        engine = create_engine(url, **pool_options(url))
+        event.listen(engine, "connect", lambda *args: time.sleep(0.05))
+        with engine.connect():
+            pass
+        with engine.connect():
+            pass
+        status = pool_status("primary", engine.pool)
+        assert (status["checkouts"], status["connects"]) == (2, 1)
+        assert status["connect_time_max_ms"] >= 50
+        assert status["wait_time_max_ms"] < 50
+        engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_async_connect_time_kept_out_of_wait(self, tmp_path):
+        url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+        engine = create_async_engine(url, **pool_options(url, use_async=True))
+        event.listen(engine.sync_engine, "connect", lambda *args: time.sleep(0.05))
+        async with engine.connect():
+            pass
+        status = pool_status("primary", engine.sync_engine.pool)
+        assert (status["checkouts"], status["connects"]) == (1, 1)
+        assert status["connect_time_max_ms"] >= 50
+        assert status["wait_time_max_ms"] < 50
+        await engine.dispose()
+
+    def test_records_timeouts(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "db_pool_size", 1)
+        monkeypatch.setattr(settings, "db_max_overflow", 0)
+        monkeypatch.setattr(settings, "db_pool_timeout", 0.01)
+        url = f"sqlite:///{tmp_path / 'pool.db'}"
+        engine = create_engine(url, **pool_options(url))
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        assert pool_status("primary", engine.pool)["timeouts"] == 1
+        engine.dispose()
+
+    def test_non_queue_pool(self):
+        engine = create_engine("sqlite:///:memory:")
+        status = pool_status("memory", engine.pool)
+        assert status["pool_class"] == "SingletonThreadPool"
+        assert status["checked_out"] is None
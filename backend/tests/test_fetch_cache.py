@@ -0,0 +1,153 @@
+import json
+import os
+import time
+from dataclasses import asdict
+
+import httpx
+import orjson
+import pytest
+
+from app.core import fetch_cache as fetch_cache_module
+from app.core import settings
+from app.core.fetch_cache import CachedPage, FetchCache, freshness_lifetime, get_fetch_cache, normalize_url
+from app.utils.recipe_import import import_recipe_from_url
+
+
+def recipe_page(title: str) -> str:
+    recipe = {"@type": "Recipe", "name": title}
+    return f'<html><script type="application/ld+json">{json.dumps(recipe)}</script></html>'
+
+
+class TestNormalizeUrl:
+    def test_equivalent_urls_share_a_key(self):
+        assert normalize_url("HTTPS://Example.com:443/soup?b=2&a=1&utm_source=x#step-3") == (
+            "https://example.com/soup?a=1&b=2"
+        )
+        assert normalize_url("http://example.com") == "http://example.com/"
+        assert normalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+
+    def test_path_case_matters(self):
+        assert normalize_url("https://example.com/Soup") != normalize_url("https://example.com/soup")
+
+
+class TestFreshness:
+    @pytest.mark.parametrize(
+        ("cache_control", "expected"),
+        [
+            ("public, max-age=60", 60.0),
+            ("max-age=999999999", 86400.0),
+            ("no-cache", 0.0),
+            ("private, no-store", None),
+            ("", 600.0),
+        ],
+    )
+    def test_lifetime(self, cache_control, expected):
+        assert freshness_lifetime(httpx.Headers({"cache-control": cache_control})) == expected
+
+
+def page(url: str, size: int = 100) -> CachedPage:
+    return CachedPage(url=url, html="x" * size, fresh_until=time.time() + 60)
+
+
+# Room for three of the one-letter-host pages below.
+THREE_PAGES = 3 * len(orjson.dumps(asdict(page("https://a.example/", size=250)))) + 10
+
+
+class TestFetchCache:
+    def test_round_trip_across_instances(self, tmp_path):
+        FetchCache(tmp_path, 10_000).put(page("https://a.example/soup?utm_medium=rss"))
+        cached = FetchCache(tmp_path, 10_000).get("https://a.example/soup")
+        assert cached.html == "x" * 100
+        assert cached.is_fresh()
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = FetchCache(tmp_path, THREE_PAGES)
+        for name in "abc":
+            cache.put(page(f"https://{name}.example/", size=250))
+        cache.get("https://a.example/")
+        cache.put(page("https://d.example/", size=250))
+
+        assert cache.size <= THREE_PAGES
+        assert cache.get("https://b.example/") is None
+        assert {name for name in "acd" if cache.get(f"https://{name}.example/")} == set("acd")
+
+    def test_recency_survives_restart(self, tmp_path):
+        cache = FetchCache(tmp_path, THREE_PAGES)
+        for i, name in enumerate("abc"):
+            cache.put(page(f"https://{name}.example/", size=250))
+            os.utime(tmp_path / f"{cache.key(f'https://{name}.example/')}.json", (i, i))
+        reopened = FetchCache(tmp_path, THREE_PAGES)
+        reopened.put(page("https://d.example/", size=250))
+        assert reopened.get("https://a.example/") is None
+        assert reopened.get("https://b.example/") is not None
+
+    def test_unreadable_entry_dropped(self, tmp_path):
+        cache = FetchCache(tmp_path, 1000)
+        cache.put(page("https://a.example/"))
+        (tmp_path / f"{cache.key('https://a.example/')}.json").write_text("{truncated")
+        assert cache.get("https://a.example/") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "fetch_cache_enabled", False)
+        assert get_fetch_cache() is None
+
+
+class TestCachedImports:
+    @pytest.mark.asyncio
+    async def test_fresh_page_not_refetched(self, fake_site, fetch_cache_dir):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="max-age=60")
+        first = await import_recipe_from_url(url)
+        second = await import_recipe_from_url(url + "?utm_source=newsletter")
+        assert second == first
+        assert second["title"] == "Soup"
+        assert fake_site.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_page_revalidated(self, fake_site, fetch_cache_dir):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="no-cache", etag='"v1"')
+        await import_recipe_from_url(url)
+        assert (await import_recipe_from_url(url))["title"] == "Soup"
+        assert fake_site.requests == 2
+        assert fake_site.not_modified == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_page_refetched(self, fake_site, fetch_cache_dir):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="no-cache", etag='"v1"')
+        await import_recipe_from_url(url)
+        fake_site.add("/soup", recipe_page("Stew"), cache_control="no-cache", etag='"v2"')
+        assert (await import_recipe_from_url(url))["title"] == "Stew"
+        assert fake_site.not_modified == 0
+
+    @pytest.mark.asyncio
+    async def test_no_store_not_cached(self, fake_site, fetch_cache_dir):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="no-store")
+        await import_recipe_from_url(url)
+        await import_recipe_from_url(url)
+        assert fake_site.requests == 2
+        assert list(fetch_cache_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, fake_site, fetch_cache_dir):
+        url = fake_site.url("/missing")
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await import_recipe_from_url(url)
+        assert fake_site.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_old_results_reparsed_from_stored_page(self, fake_site, fetch_cache_dir, monkeypatch):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="max-age=60")
+        await import_recipe_from_url(url)
+        monkeypatch.setattr(fetch_cache_module, "RESULT_VERSION", 2)
+        assert (await import_recipe_from_url(url))["title"] == "Soup"
+        assert fake_site.requests == 1
+        assert get_fetch_cache().get(url).version == 2
+
+    def test_import_preview_uses_cache(self, client, fake_site, fetch_cache_dir, scrape_metrics):
+        url = fake_site.add("/soup", recipe_page("Soup"), cache_control="max-age=60")
+        for _ in range(3):
+            assert client.post("/api/recipes/import", json={"url": url}).json()["title"] == "Soup"
+        assert fake_site.requests == 1
+        metrics = scrape_metrics()
+        assert 'cache_lookups_total{cache="recipe_pages",result="hit"}' in metrics
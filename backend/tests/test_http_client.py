@@ -0,0 +1,159 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import http_client as http_client_module
+from app.core import settings
+from app.core.http_client import (
+    HostLimitedTransport,
+    ResponseTooLarge,
+    close_http_client,
+    fetch,
+    http_client,
+    start_http_client,
+)
+from app.main import app
+from app.utils.recipe_import import import_recipe_from_url
+
+PAGE = "<html><head><title>Soup</title></head></html>"
+
+
+class TestSharedClient:
+    @pytest.mark.asyncio
+    async def test_imports_reuse_one_connection(self, fake_site):
+        await start_http_client()
+        try:
+            for i in range(5):
+                url = fake_site.add(f"/recipes/{i}", PAGE)
+                assert (await import_recipe_from_url(url))["title"] == "Soup"
+        finally:
+            await close_http_client()
+
+        assert fake_site.requests == 5
+        assert fake_site.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_without_lifespan_each_call_connects(self, fake_site):
+        url = fake_site.add("/soup", PAGE)
+        await import_recipe_from_url(url)
+        await import_recipe_from_url(url)
+        assert fake_site.connections == 2
+
+    def test_lifespan_opens_and_closes(self):
+        with TestClient(app):
+            client = http_client_module._client
+            assert client is not None
+        assert http_client_module._client is None
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_sends_user_agent(self, fake_site):
+        url = fake_site.add("/soup", PAGE)
+        async with http_client() as client:
+            response = await fetch(client, url)
+        assert response.request.headers["user-agent"].startswith("Mozilla/5.0 (compatible; KitchenBuddy")
+
+
+class TestResponseSizeCap:
+    @pytest.mark.asyncio
+    async def test_declared_length(self, fake_site):
+        url = fake_site.add("/big", "x" * 2000)
+        async with http_client() as client:
+            with pytest.raises(ResponseTooLarge):
+                await fetch(client, url, max_bytes=1000)
+
+    @pytest.mark.asyncio
+    async def test_decoded_size_counts(self, fake_site):
+        url = fake_site.add("/bomb", gzip.compress(b"x" * 100_000), content_encoding="gzip")
+        async with http_client() as client:
+            with pytest.raises(ResponseTooLarge):
+                await fetch(client, url, max_bytes=10_000)
+
+    @pytest.mark.asyncio
+    async def test_decoded_body_returned(self, fake_site):
+        url = fake_site.add("/gz", gzip.compress(PAGE.encode()), content_encoding="gzip")
+        async with http_client() as client:
+            response = await fetch(client, url)
+        assert response.text == PAGE
+        assert "content-encoding" not in response.headers
+
+    def test_import_endpoint_rejects_large_pages(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "http_client_max_response_bytes", 100)
+        url = fake_site.add("/big", "x" * 2000)
+        response = client.post("/api/recipes/import", json={"url": url})
+        assert response.status_code == 400
+        assert "larger than 100 bytes" in response.json()["detail"]
+
+
+class TestCheckedRedirects:
+    @pytest.mark.asyncio
+    async def test_each_hop_checked(self, fake_site):
+        fake_site.add("/c", PAGE)
+        fake_site.add("/b", "", status=301, location="/c")
+        url = fake_site.add("/a", "", status=302, location=fake_site.url("/b"))
+        seen = []
+        async with http_client() as client:
+            response = await fetch(client, url, check_redirect=seen.append)
+        assert response.text == PAGE
+        assert seen == [fake_site.url("/b"), fake_site.url("/c")]
+
+    @pytest.mark.asyncio
+    async def test_hop_limit(self, fake_site):
+        url = fake_site.add("/loop", "", status=302, location="/loop")
+        async with http_client() as client:
+            with pytest.raises(httpx.TooManyRedirects):
+                await fetch(client, url, check_redirect=lambda url: None)
+
+    @pytest.mark.asyncio
+    async def test_import_refuses_redirect_to_private_address(self, fake_site):
+        url = fake_site.add("/soup", "", status=302, location="http://10.0.0.5/admin")
+        with pytest.raises(ValueError, match="Private IP"):
+            await import_recipe_from_url(url)
+
+
+def streamed(body: str) -> httpx.Response:
+    # Like a real transport's response: the body is read, then the stream closed.
+    return httpx.Response(200, stream=httpx.ByteStream(body.encode()))
+
+
+class TestHostLimitedTransport:
+    @staticmethod
+    def slow_transport(stats: dict) -> httpx.MockTransport:
+        async def handler(request):
+            stats["active"] = stats.get("active", 0) + 1
+            stats["peak"] = max(stats.get("peak", 0), stats["active"])
+            await asyncio.sleep(0.02)
+            stats["active"] -= 1
+            return streamed(request.url.host)
+
+        return httpx.MockTransport(handler)
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrency_per_host(self):
+        stats = {}
+        transport = HostLimitedTransport(self.slow_transport(stats), max_per_host=2, pool_timeout=5)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await asyncio.gather(*(client.get("https://a.example/") for _ in range(6)))
+        assert stats["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hosts_limited_independently(self):
+        stats = {}
+        transport = HostLimitedTransport(self.slow_transport(stats), max_per_host=1, pool_timeout=5)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await asyncio.gather(*(client.get(f"https://{host}.example/") for host in "abc"))
+        assert stats["peak"] == 3
+
+    @pytest.mark.asyncio
+    async def test_slot_held_until_body_closed(self):
+        transport = HostLimitedTransport(
+            httpx.MockTransport(lambda request: streamed("ok")), max_per_host=1, pool_timeout=0.05
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", "https://a.example/"):
+                with pytest.raises(httpx.PoolTimeout):
+                    await client.get("https://a.example/")
+            assert (await client.get("https://a.example/")).text == "ok"
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from app.core import settings
+from app.services.ingredient_matching import IngredientMatcher, name_tokens, resolve_ingredients
+
+CATALOG = [
+    (1, "Onion"), (2, "Red onion"), (3, "Black pepper"), (4, "Pepper"), (5, "Olive oil"),
+    (6, "Canned tomatoes"), (7, "Mąka pszenna"), (8, "Czosnek"), (9, "Chicken thighs"), (10, "Sea salt"),
+]
+
+
+@pytest.fixture
+def matcher():
+    return IngredientMatcher(CATALOG)
+
+
+class TestNameTokens:
+    def test_folds_case_accents_and_plurals(self):
+        assert name_tokens("Onions") == ("onion",)
+        assert name_tokens("MĄKA pszenna") == ("maka", "pszenna")
+        assert name_tokens("tomatoes") == ("tomato",)
+        assert name_tokens("berries") == ("berry",)
+        assert name_tokens("couscous") == ("couscous",)
+
+
+class TestIngredientMatcher:
+    @pytest.mark.parametrize(
+        ("name", "expected", "method"),
+        [
+            ("onions", 1, "exact"),
+            ("maka pszenna", 7, "exact"),
+            ("freshly ground black pepper", 3, "tokens"),
+            ("red onions", 2, "exact"),
+            ("extra virgin olive oil", 5, "tokens"),
+            ("boneless chicken thighs", 9, "tokens"),
+            ("salt", 10, "tokens"),
+            ("tomatos", 6, "tokens"),
+            ("chiken thighs", 9, "fuzzy"),
+            ("czosnku", 8, "fuzzy"),
+        ],
+    )
+    def test_matches(self, matcher, name, expected, method):
+        match = matcher.match(name)
+        assert (match.ingredient_id, match.method) == (expected, method)
+
+    @pytest.mark.parametrize("name", ["saffron", "", "of"])
+    def test_no_match(self, matcher, name):
+        assert matcher.match(name) is None
+
+    def test_resolve_lines(self, matcher):
+        [line] = resolve_ingredients(["2 tbsp extra virgin olive oil, divided"], matcher)
+        assert line == {
+            "text": "2 tbsp extra virgin olive oil, divided",
+            "quantity": "2",
+            "unit": "tbsp",
+            "name": "extra virgin olive oil",
+            "notes": "divided",
+            "ingredient_id": 5,
+            "ingredient_name": "Olive oil",
+        }
+
+    def test_without_catalog(self):
+        [line] = resolve_ingredients(["1 onion"], None)
+        assert line["name"] == "onion"
+        assert line["ingredient_id"] is None
+
+
+def recipe_page(*ingredients: str) -> str:
+    recipe = {"@type": "Recipe", "name": "Soup", "recipeIngredient": list(ingredients)}
+    return f'<html><script type="application/ld+json">{json.dumps(recipe)}</script></html>'
+
+
+class TestImportMatching:
+    def test_preview_returns_catalog_ids(self, client, fake_site):
+        onion = client.post("/api/ingredients", json={"name": "Onion"}).json()
+        url = fake_site.add("/soup", recipe_page("1 1/2 cups finely chopped onions", "1 bay leaf"))
+
+        data = client.post("/api/recipes/import", json={"url": url}).json()
+        assert data["ingredients"] == ["1 1/2 cups finely chopped onions", "1 bay leaf"]
+        first, second = data["parsed_ingredients"]
+        assert (first["quantity"], first["unit"], first["name"]) == ("1 1/2", "cup", "onions")
+        assert first["ingredient_id"] == onion["id"]
+        assert second["ingredient_id"] is None
+
+        # Ready to create the recipe with.
+        recipe = client.post("/api/recipes", json={
+            "title": data["title"],
+            "ingredients": [
+                {"ingredient_id": line["ingredient_id"], "quantity": line["quantity"], "unit": line["unit"]}
+                for line in data["parsed_ingredients"] if line["ingredient_id"]
+            ],
+        })
+        assert recipe.status_code == 201
+
+    def test_catalog_changes_picked_up(self, client, fake_site):
+        url = fake_site.add("/soup", recipe_page("2 leeks"))
+        assert client.post("/api/recipes/import", json={"url": url}).json()["parsed_ingredients"][0]["ingredient_id"] is None
+        leek = client.post("/api/ingredients", json={"name": "Leek"}).json()
+        assert client.post("/api/recipes/import", json={"url": url}).json()["parsed_ingredients"][0]["ingredient_id"] == leek["id"]
+
+    def test_bulk_import_saves_matched_ingredients(self, client, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 0.0)
+        onion = client.post("/api/ingredients", json={"name": "Onion"}).json()
+        url = fake_site.add("/soup", recipe_page("2 onions, sliced", "1 bay leaf"))
+
+        response = client.post("/api/recipes/import/bulk", json={"urls": [url], "save": True})
+        events = [json.loads(line) for line in response.text.splitlines()]
+        recipe_id = events[1]["recipes"][0]["recipe_id"]
+        [ingredient] = client.get(f"/api/recipes/{recipe_id}").json()["ingredients"]
+        assert ingredient["ingredient_id"] == onion["id"]
+        assert (ingredient["quantity"], ingredient["notes"]) == ("2", "sliced")
@@ -0,0 +1,73 @@
+import pytest
+
+from app.utils import scale_quantity
+from app.utils.ingredient_parser import parse_ingredient_line
+from benchmarks import corpus
+
+
+def parsed(quantity, unit, name, notes=None):
+    return {"quantity": quantity, "unit": unit, "name": name, "notes": notes}
+
+
+class TestParseIngredientLine:
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ("1 1/2 cups finely chopped onions", parsed("1 1/2", "cup", "onions", "finely chopped")),
+            ("200g flour", parsed("200", "g", "flour")),
+            ("2 Tablespoons olive oil", parsed("2", "tbsp", "olive oil")),
+            ("3 eggs", parsed("3", None, "eggs")),
+            ("8 fl oz cream", parsed("8", "fl oz", "cream")),
+            ("2 large eggs, room temperature", parsed("2", None, "eggs", "large, room temperature")),
+            ("1 (14 oz) can tomatoes", parsed("1", "can", "tomatoes", "14 oz")),
+            ("butter (optional)", parsed(None, None, "butter", "optional")),
+        ],
+    )
+    def test_english(self, line, expected):
+        assert parse_ingredient_line(line) == expected
+
+    @pytest.mark.parametrize(
+        ("line", "quantity"),
+        [("½ cup milk", "1/2"), ("1½ cups milk", "1 1/2"), ("1\\2 cup milk", "1/2"),
+         ("0,5 cup milk", "0.5"), ("2 to 3 cups milk", "2-3"), ("2–3 cups milk", "2-3")],
+    )
+    def test_quantities(self, line, quantity):
+        assert parse_ingredient_line(line) == parsed(quantity, "cup", "milk")
+
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ("2-3 łyżki mąki", parsed("2-3", "łyżka", "mąki")),
+            ("1 szklanka cukru", parsed("1", "szklanka", "cukru")),
+            ("5-6 ząbków czosnku", parsed("5-6", "ząbek", "czosnku")),
+            ("pieprz do smaku", parsed(None, None, "pieprz", "do smaku")),
+            ("śmietana 18%", parsed(None, None, "śmietana 18%")),
+        ],
+    )
+    def test_polish(self, line, expected):
+        assert parse_ingredient_line(line) == expected
+
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [
+            ("salt to taste", parsed(None, None, "salt", "to taste")),
+            ("pinch of nutmeg", parsed(None, "pinch", "nutmeg")),
+            ("a handful of parsley", parsed("1", "handful", "parsley")),
+            ("one onion", parsed("1", None, "onion")),
+            ("oil for frying", parsed(None, None, "oil", "for frying")),
+            ("canola oil", parsed(None, None, "canola oil")),
+        ],
+    )
+    def test_without_numbers(self, line, expected):
+        assert parse_ingredient_line(line) == expected
+
+    def test_markdown_list_items(self):
+        assert parse_ingredient_line("- [ ] 2 [[garlic cloves]]") == parsed("2", None, "garlic cloves")
+        assert parse_ingredient_line("* 100 g [[Masło|masła]]") == parsed("100", "g", "masła")
+
+    def test_quantity_scales(self):
+        assert scale_quantity(parse_ingredient_line("½ cup milk")["quantity"], 2, 4) == "1"
+
+    def test_corpus_lines_have_names(self):
+        for line in corpus.ingredient_lines(500):
+            assert parse_ingredient_line(line)["name"], line
@@ -0,0 +1,239 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core import JobState, settings
+from app.models import Job, Recipe
+from app.services.jobs import HANDLERS, JobWorker, claim_job, enqueue, utcnow
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register test handlers for the duration of a test."""
+
+    def register(kind, handler):
+        monkeypatch.setitem(HANDLERS, kind, handler)
+
+    return register
+
+
+async def add_jobs(session_factory, kind, *payloads, **options) -> list[int]:
+    async with session_factory() as session:
+        jobs = [enqueue(session, kind, payload, **options) for payload in payloads]
+        await session.commit()
+        return [job.id for job in jobs]
+
+
+async def get_job(session_factory, job_id) -> Job:
+    async with session_factory() as session:
+        return await session.get(Job, job_id)
+
+
+class TestWorker:
+    @pytest.mark.asyncio
+    async def test_runs_job_and_stores_result(self, async_session_factory, handlers):
+        async def double(session, payload, job):
+            await job.progress(1, 1)
+            return {"value": payload["value"] * 2}
+
+        handlers("double", double)
+        [job_id] = await add_jobs(async_session_factory, "double", {"value": 21})
+
+        assert await JobWorker(async_session_factory).drain() == 1
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.attempts, job.result) == (JobState.SUCCEEDED, 1, {"value": 42})
+        assert (job.progress_done, job.progress_total) == (1, 1)
+        assert job.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_in_order(self, async_session_factory, handlers):
+        ran = []
+
+        async def record(session, payload, job):
+            ran.append(payload["n"])
+
+        handlers("record", record)
+        await add_jobs(async_session_factory, "record", *({"n": n} for n in range(5)))
+        await add_jobs(async_session_factory, "record", {"n": "later"}, delay=60)
+
+        assert await JobWorker(async_session_factory).drain() == 5
+        assert ran == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_failed_attempts_retried_with_backoff(self, async_session_factory, handlers, monkeypatch):
+        monkeypatch.setattr(settings, "jobs_retry_backoff", 60.0)
+
+        async def flaky(session, payload, job):
+            raise ConnectionError("database went away")
+
+        handlers("flaky", flaky)
+        [job_id] = await add_jobs(async_session_factory, "flaky", {}, max_attempts=2)
+
+        assert await JobWorker(async_session_factory).drain() == 1
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.attempts, job.locked_by) == (JobState.QUEUED, 1, None)
+        assert job.error == "ConnectionError: database went away"
+        assert job.run_at > utcnow() + timedelta(seconds=25)
+
+    @pytest.mark.asyncio
+    async def test_fails_after_last_attempt(self, async_session_factory, handlers, monkeypatch):
+        monkeypatch.setattr(settings, "jobs_retry_backoff", 0.0)
+        calls = 0
+
+        async def broken(session, payload, job):
+            nonlocal calls
+            calls += 1
+            raise ValueError("bad payload")
+
+        handlers("broken", broken)
+        [job_id] = await add_jobs(async_session_factory, "broken", {}, max_attempts=3)
+
+        assert await JobWorker(async_session_factory).drain() == 3
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.attempts, calls) == (JobState.FAILED, 3, 3)
+        assert job.error == "ValueError: bad payload"
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind_fails_without_retry(self, async_session_factory):
+        [job_id] = await add_jobs(async_session_factory, "no-such-kind", {})
+        await JobWorker(async_session_factory).drain()
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.attempts) == (JobState.FAILED, 1)
+
+    @pytest.mark.asyncio
+    async def test_workers_never_share_a_job(self, async_session_factory, handlers):
+        ran = []
+
+        async def record(session, payload, job):
+            await asyncio.sleep(0)
+            ran.append(payload["n"])
+
+        handlers("record", record)
+        await add_jobs(async_session_factory, "record", *({"n": n} for n in range(20)))
+
+        workers = [JobWorker(async_session_factory) for _ in range(4)]
+        counts = await asyncio.gather(*(worker.drain() for worker in workers))
+        assert sum(counts) == 20
+        assert sorted(ran) == list(range(20))
+
+
+class TestLeases:
+    @pytest.mark.asyncio
+    async def test_expired_lease_claimed_again(self, async_session_factory):
+        [job_id] = await add_jobs(async_session_factory, "record", {})
+        async with async_session_factory() as session:
+            assert (await claim_job(session, "crashed")).id == job_id
+            assert await claim_job(session, "other") is None
+
+            await session.execute(update(Job).values(locked_until=utcnow() - timedelta(seconds=1)))
+            await session.commit()
+            job = await claim_job(session, "other")
+        assert (job.id, job.locked_by, job.attempts) == (job_id, "other", 2)
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_on_last_attempt_fails(self, async_session_factory, handlers):
+        handlers("record", lambda *args: pytest.fail("should not run"))
+        [job_id] = await add_jobs(async_session_factory, "record", {}, max_attempts=1)
+        async with async_session_factory() as session:
+            await claim_job(session, "crashed")
+            await session.execute(update(Job).values(locked_until=utcnow() - timedelta(seconds=1)))
+            await session.commit()
+
+        await JobWorker(async_session_factory).drain()
+        job = await get_job(async_session_factory, job_id)
+        assert job.state == JobState.FAILED
+        assert "Worker stopped" in job.error
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_handed_back(self, async_session_factory, handlers):
+        started = asyncio.Event()
+
+        async def slow(session, payload, job):
+            started.set()
+            await asyncio.sleep(60)
+
+        handlers("slow", slow)
+        [job_id] = await add_jobs(async_session_factory, "slow", {})
+        task = asyncio.create_task(JobWorker(async_session_factory).run_once())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.attempts, job.locked_by) == (JobState.QUEUED, 0, None)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_bulk_import_not_run_again(self, async_session_factory, fake_site, monkeypatch):
+        # The first recipe is saved at once; the others wait for their turn at the host.
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 60.0)
+        monkeypatch.setattr(settings, "bulk_import_batch_size", 1)
+        urls = [fake_site.add(f"/r/{i}", recipe_page(f"Soup {i}")) for i in range(3)]
+        [job_id] = await add_jobs(async_session_factory, "bulk_import", {"urls": urls, "save": True}, max_attempts=1)
+
+        async def saved_recipes() -> int:
+            async with async_session_factory() as session:
+                return await session.scalar(select(func.count()).select_from(Recipe))
+
+        task = asyncio.create_task(JobWorker(async_session_factory).run_once())
+        while not await saved_recipes():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        job = await get_job(async_session_factory, job_id)
+        assert (job.state, job.error) == (JobState.FAILED, "Worker stopped during the only attempt")
+        assert await JobWorker(async_session_factory).drain() == 0
+        assert await saved_recipes() == 1
+
+
+def recipe_page(title: str) -> str:
+    recipe = {"@type": "Recipe", "name": title}
+    return f'<html><script type="application/ld+json">{json.dumps(recipe)}</script></html>'
+
+
+class TestJobsApi:
+    def test_get_job(self, client, async_session_factory):
+        [job_id] = asyncio.run(add_jobs(async_session_factory, "record", {"n": 1}))
+        response = client.get(f"/api/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["state"] == "queued"
+        assert client.get("/api/jobs/999").status_code == 404
+
+    def test_list_filters_by_state(self, client, async_session_factory, run_jobs):
+        asyncio.run(add_jobs(async_session_factory, "no-such-kind", {}))
+        asyncio.run(add_jobs(async_session_factory, "record", {}, delay=60))
+        run_jobs()
+        assert [job["kind"] for job in client.get("/api/jobs", params={"state": "failed"}).json()] == ["no-such-kind"]
+        assert len(client.get("/api/jobs").json()) == 2
+
+    def test_bulk_import_in_background(self, client, fake_site, run_jobs, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 0.0)
+        urls = [fake_site.add(f"/r/{i}", recipe_page(f"Soup {i}")) for i in range(3)]
+        urls.append(fake_site.url("/missing"))
+
+        response = client.post(
+            "/api/recipes/import/bulk", json={"urls": urls, "save": True, "background": True}
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert response.headers["location"] == f"/api/jobs/{job['id']}"
+        assert (job["kind"], job["state"], job["max_attempts"]) == ("bulk_import", "queued", 1)
+        assert fake_site.requests == 0
+
+        assert run_jobs() == 1
+        job = client.get(f"/api/jobs/{job['id']}").json()
+        assert job["state"] == "succeeded"
+        assert (job["progress_done"], job["progress_total"]) == (4, 4)
+        result = job["result"]
+        assert (result["imported"], result["failed"], result["saved"]) == (3, 1, 3)
+        assert result["failures"] == [{"url": urls[3], "status": "failed", "error": "HTTP 404"}]
+        titles = {client.get(f"/api/recipes/{recipe_id}").json()["title"] for recipe_id in result["recipe_ids"]}
+        assert titles == {"Soup 0", "Soup 1", "Soup 2"}
@@ -0,0 +1,58 @@
+from app.core import settings
+from app.core.metrics import record_cache_lookup
+from app.core.sql_events import statement_operation
+
+
+class TestMetricsEndpoint:
+    def test_prometheus_format(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "scrape")
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_requests_total counter" in response.text
+
+    def test_hidden_without_token(self, client):
+        assert client.get("/metrics").status_code == 404
+
+    def test_rejects_wrong_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "scrape")
+        assert client.get("/metrics").status_code == 403
+        assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 403
+
+    def test_counts_requests_by_route_template(self, client, scrape_metrics):
+        recipe = client.post("/api/recipes", json={"title": "Soup"}).json()
+        client.get(f"/api/recipes/{recipe['id']}")
+
+        text = scrape_metrics()
+        assert 'http_requests_total{method="GET",route="/api/recipes/{recipe_id}",status="200"}' in text
+        assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/recipes/{recipe_id}"}' in text
+
+    def test_unmatched_routes_share_a_label(self, client, scrape_metrics):
+        client.get("/no/such/path")
+        text = scrape_metrics()
+        assert 'route="<unmatched>",status="404"' in text
+
+    def test_db_statements(self, client, scrape_metrics):
+        client.get("/api/recipes")
+        text = scrape_metrics()
+        assert 'db_statements_total{operation="SELECT"}' in text
+        assert "db_statement_duration_seconds_count" in text
+
+    def test_pool_metrics(self, scrape_metrics):
+        text = scrape_metrics()
+        assert 'db_pool_checked_out{pool="primary"}' in text
+
+    def test_cache_lookups(self, scrape_metrics):
+        record_cache_lookup("test", hit=True)
+        text = scrape_metrics()
+        assert 'cache_lookups_total{cache="test",result="hit"}' in text
+
+
+class TestStatementOperation:
+    def test_known_operations(self):
+        assert statement_operation("  select 1") == "SELECT"
+        assert statement_operation("INSERT INTO t VALUES (1)") == "INSERT"
+
+    def test_other(self):
+        assert statement_operation("PRAGMA foreign_keys=ON") == "OTHER"
+        assert statement_operation("") == "OTHER"
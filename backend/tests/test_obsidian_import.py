@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import delete, select, text
+
+from app.models import Ingredient, Recipe, RecipeIngredient
+from benchmarks.micro import load_script
+
+obsidian = load_script("import_obsidian_recipes")
+
+PANCAKES = "# Pancakes\n\n## Ingredients\n- 200 g flour\n- 2 eggs\n- 300 ml milk\n\n## Steps\n1. Mix.\n2. Fry.\n"
+OMELETTE = "# Omelette\n\n## Ingredients\n- 3 eggs\n- 10 g butter\n\n## Steps\n1. Whisk.\n2. Cook.\n"
+SOUP = "# Soup\n\n## Ingredients\n- 1 l water\n- 2 carrots\n\n## Steps\n1. Boil.\n"
+
+
+@pytest.fixture
+def vault(tmp_path):
+    vault = tmp_path / "vault"
+    (vault / "breakfast").mkdir(parents=True)
+    (vault / "breakfast" / "Pancakes.md").write_text(PANCAKES)
+    (vault / "breakfast" / "Omelette.md").write_text(OMELETTE)
+    (vault / "Soup.md").write_text(SOUP)
+    return vault
+
+
+def run_import(db, vault, update=False, batch_size=500):
+    parsed = obsidian.parse_vault(sorted(vault.rglob("*.md")), workers=1)
+    importer = obsidian.RecipeImporter(db, update=update)
+    for i in range(0, len(parsed), batch_size):
+        importer.import_batch(parsed[i:i + batch_size])
+    return importer.counts
+
+
+def recipe_rows(db):
+    """Every recipe with its instructions and ingredient lines, keyed by title."""
+    rows = {title: (instructions, []) for title, instructions in db.execute(select(Recipe.title, Recipe.instructions))}
+    for title, name, quantity, unit in db.execute(
+        select(Recipe.title, Ingredient.name, RecipeIngredient.quantity, RecipeIngredient.unit)
+        .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+    ):
+        rows[title][1].append((name, quantity, unit))
+    return {title: (instructions, sorted(lines)) for title, (instructions, lines) in rows.items()}
+
+
+def reject_long_titles(db):
+    # SQLite does not enforce String(255); PostgreSQL would reject the insert.
+    db.execute(text(
+        "CREATE TRIGGER title_length BEFORE INSERT ON recipes WHEN length(NEW.title) > 255 "
+        "BEGIN SELECT RAISE(ABORT, 'value too long for type character varying(255)'); END"
+    ))
+    db.commit()
+
+
+class TestImport:
+    def test_imports_vault(self, db_session, vault):
+        counts = run_import(db_session, vault)
+
+        assert counts == {"imported": 3, "updated": 0, "skipped": 0, "errors": 0, "ingredients": 6}
+        rows = recipe_rows(db_session)
+        assert rows["Pancakes"] == (
+            "1. Mix.\n2. Fry.",
+            [("eggs", "2", None), ("flour", "200", "g"), ("milk", "300", "ml")],
+        )
+        assert set(rows) == {"Pancakes", "Omelette", "Soup"}
+
+    def test_batches_match_single_batch(self, db_session, vault):
+        run_import(db_session, vault)
+        single = recipe_rows(db_session)
+        db_session.execute(delete(RecipeIngredient))
+        db_session.execute(delete(Recipe))
+        db_session.commit()
+
+        run_import(db_session, vault, batch_size=2)
+
+        assert recipe_rows(db_session) == single
+
+    def test_plain_run_skips_existing(self, db_session, vault):
+        run_import(db_session, vault)
+        before = recipe_rows(db_session)
+        (vault / "breakfast" / "Pancakes.md").write_text(PANCAKES.replace("300 ml milk", "250 ml oat milk"))
+
+        counts = run_import(db_session, vault)
+
+        assert counts["skipped"] == 3
+        assert counts["imported"] == counts["updated"] == 0
+        assert recipe_rows(db_session) == before
+
+    def test_update_matches_fresh_import(self, db_session, vault):
+        run_import(db_session, vault)
+        (vault / "breakfast" / "Pancakes.md").write_text(
+            PANCAKES.replace("300 ml milk", "250 ml oat milk").replace("2. Fry.", "2. Rest.\n3. Fry.")
+        )
+
+        counts = run_import(db_session, vault, update=True)
+        updated = recipe_rows(db_session)
+        db_session.execute(delete(RecipeIngredient))
+        db_session.execute(delete(Recipe))
+        db_session.commit()
+        run_import(db_session, vault)
+
+        assert (counts["updated"], counts["ingredients"]) == (3, 1)
+        assert updated == recipe_rows(db_session)
+        assert updated["Pancakes"][1] == [("eggs", "2", None), ("flour", "200", "g"), ("oat milk", "250", "ml")]
+        # Recipes are updated in place, not duplicated.
+        assert len(db_session.scalars(select(Recipe.title)).all()) == 3
+
+    def test_bad_note_does_not_fail_its_batch(self, db_session, vault, capsys):
+        reject_long_titles(db_session)
+        (vault / "Long.md").write_text("# " + "x" * 300 + "\n\n## Ingredients\n- 1 lemon\n")
+
+        counts = run_import(db_session, vault)
+
+        assert counts == {"imported": 3, "updated": 0, "skipped": 0, "errors": 1, "ingredients": 6}
+        assert set(recipe_rows(db_session)) == {"Pancakes", "Omelette", "Soup"}
+        # The bad note's new ingredient was rolled back with it.
+        assert db_session.scalar(select(Ingredient.id).where(Ingredient.name == "lemon")) is None
+        assert "retrying one recipe at a time" in capsys.readouterr().out
+
+    def test_failed_note_can_be_imported_later(self, db_session, vault):
+        reject_long_titles(db_session)
+        long_note = vault / "Long.md"
+        long_note.write_text("# " + "x" * 300 + "\n\n## Ingredients\n- 1 lemon\n")
+        run_import(db_session, vault)
+        long_note.write_text("# Lemonade\n\n## Ingredients\n- 1 lemon\n")
+
+        counts = run_import(db_session, vault)
+
+        assert (counts["imported"], counts["skipped"], counts["errors"]) == (1, 3, 0)
+        assert recipe_rows(db_session)["Lemonade"] == (None, [("lemon", "1", None)])
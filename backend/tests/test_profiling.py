@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling, settings
+from app.core.profiling import ProfileSession, ProfilingMiddleware, active_profile
+from app.main import app
+
+
+@pytest.fixture
+def profiled_client(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_output_dir", str(tmp_path / "profiles"))
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    return TestClient(ProfilingMiddleware(app))
+
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+class TestProfilingMiddleware:
+    def test_profiles_request(self, profiled_client):
+        response = profiled_client.get("/api/ingredients?__profile=1", headers=ADMIN)
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        profiles = profiled_client.get("/api/admin/profiles", headers=ADMIN).json()
+        assert profiles[0]["id"] == profile_id
+        assert profiles[0]["route"] == "/api/ingredients"
+
+        speedscope = profiled_client.get(f"/api/admin/profiles/{profile_id}", headers=ADMIN)
+        assert speedscope.json()["profiles"][0]["type"] == "sampled"
+
+        collapsed = profiled_client.get(
+            f"/api/admin/profiles/{profile_id}?format=collapsed", headers=ADMIN
+        )
+        assert collapsed.status_code == 200
+
+    def test_header_switch(self, profiled_client):
+        response = profiled_client.get("/api/ingredients", headers={"X-Profile": "1", **ADMIN})
+        assert "x-profile-id" in response.headers
+
+    def test_requires_admin_token(self, profiled_client):
+        response = profiled_client.get("/api/ingredients?__profile=1")
+        assert "x-profile-id" not in response.headers
+
+    def test_requires_setting(self, profiled_client, monkeypatch):
+        monkeypatch.setattr(settings, "profiling_enabled", False)
+        response = profiled_client.get("/api/ingredients?__profile=1", headers=ADMIN)
+        assert "x-profile-id" not in response.headers
+
+    def test_failed_save_not_retried(self, profiled_client, monkeypatch):
+        calls = []
+
+        def save_profile(session, *args):
+            calls.append(session)
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(profiling, "save_profile", save_profile)
+        with pytest.raises(OSError):
+            profiled_client.get("/api/ingredients?__profile=1", headers=ADMIN)
+        assert len(calls) == 1
+
+    def test_unknown_profile(self, profiled_client):
+        response = profiled_client.get("/api/admin/profiles/nope", headers=ADMIN)
+        assert response.status_code == 404
+
+
+class TestProfileSession:
+    def test_samples_current_thread(self):
+        session = ProfileSession(interval=0.001)
+        session.start()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        session.stop()
+
+        assert session.samples
+        assert "test_samples_current_thread" in session.collapsed()
+        speedscope = session.speedscope("test")
+        profile = speedscope["profiles"][0]
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(
+            idx < len(speedscope["shared"]["frames"]) for s in profile["samples"] for idx in s
+        )
+
+    @pytest.mark.asyncio
+    async def test_ignores_other_tasks_on_the_loop(self):
+        async def spin(seconds: float) -> None:
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                busy = time.perf_counter() + 0.02
+                while time.perf_counter() < busy:
+                    pass
+                await asyncio.sleep(0)
+
+        async def other_request() -> None:
+            await spin(0.3)
+
+        async def profiled_request() -> ProfileSession:
+            session = ProfileSession(interval=0.001)
+            active_profile.set(session)
+            session.start()
+            await spin(0.3)
+            session.stop()
+            return session
+
+        session, _ = await asyncio.gather(profiled_request(), other_request())
+        collapsed = session.collapsed()
+        assert "profiled_request" in collapsed
+        assert "other_request" not in collapsed
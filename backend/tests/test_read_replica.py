@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core import Base, database, get_async_db, get_db, settings
+from app.core.replica import STICKY_COOKIE
+from app.main import app
+from app.models import Recipe
+
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def replica_client(tmp_path, monkeypatch):
+    """Primary and replica as two SQLite files; the replica only sees what we copy in."""
+    primary = make_database(tmp_path / "primary.db")
+    replica = make_database(tmp_path / "replica.db")
+
+    def async_factory(path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    monkeypatch.setattr(settings, "database_read_url", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_factory(tmp_path / "primary.db"))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", async_factory(tmp_path / "replica.db"))
+
+    primary_session = sessionmaker(bind=primary)()
+
+    def override_get_db():
+        yield primary_session
+
+    async def override_get_async_db():
+        async with database.AsyncSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield TestClient(app), sessionmaker(bind=replica)
+    app.dependency_overrides.clear()
+    primary_session.close()
+    primary.dispose()
+    replica.dispose()
+
+
+class TestReadReplica:
+    def test_reads_go_to_replica(self, replica_client):
+        client, replica_session = replica_client
+        with replica_session() as session:
+            session.add(Recipe(title="Replicated"))
+            session.commit()
+
+        response = client.get("/api/recipes")
+        assert [r["title"] for r in response.json()] == ["Replicated"]
+
+    def test_write_sets_sticky_cookie(self, replica_client):
+        client, _ = replica_client
+        response = client.post("/api/recipes", json={"title": "Fresh"})
+        assert response.status_code == 201
+        assert STICKY_COOKIE in response.cookies
+
+    def test_reads_stick_to_primary_after_write(self, replica_client):
+        client, _ = replica_client
+        recipe = client.post("/api/recipes", json={"title": "Fresh"}).json()
+
+        response = client.get(f"/api/recipes/{recipe['id']}")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Fresh"
+
+    def test_replica_used_once_window_expires(self, replica_client):
+        client, _ = replica_client
+        recipe = client.post("/api/recipes", json={"title": "Fresh"}).json()
+        client.cookies.set(STICKY_COOKIE, "0")
+
+        response = client.get(f"/api/recipes/{recipe['id']}")
+        assert response.status_code == 404
+
+    def test_failed_write_does_not_set_cookie(self, replica_client):
+        client, _ = replica_client
+        response = client.delete("/api/recipes/999")
+        assert response.status_code == 404
+        assert STICKY_COOKIE not in response.cookies
+
+    def test_no_cookie_without_replica(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "database_read_url", None)
+        response = client.post("/api/recipes", json={"title": "Fresh"})
+        assert STICKY_COOKIE not in response.cookies
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from app.core import settings
+from app.models import RecipeImage
+from app.services.recipe_images import fetch_recipe_image, sniff_image_type
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF" + b"\x00" * 100
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+WEBP = b"RIFF\x64\x00\x00\x00WEBPVP8 " + b"\x00" * 100
+
+
+@pytest.fixture
+def create_recipe(client, run_jobs):
+    def create(image_url: str) -> dict:
+        response = client.post("/api/recipes", json={"title": "Soup", "image_url": image_url})
+        assert response.status_code == 201
+        assert response.json()["images"] == []
+        run_jobs()
+        return client.get(f"/api/recipes/{response.json()['id']}").json()
+
+    return create
+
+
+class TestSniffImageType:
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [(JPEG, "image/jpeg"), (PNG, "image/png"), (WEBP, "image/webp"), (b"<html>", None), (b"GIF89a", None)],
+    )
+    def test_signatures(self, data, expected):
+        assert sniff_image_type(data) == expected
+
+
+class TestCreateFetchesImage:
+    def test_stored_as_primary(self, client, fake_site, create_recipe):
+        url = fake_site.add("/soup.jpg", JPEG, content_type="application/octet-stream")
+        recipe = create_recipe(url)
+
+        [image] = recipe["images"]
+        assert image["is_primary"] is True
+        stored = client.get(f"/api/images/{image['id']}")
+        assert (stored.headers["content-type"], stored.content) == ("image/jpeg", JPEG)
+
+    def test_not_an_image(self, fake_site, create_recipe, scrape_metrics):
+        url = fake_site.add("/soup.jpg", "<html>login</html>", content_type="image/jpeg")
+        assert create_recipe(url)["images"] == []
+        assert 'recipe_image_fetches_total{status="rejected"}' in scrape_metrics()
+
+    def test_too_large(self, fake_site, create_recipe):
+        url = fake_site.add("/huge.png", PNG + b"\x00" * (5 * 1024 * 1024))
+        assert create_recipe(url)["images"] == []
+
+    def test_missing(self, fake_site, create_recipe):
+        assert create_recipe(fake_site.url("/gone.jpg"))["images"] == []
+
+    def test_redirect_followed(self, fake_site, create_recipe):
+        fake_site.add("/image", JPEG)
+        url = fake_site.add("/cdn/soup.jpg", "", status=302, location=fake_site.url("/image"))
+        assert len(create_recipe(url)["images"]) == 1
+
+    def test_redirect_to_private_address_refused(self, fake_site, create_recipe):
+        url = fake_site.add("/soup.jpg", "", status=302, location="http://169.254.169.254/latest/meta-data/")
+        assert create_recipe(url)["images"] == []
+
+    def test_blocked_url_not_requested(self, fake_site, monkeypatch, create_recipe):
+        monkeypatch.setattr(settings, "recipe_import_allowed_hosts", [])
+        url = fake_site.add("/soup.jpg", JPEG)
+        assert create_recipe(url)["images"] == []
+        assert fake_site.requests == 0
+
+    def test_server_errors_retried(self, client, fake_site, create_recipe, async_session_factory, monkeypatch):
+        monkeypatch.setattr(settings, "jobs_retry_backoff", 0.0)
+        url = fake_site.add("/soup.jpg", JPEG, fail_first=2)
+        assert len(create_recipe(url)["images"]) == 1
+        [job] = client.get("/api/jobs", params={"kind": "recipe_image"}).json()
+        assert (job["state"], job["attempts"], job["result"]) == ("succeeded", 3, {"status": "stored"})
+
+    def test_rejects_non_http_url(self, client):
+        response = client.post("/api/recipes", json={"title": "Soup", "image_url": "file:///etc/passwd"})
+        assert response.status_code == 422
+
+
+class TestFetchRecipeImage:
+    @pytest.mark.asyncio
+    async def test_uploaded_primary_kept(self, client, fake_site, async_session_factory):
+        recipe_id = client.post("/api/recipes", json={"title": "Soup"}).json()["id"]
+        client.post(
+            f"/api/recipes/{recipe_id}/images?is_primary=true",
+            files={"file": ("mine.png", PNG, "image/png")},
+        )
+
+        async with async_session_factory() as session:
+            assert await fetch_recipe_image(session, recipe_id, fake_site.add("/soup.webp", WEBP)) == "stored"
+
+        images = client.get(f"/api/recipes/{recipe_id}").json()["images"]
+        [fetched] = [image for image in images if not image["is_primary"]]
+        assert len(images) == 2
+        assert client.get(f"/api/images/{fetched['id']}").headers["content-type"] == "image/webp"
+
+    @pytest.mark.asyncio
+    async def test_deleted_recipe_skipped(self, fake_site, async_session_factory, db_session):
+        async with async_session_factory() as session:
+            assert await fetch_recipe_image(session, 999, fake_site.add("/soup.jpg", JPEG)) == "skipped"
+        assert db_session.query(RecipeImage).count() == 0
+
+    def test_bulk_import_fetches_saved_images(self, client, fake_site, monkeypatch, run_jobs):
+        monkeypatch.setattr(settings, "bulk_import_host_interval", 0.0)
+        image_url = fake_site.add("/soup.jpg", JPEG)
+        recipe = {"@type": "Recipe", "name": "Soup", "image": image_url}
+        url = fake_site.add("/soup", f'<script type="application/ld+json">{json.dumps(recipe)}</script>')
+
+        response = client.post("/api/recipes/import/bulk", json={"urls": [url], "save": True})
+        [saved] = [e for e in map(json.loads, response.text.splitlines()) if e["event"] == "saved"]
+        recipe_id = saved["recipes"][0]["recipe_id"]
+        assert run_jobs() == 1
+        [image] = client.get(f"/api/recipes/{recipe_id}").json()["images"]
+        assert image["is_primary"] is True
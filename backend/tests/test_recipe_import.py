@@ -1,6 +1,10 @@
+import json
+import threading
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 
+from app.core.executors import shutdown_executor
+from app.utils import recipe_import
 from app.utils.recipe_import import (
     parse_duration,
     extract_text,
@@ -8,9 +12,35 @@ from app.utils.recipe_import import (
     parse_ingredients,
     parse_servings,
     extract_recipe_from_jsonld,
+    extract_recipe,
     extract_recipe_from_microdata,
     import_recipe_from_url,
+    parse_recipe_html,
+    validate_url,
 )
+from app.core import settings
+from app.core.config import Settings
+from benchmarks import corpus
+
+
+class TestValidateUrl:
+    def test_rejects_loopback(self):
+        with pytest.raises(ValueError):
+            validate_url("http://127.0.0.1:8001/recipe")
+
+    def test_allowed_host_skips_private_check(self, monkeypatch):
+        monkeypatch.setattr(settings, "recipe_import_allowed_hosts", ["127.0.0.1"])
+        validate_url("http://127.0.0.1:8001/recipe")
+
+    def test_allowed_host_still_requires_http(self, monkeypatch):
+        monkeypatch.setattr(settings, "recipe_import_allowed_hosts", ["127.0.0.1"])
+        with pytest.raises(ValueError):
+            validate_url("file://127.0.0.1/etc/passwd")
+
+    def test_allowed_hosts_case_insensitive(self, monkeypatch):
+        allowed = Settings(recipe_import_allowed_hosts=["Localhost"]).recipe_import_allowed_hosts
+        monkeypatch.setattr(settings, "recipe_import_allowed_hosts", allowed)
+        validate_url("http://LOCALHOST:8001/recipe")
 
 
 class TestParseDuration:
@@ -140,6 +170,10 @@ class TestExtractRecipeFromMicrodata:
         result = extract_recipe_from_microdata(data)
         assert result["name"] == "Test"
 
+    def test_uniform_microdata(self):
+        data = [{"@context": "http://schema.org", "@type": "Recipe", "name": "Test"}]
+        assert extract_recipe_from_microdata(data)["name"] == "Test"
+
     def test_no_recipe(self):
         data = [{"type": ["WebPage"], "properties": {}}]
         result = extract_recipe_from_microdata(data)
@@ -148,7 +182,7 @@ class TestExtractRecipeFromMicrodata:
 
 class TestImportRecipeFromUrl:
     @pytest.mark.asyncio
-    async def test_import_with_jsonld(self):
+    async def test_import_with_jsonld(self, fake_site):
         html = """
         <html>
         <head><title>Test Page</title></head>
@@ -169,18 +203,9 @@ class TestImportRecipeFromUrl:
         </body>
         </html>
         """
-        mock_response = MagicMock()
-        mock_response.text = html
-        mock_response.raise_for_status = MagicMock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
-            mock_client.return_value = mock_instance
+        url = fake_site.add("/recipe", html)
 
-            result = await import_recipe_from_url("https://example.com/recipe")
+        result = await import_recipe_from_url(url)
 
         assert result["title"] == "Chocolate Cake"
         assert result["description"] == "Delicious cake"
@@ -189,34 +214,25 @@ class TestImportRecipeFromUrl:
         assert result["servings"] == 8
         assert len(result["ingredients"]) == 2
         assert result["image_url"] == "https://example.com/cake.jpg"
-        assert result["source_url"] == "https://example.com/recipe"
+        assert result["source_url"] == url
 
     @pytest.mark.asyncio
-    async def test_import_fallback_to_title(self):
+    async def test_import_fallback_to_title(self, fake_site):
         html = """
         <html>
         <head><title>My Recipe Page</title></head>
         <body><p>No structured data</p></body>
         </html>
         """
-        mock_response = MagicMock()
-        mock_response.text = html
-        mock_response.raise_for_status = MagicMock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
-            mock_client.return_value = mock_instance
+        url = fake_site.add("/recipe", html)
 
-            result = await import_recipe_from_url("https://example.com/recipe")
+        result = await import_recipe_from_url(url)
 
         assert result["title"] == "My Recipe Page"
         assert result["ingredients"] == []
 
     @pytest.mark.asyncio
-    async def test_import_image_as_list(self):
+    async def test_import_image_as_list(self, fake_site):
         html = """
         <html>
         <head><title>Test</title></head>
@@ -231,23 +247,14 @@ class TestImportRecipeFromUrl:
         </body>
         </html>
         """
-        mock_response = MagicMock()
-        mock_response.text = html
-        mock_response.raise_for_status = MagicMock()
+        url = fake_site.add("/recipe", html)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
-            mock_client.return_value = mock_instance
-
-            result = await import_recipe_from_url("https://example.com/recipe")
+        result = await import_recipe_from_url(url)
 
         assert result["image_url"] == "https://example.com/img1.jpg"
 
     @pytest.mark.asyncio
-    async def test_import_image_as_dict(self):
+    async def test_import_image_as_dict(self, fake_site):
         html = """
         <html>
         <head><title>Test</title></head>
@@ -262,17 +269,119 @@ class TestImportRecipeFromUrl:
         </body>
         </html>
         """
-        mock_response = MagicMock()
-        mock_response.text = html
-        mock_response.raise_for_status = MagicMock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
-            mock_client.return_value = mock_instance
+        url = fake_site.add("/recipe", html)
 
-            result = await import_recipe_from_url("https://example.com/recipe")
+        result = await import_recipe_from_url(url)
 
         assert result["image_url"] == "https://example.com/photo.jpg"
+
+    @pytest.mark.asyncio
+    async def test_title_fallback_ignores_later_titles(self, fake_site):
+        html = "<html><head><title> First </title></head><body><svg><title>icon</title></svg></body></html>"
+        url = fake_site.add("/recipe", html)
+
+        result = await import_recipe_from_url(url)
+
+        assert result["title"] == "First"
+
+    @pytest.mark.asyncio
+    async def test_parses_off_the_event_loop(self, fake_site, monkeypatch):
+        threads = []
+
+        def recording_parse(html, url):
+            threads.append(threading.current_thread())
+            return parse_recipe_html(html, url)
+
+        monkeypatch.setattr(recipe_import, "parse_recipe_html", recording_parse)
+        url = fake_site.add("/recipe", "<html><head><title>Soup</title></head></html>")
+
+        result = await import_recipe_from_url(url)
+
+        assert result["title"] == "Soup"
+        assert threads and threads[0] is not threading.current_thread()
+        assert threads[0].name.startswith("parse")
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self, fake_site, monkeypatch):
+        monkeypatch.setattr(settings, "parse_executor", "process")
+        monkeypatch.setattr(settings, "parse_workers", 1)
+        shutdown_executor()
+        try:
+            url = fake_site.add("/recipe", "<html><head><title>Soup</title></head></html>")
+            result = await import_recipe_from_url(url)
+        finally:
+            shutdown_executor()
+
+        assert result["title"] == "Soup"
+
+
+def jsonld_page(data, head: str = "", body: str = "") -> str:
+    return (
+        f"<html><head><title>Page &amp; title</title>{head}"
+        f"<script type=\"application/ld+json\">{json.dumps(data)}</script></head>"
+        f"<body>{body}</body></html>"
+    )
+
+
+class TestExtractRecipe:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"@type": "Recipe", "name": "Stew"},
+            [{"@type": "WebSite", "name": "Blog"}, {"@type": "Recipe", "name": "Stew"}],
+            {"@context": "https://schema.org", "@graph": [{"@type": "WebPage"}, {"@type": "Recipe", "name": "Stew"}]},
+            {"@type": ["Recipe", "NewsArticle"], "name": "Stew"},
+            {"@type": "https://schema.org/Recipe", "name": "Stew"},
+        ],
+    )
+    def test_jsonld_fast_path(self, data):
+        result, path = extract_recipe(jsonld_page(data), "https://example.com/r")
+        assert path == "jsonld"
+        assert result["title"] == "Stew"
+
+    def test_falls_back_for_microdata(self):
+        html = (
+            "<html><body><div itemscope itemtype='https://schema.org/Recipe'>"
+            "<span itemprop='name'>Pierogi</span></div></body></html>"
+        )
+        result, path = extract_recipe(html, "https://example.com/r")
+        assert path == "full"
+        assert result["title"] == "Pierogi"
+
+    def test_falls_back_when_jsonld_has_no_recipe(self):
+        result, path = extract_recipe(jsonld_page({"@type": "WebSite"}), "https://example.com/r")
+        assert path == "full"
+        assert result["title"] == "Page & title"
+
+    def test_title_fallback_unescapes(self):
+        result, path = extract_recipe(jsonld_page({"@type": "Recipe"}), "https://example.com/r")
+        assert path == "jsonld"
+        assert result["title"] == "Page & title"
+
+    def test_skips_invalid_blocks(self):
+        html = jsonld_page(
+            {"@type": "Recipe", "name": "Stew"},
+            head="<script type='application/ld+json'>{not json</script>",
+        )
+        result, path = extract_recipe(html, "https://example.com/r")
+        assert (path, result["title"]) == ("jsonld", "Stew")
+
+    def test_control_characters_in_strings(self):
+        html = '<script type="application/ld+json">{"@type": "Recipe", "name": "Line\none"}</script>'
+        assert extract_recipe(html, "https://example.com/r")[0]["title"] == "Line\none"
+
+    def test_ignores_other_scripts(self):
+        html = jsonld_page(
+            {"@type": "Recipe", "name": "Stew"},
+            head="<script>var s = '<script type=\"application/ld+json\">';</script>",
+        )
+        assert extract_recipe(html, "https://example.com/r")[0]["title"] == "Stew"
+
+    def test_matches_full_parse_on_corpus(self):
+        for html, url in corpus.recipe_html():
+            assert extract_recipe(html, url)[0] == parse_recipe_html(html, url)
+
+    def test_import_records_path(self, client, fake_site, scrape_metrics):
+        url = fake_site.add("/recipe", jsonld_page({"@type": "Recipe", "name": "Stew"}))
+        assert client.post("/api/recipes/import", json={"url": url}).json()["title"] == "Stew"
+        assert 'recipe_import_extractions_total{path="jsonld"}' in scrape_metrics()
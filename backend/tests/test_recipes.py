@@ -1,4 +1,7 @@
 import pytest
+from pydantic import TypeAdapter
+
+from app.schemas import RecipeListResponse
 
 
 @pytest.fixture
@@ -102,6 +105,23 @@ class TestListRecipes:
         assert data[0]["title"] == "Tagged Recipe"
 
 
+    def test_matches_response_model(self, client, ingredient, tag):
+        client.post(
+            "/api/recipes",
+            json={
+                "title": "Bread",
+                "dietary_tags": ["vegan"],
+                "tag_ids": [tag["id"]],
+                "ingredients": [{"ingredient_id": ingredient["id"], "quantity": "2 cups"}],
+            },
+        )
+        data = client.get("/api/recipes").json()
+
+        # The list is encoded without response_model; it must still match it exactly.
+        adapter = TypeAdapter(list[RecipeListResponse])
+        assert adapter.dump_python(adapter.validate_python(data), mode="json") == data
+
+
 class TestCreateRecipe:
     def test_create_success(self, client, ingredient, tag):
         response = client.post(
@@ -169,6 +189,24 @@ class TestGetRecipe:
         assert response.status_code == 200
         assert response.json()["title"] == "Get Test"
 
+    def test_get_matches_create_response(self, client, ingredient, tag):
+        create = client.post(
+            "/api/recipes",
+            json={
+                "title": "Same Shape",
+                "dietary_tags": ["vegetarian"],
+                "tag_ids": [tag["id"]],
+                "ingredients": [{"ingredient_id": ingredient["id"], "quantity": "1", "notes": "sifted"}],
+            },
+        )
+        client.post(f"/api/recipes/{create.json()['id']}/notes", json={"content": "Good"})
+
+        data = client.get(f"/api/recipes/{create.json()['id']}").json()
+        assert len(data.pop("notes")) == 1
+        expected = create.json()
+        expected.pop("notes")
+        assert data == expected
+
     def test_get_not_found(self, client):
         response = client.get("/api/recipes/999")
         assert response.status_code == 404
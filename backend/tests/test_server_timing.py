@@ -0,0 +1,45 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.timing import ServerTimingMiddleware
+from app.main import app
+
+
+@pytest.fixture
+def timed_client(client):
+    return TestClient(ServerTimingMiddleware(app))
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    return {
+        match.group(1): float(match.group(2))
+        for match in re.finditer(r"(\w+);dur=([\d.]+)", header)
+    }
+
+
+class TestServerTiming:
+    def test_async_endpoint_phases(self, timed_client):
+        recipe = timed_client.post("/api/recipes", json={"title": "Stew"}).json()
+        response = timed_client.get(f"/api/recipes/{recipe['id']}")
+
+        timings = parse_server_timing(response.headers["server-timing"])
+        assert set(timings) == {"deps", "handler", "db", "serialize", "total"}
+        assert timings["total"] >= timings["handler"]
+        assert 'desc="queries=1"' in response.headers["server-timing"]
+
+    def test_sync_endpoint_counts_queries(self, timed_client):
+        response = timed_client.get("/api/ingredients")
+        assert response.status_code == 200
+        timings = parse_server_timing(response.headers["server-timing"])
+        assert "handler" in timings
+        assert timings["db"] > 0
+
+    def test_unrouted_request_has_total(self, timed_client):
+        response = timed_client.get("/no/such/path")
+        assert parse_server_timing(response.headers["server-timing"]).keys() == {"db", "total"}
+
+    def test_disabled_by_default(self, client):
+        response = client.get("/api/ingredients")
+        assert "server-timing" not in response.headers
@@ -0,0 +1,27 @@
+class TestGenerateShoppingList:
+    def test_aggregates_meal_plan_ingredients(self, client):
+        flour = client.post("/api/ingredients", json={"name": "Flour"}).json()
+        recipe = client.post(
+            "/api/recipes",
+            json={
+                "title": "Bread",
+                "servings": 2,
+                "ingredients": [{"ingredient_id": flour["id"], "quantity": "100", "unit": "g"}],
+            },
+        ).json()
+        for day in ("2026-03-02", "2026-03-03"):
+            client.post(
+                "/api/meal-plans",
+                json={"date": day, "meal_type": "dinner", "recipe_id": recipe["id"], "servings": 4},
+            )
+
+        response = client.post(
+            "/api/shopping-lists/generate",
+            json={"name": "Week", "start_date": "2026-03-02", "end_date": "2026-03-08"},
+        )
+        assert response.status_code == 201
+        items = response.json()["items"]
+        assert len(items) == 1
+        assert items[0]["name"] == "Flour"
+        assert items[0]["quantity"] == "400.0"
+        assert items[0]["unit"] == "g"
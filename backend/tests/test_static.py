@@ -0,0 +1,183 @@
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.core.compression import CompressionMiddleware, precompress_directory
+from app.core.static import SpaStaticFiles, build_manifest, is_hashed_asset
+
+INDEX_HTML = "<html>" + "shell " * 1000 + "</html>"
+BUNDLE = "console.log(1);" * 500
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "_app" / "immutable").mkdir(parents=True)
+    (tmp_path / "index.html").write_text(INDEX_HTML)
+    (tmp_path / "about.html").write_text("<html>about</html>")
+    (tmp_path / "_app" / "immutable" / "start-BQx3kz1a.js").write_text(BUNDLE)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 5000)
+    precompress_directory(tmp_path, min_size=1024)
+    return tmp_path
+
+
+@pytest.fixture
+def static_files(static_dir):
+    return SpaStaticFiles(directory=static_dir)
+
+
+def mounted(static_files: SpaStaticFiles) -> Starlette:
+    # Mounted so HTTPException becomes a response, as in app.main.
+    return Starlette(routes=[Mount("/", static_files)])
+
+
+@pytest.fixture
+def static_client(static_files):
+    return TestClient(CompressionMiddleware(mounted(static_files)))
+
+
+def raw_body(response) -> bytes:
+    return b"".join(response.iter_raw())
+
+
+class TestManifest:
+    def test_indexes_files_and_siblings(self, static_dir):
+        manifest = build_manifest(static_dir)
+        assert set(manifest["index.html"].variants) == {None, "br", "gzip"}
+        assert set(manifest["logo.png"].variants) == {None}
+        assert "index.html.br" not in manifest
+        assert manifest["."] is manifest["index.html"]
+        assert manifest["about"] is manifest["about.html"]
+
+    def test_etag_follows_content(self, static_dir):
+        before = build_manifest(static_dir)["index.html"].variants[None].etag
+        (static_dir / "index.html").write_text(INDEX_HTML + "<!-- v2 -->")
+        assert build_manifest(static_dir)["index.html"].variants[None].etag != before
+
+    def test_small_files_held_in_memory(self, static_dir):
+        manifest = build_manifest(static_dir, inline_max_size=1024)
+        assert manifest["about.html"].variants[None].data == b"<html>about</html>"
+        assert manifest["index.html"].variants[None].data is None
+
+    def test_no_stat_per_request(self, static_client, monkeypatch):
+        static_client.get("/")  # first request checks the directory exists
+        stat, seen = os.stat, []
+
+        def recording_stat(path, *args, **kwargs):
+            seen.append(path)
+            return stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "stat", recording_stat)
+        assert static_client.get("/index.html", headers={"accept-encoding": "br"}).status_code == 200
+        assert static_client.get("/recipes/12").status_code == 200
+        monkeypatch.undo()
+        assert seen == []
+
+    def test_hashed_names(self):
+        assert is_hashed_asset("assets/index-BQx3kz1a.js")
+        assert is_hashed_asset("_app/immutable/entry/start.js")
+        assert not is_hashed_asset("index.html")
+        assert not is_hashed_asset("recipe-details.js")
+
+
+class TestSpaStaticFiles:
+    def test_index_no_cache(self, static_client):
+        response = static_client.get("/")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["content-type"].startswith("text/html")
+        assert response.text == INDEX_HTML
+
+    def test_hashed_assets_immutable(self, static_client):
+        response = static_client.get("/_app/immutable/start-BQx3kz1a.js")
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.text == BUNDLE
+
+    def test_spa_fallback(self, static_client):
+        response = static_client.get("/recipes/12/edit")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.text == INDEX_HTML
+
+    @pytest.mark.parametrize("path", ["/missing.js", "/_app/immutable/gone-Ab12cd34.js", "/api/nope"])
+    def test_missing_files_404(self, static_client, path):
+        assert static_client.get(path).status_code == 404
+
+    def test_prerendered_page_without_extension(self, static_client):
+        assert static_client.get("/about").text == "<html>about</html>"
+
+    def test_serves_precompressed_sibling(self, static_client, static_dir):
+        with static_client.stream("GET", "/index.html", headers={"accept-encoding": "zstd, br"}) as response:
+            body = raw_body(response)
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert body == (static_dir / "index.html.br").read_bytes()
+
+    def test_gzip_only_client(self, static_client):
+        response = static_client.get("/index.html", headers={"accept-encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == INDEX_HTML
+
+    def test_identity_and_images(self, static_client):
+        response = static_client.get("/index.html", headers={"accept-encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        image = static_client.get("/logo.png", headers={"accept-encoding": "br"})
+        assert "content-encoding" not in image.headers
+        assert "vary" not in image.headers
+
+    def test_vary_listed_once(self, static_client):
+        # No zstd sibling, so the middleware compresses the identity variant.
+        response = static_client.get("/index.html", headers={"accept-encoding": "zstd"})
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.headers.get_list("vary") == ["Accept-Encoding"]
+
+    def test_etag_revalidation(self, static_client):
+        headers = {"accept-encoding": "br"}
+        first = static_client.get("/index.html", headers=headers)
+        response = static_client.get("/index.html", headers={**headers, "if-none-match": first.headers["etag"]})
+        assert response.status_code == 304
+        assert response.headers["etag"] == first.headers["etag"]
+        # A different encoding is a different representation.
+        gzip = static_client.get("/index.html", headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+        assert gzip.status_code == 200
+
+    def test_if_modified_since(self, static_client, static_dir):
+        later = formatdate((static_dir / "logo.png").stat().st_mtime + 60, usegmt=True)
+        assert static_client.get("/logo.png", headers={"if-modified-since": later}).status_code == 304
+
+    def test_head(self, static_client):
+        response = static_client.head("/logo.png")
+        assert response.status_code == 200
+        assert response.headers["content-length"] == "5004"
+
+    def test_rejects_writes(self, static_client):
+        assert static_client.post("/index.html").status_code == 405
+
+    def test_large_files_streamed_from_disk(self, static_dir):
+        static_files = SpaStaticFiles(directory=static_dir)
+        static_files.manifest = build_manifest(static_dir, inline_max_size=0)
+        response = TestClient(mounted(static_files)).get("/logo.png")
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == (static_dir / "logo.png").read_bytes()
+
+    def test_ranges_not_compressed(self, tmp_path):
+        (tmp_path / "big.js").write_text("x" * 160_000)
+        static_files = SpaStaticFiles(directory=tmp_path)
+        static_files.manifest = build_manifest(tmp_path, inline_max_size=0)
+        client = TestClient(CompressionMiddleware(mounted(static_files)))
+
+        response = client.get("/big.js", headers={"range": "bytes=0-9999", "accept-encoding": "gzip"})
+        assert response.status_code == 206
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-range"] == "bytes 0-9999/160000"
+        assert response.content == b"x" * 10_000
+
+        # Compressed on the fly, the bytes differ from the ones ranges would index.
+        response = client.get("/big.js", headers={"accept-encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-ranges" not in response.headers
+        assert response.text == "x" * 160_000
@@ -59,6 +59,27 @@ class TestGetSuggestions:
         assert suggestion["total_ingredients"] == 3
         assert 60 <= suggestion["match_percentage"] <= 70
 
+    def test_non_numeric_quantity_has_no_required_quantity(self, client, ingredients):
+        client.post(
+            "/api/recipes",
+            json={
+                "title": "Salad",
+                "ingredients": [
+                    {"ingredient_id": ingredients[0]["id"], "quantity": "2"},
+                    {"ingredient_id": ingredients[1]["id"], "quantity": "1/2"},
+                ],
+            },
+        )
+        client.post(
+            "/api/pantry",
+            json={"ingredient_id": ingredients[0]["id"], "quantity": 1},
+        )
+
+        response = client.get("/api/suggestions?min_match_percentage=0")
+        assert response.status_code == 200
+        missing = response.json()["suggestions"][0]["missing_ingredients"]
+        assert missing[0]["required_quantity"] is None
+
     def test_suggestions_sorted_by_match(self, client, ingredients):
         recipe1 = client.post(
             "/api/recipes",
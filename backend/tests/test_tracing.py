@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.tracing import (
+    JsonlExporter,
+    TracingMiddleware,
+    otlp_payload,
+    set_exporter,
+    span,
+    start_trace,
+)
+from app.main import app
+from app.utils.recipe_import import import_recipe_from_url
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = set_exporter(JsonlExporter(path))
+
+    def read_spans():
+        exporter.flush()
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    return read_spans
+
+
+class TestRequestTracing:
+    def test_request_with_sql_spans(self, client, trace_file):
+        traced_client = TestClient(TracingMiddleware(app))
+        traced_client.get("/api/ingredients")
+
+        spans = trace_file()
+        root = next(s for s in spans if s["parent_id"] is None)
+        assert root["name"] == "GET /api/ingredients"
+        assert root["attributes"]["http.status_code"] == 200
+        sql = [s for s in spans if s["parent_id"] == root["span_id"]]
+        assert sql and all(s["trace_id"] == root["trace_id"] for s in sql)
+        assert sql[0]["name"] == "SELECT"
+        assert sql[0]["attributes"]["db.system"] == "sqlite"
+
+    def test_async_handler_sql_spans(self, client, trace_file):
+        traced_client = TestClient(TracingMiddleware(app))
+        traced_client.get("/api/recipes/1")
+
+        spans = trace_file()
+        assert any(s["attributes"].get("db.statement", "").startswith("SELECT") for s in spans)
+
+
+class TestSpans:
+    def test_span_outside_trace_is_noop(self):
+        with span("orphan") as s:
+            assert s is None
+
+    def test_nested_spans_and_errors(self, trace_file):
+        with pytest.raises(ValueError):
+            with start_trace("job"):
+                with span("outer"):
+                    with span("inner"):
+                        raise ValueError("boom")
+
+        spans = {s["name"]: s for s in trace_file()}
+        assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+        assert spans["outer"]["parent_id"] == spans["job"]["span_id"]
+        assert "boom" in spans["inner"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_recipe_import_spans(self, trace_file, fake_site):
+        url = fake_site.add("/soup", "<html><head><title>Soup</title></head></html>")
+
+        with start_trace("import"):
+            await import_recipe_from_url(url)
+
+        spans = {s["name"]: s for s in trace_file()}
+        assert {"import", "GET", "parse", "parse.lxml", "parse.extruct"} <= spans.keys()
+        # Recorded in the parse pool's thread but still nested under the caller's span.
+        assert spans["parse.lxml"]["parent_id"] == spans["parse"]["span_id"]
+        assert spans["parse"]["parent_id"] == spans["import"]["span_id"]
+        # No JSON-LD on the page, so the fast path fell back to the full parse.
+        assert spans["parse"]["attributes"]["recipe.extraction"] == "full"
+        assert spans["parse.jsonld"]["parent_id"] == spans["parse"]["span_id"]
+
+
+class TestOtlpPayload:
+    def test_payload_shape(self, trace_file):
+        with start_trace("root") as root:
+            with span("child", kind="client", rows=3):
+                pass
+        trace_file()
+
+        payload = otlp_payload(root.trace.spans)
+        otlp_spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        child = next(s for s in otlp_spans if s["name"] == "child")
+        assert child["kind"] == 3
+        assert child["parentSpanId"] == root.span_id
+        assert child["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
@@ -0,0 +1,193 @@
+import argparse
+import os
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Recipe, RecipeIngredient, VaultFile
+from benchmarks.micro import load_script
+
+obsidian = load_script("import_obsidian_recipes")
+
+PANCAKES = "# Pancakes\n\n## Ingredients\n- 200 g flour\n- 2 eggs\n- 300 ml milk\n\n## Steps\n1. Mix.\n2. Fry.\n"
+SOUP = "# Soup\n\n## Ingredients\n- 1 l water\n- 2 carrots\n\n## Steps\n1. Boil.\n"
+
+
+@pytest.fixture
+def vault(tmp_path):
+    vault = tmp_path / "vault"
+    (vault / "breakfast").mkdir(parents=True)
+    (vault / "breakfast" / "Pancakes.md").write_text(PANCAKES)
+    (vault / "Soup.md").write_text(SOUP)
+    return vault
+
+
+def sync(db, vault):
+    counts = obsidian.VaultSync(db, vault).run()
+    return {key: value for key, value in counts.items() if value}
+
+
+def synced_files(db):
+    return {path: recipe_id for path, recipe_id in db.execute(select(VaultFile.path, VaultFile.recipe_id))}
+
+
+def recipe_id(db, title):
+    return db.scalar(select(Recipe.id).where(Recipe.title == title))
+
+
+def ingredient_lines(db, title):
+    return db.execute(
+        select(RecipeIngredient.id, RecipeIngredient.quantity, RecipeIngredient.unit)
+        .where(RecipeIngredient.recipe_id == recipe_id(db, title))
+        .order_by(RecipeIngredient.id)
+    ).all()
+
+
+class TestVaultSync:
+    def test_first_sync_creates_recipes(self, db_session, vault):
+        assert sync(db_session, vault) == {"created": 2, "ingredients": 5}
+        assert synced_files(db_session) == {
+            "breakfast/Pancakes.md": recipe_id(db_session, "Pancakes"),
+            "Soup.md": recipe_id(db_session, "Soup"),
+        }
+        assert [line[1:] for line in ingredient_lines(db_session, "Pancakes")] == [
+            ("200", "g"), ("2", None), ("300", "ml")
+        ]
+
+    def test_unchanged_notes_skipped(self, db_session, vault, monkeypatch):
+        sync(db_session, vault)
+        monkeypatch.setattr(obsidian, "file_hash", lambda path: pytest.fail(f"read {path}"))
+
+        assert sync(db_session, vault) == {"unchanged": 2}
+
+    def test_touched_note_only_records_mtime(self, db_session, vault):
+        sync(db_session, vault)
+        note = vault / "Soup.md"
+        lines = ingredient_lines(db_session, "Soup")
+        os.utime(note, ns=(note.stat().st_atime_ns, note.stat().st_mtime_ns + 10**9))
+
+        assert sync(db_session, vault) == {"unchanged": 1, "touched": 1}
+        mtime_ns = db_session.scalar(select(VaultFile.mtime_ns).where(VaultFile.path == "Soup.md"))
+        assert mtime_ns == note.stat().st_mtime_ns
+        assert ingredient_lines(db_session, "Soup") == lines
+        assert sync(db_session, vault) == {"unchanged": 2}
+
+    def test_edit_replaces_only_changed_lines(self, db_session, vault):
+        sync(db_session, vault)
+        flour, eggs, _ = ingredient_lines(db_session, "Pancakes")
+        (vault / "breakfast" / "Pancakes.md").write_text(PANCAKES.replace("300 ml milk", "250 ml milk"))
+
+        assert sync(db_session, vault) == {"unchanged": 1, "updated": 1}
+        lines = ingredient_lines(db_session, "Pancakes")
+        assert lines[:2] == [flour, eggs]
+        assert lines[2][1:] == ("250", "ml")
+
+    def test_edited_title_and_steps(self, db_session, vault):
+        sync(db_session, vault)
+        pancakes = recipe_id(db_session, "Pancakes")
+        lines = ingredient_lines(db_session, "Pancakes")
+        (vault / "breakfast" / "Pancakes.md").write_text(
+            PANCAKES.replace("# Pancakes", "# Crêpes").replace("2. Fry.", "2. Fry thin.")
+        )
+
+        assert sync(db_session, vault) == {"unchanged": 1, "updated": 1}
+        recipe = db_session.get(Recipe, pancakes)
+        db_session.refresh(recipe)
+        assert (recipe.title, recipe.instructions) == ("Crêpes", "1. Mix.\n2. Fry thin.")
+        assert ingredient_lines(db_session, "Crêpes") == lines
+
+    def test_rename_keeps_recipe(self, db_session, vault):
+        sync(db_session, vault)
+        soup = recipe_id(db_session, "Soup")
+        lines = ingredient_lines(db_session, "Soup")
+        (vault / "lunch").mkdir()
+        (vault / "Soup.md").rename(vault / "lunch" / "Carrot soup.md")
+
+        assert sync(db_session, vault) == {"unchanged": 1, "renamed": 1}
+        assert synced_files(db_session) == {
+            "breakfast/Pancakes.md": recipe_id(db_session, "Pancakes"),
+            "lunch/Carrot soup.md": soup,
+        }
+        assert ingredient_lines(db_session, "Soup") == lines
+        assert len(db_session.scalars(select(Recipe.id)).all()) == 2
+
+    def test_delete_keeps_recipe(self, db_session, vault):
+        sync(db_session, vault)
+        soup = recipe_id(db_session, "Soup")
+        (vault / "Soup.md").unlink()
+
+        assert sync(db_session, vault) == {"unchanged": 1, "removed": 1}
+        assert "Soup.md" not in synced_files(db_session)
+        assert recipe_id(db_session, "Soup") == soup
+
+    def test_new_note_takes_over_unsynced_recipe(self, db_session, vault):
+        # A recipe imported before the vault was synced, with other ingredients.
+        importer = obsidian.RecipeImporter(db_session)
+        importer.import_batch([obsidian.parse_obsidian_recipe(vault / "Soup.md") | {"ingredients": ["1 onion"]}])
+        soup = recipe_id(db_session, "Soup")
+
+        assert sync(db_session, vault) == {"created": 1, "linked": 1, "updated": 1, "ingredients": 5}
+        assert synced_files(db_session)["Soup.md"] == soup
+        assert [line[1:] for line in ingredient_lines(db_session, "Soup")] == [("1", "l"), ("2", None)]
+        assert len(db_session.scalars(select(Recipe.id)).all()) == 2
+
+    def test_new_note_with_synced_title_gets_own_recipe(self, db_session, vault):
+        sync(db_session, vault)
+        pancakes = recipe_id(db_session, "Pancakes")
+        (vault / "Pancakes again.md").write_text(PANCAKES.replace("2 eggs", "3 eggs"))
+
+        assert sync(db_session, vault) == {"unchanged": 2, "created": 1}
+        files = synced_files(db_session)
+        assert files["breakfast/Pancakes.md"] == pancakes
+        assert files["Pancakes again.md"] not in (None, pancakes)
+        # The first note's recipe is left alone.
+        assert [line[1:] for line in ingredient_lines(db_session, "Pancakes")][:2] == [("200", "g"), ("2", None)]
+
+    def test_unparsable_note_retried(self, db_session, vault, monkeypatch):
+        parse = obsidian.parse_obsidian_recipe
+        monkeypatch.setattr(obsidian, "parse_obsidian_recipe", lambda path: 1 / 0)
+        assert sync(db_session, vault) == {"errors": 2}
+
+        monkeypatch.setattr(obsidian, "parse_obsidian_recipe", parse)
+        assert sync(db_session, vault) == {"created": 2, "ingredients": 5}
+
+
+class TestParseVault:
+    def test_small_vault_parsed_in_process(self, vault, monkeypatch):
+        monkeypatch.setattr(obsidian, "ProcessPoolExecutor", lambda **kwargs: pytest.fail("started a pool"))
+
+        parsed = obsidian.parse_vault(sorted(vault.rglob("*.md")), workers=8)
+
+        assert [recipe["title"] for recipe in parsed] == ["Soup", "Pancakes"]
+
+
+class TestCommandLine:
+    def test_vault_under_home(self, tmp_path, monkeypatch):
+        (tmp_path / "notes").mkdir()
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        args = obsidian.parse_args(["--vault", "~/notes", "--sync"])
+
+        assert args.vault == tmp_path / "notes"
+
+    def test_missing_vault(self, tmp_path, capsys):
+        with pytest.raises(SystemExit):
+            obsidian.parse_args(["--vault", str(tmp_path / "missing")])
+        assert "vault not found" in capsys.readouterr().err
+
+    def test_watch_survives_failed_sync(self, tmp_path, monkeypatch):
+        import watchfiles
+
+        syncs = []
+
+        def sync_vault(args, vault):
+            syncs.append(vault)
+            if len(syncs) == 2:
+                raise RuntimeError("database is restarting")
+
+        monkeypatch.setattr(obsidian, "sync_vault", sync_vault)
+        monkeypatch.setattr(watchfiles, "watch", lambda *args, **kwargs: iter([{"a"}, {"b"}, {"c"}]))
+
+        obsidian.watch_vault(argparse.Namespace(), tmp_path)
+
+        assert syncs == [tmp_path] * 4